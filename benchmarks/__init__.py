@@ -0,0 +1,4 @@
+"""Benchmarks for knmi.
+
+Run them with `python -m benchmarks`, see `python -m benchmarks --help` for saving and comparing baselines.
+"""
@@ -0,0 +1,69 @@
+"""Command line interface of the knmi benchmarks."""
+
+import argparse
+import asyncio
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+
+from . import bench_parsing, bench_sensor, bench_weather
+from .compare import DEFAULT_ALPHA, DEFAULT_THRESHOLD, compare
+from .runner import DEFAULT_ROUNDS, Benchmark, BenchmarkResult, async_run, load_results, save_results
+
+DEFAULT_BASELINE = Path(".benchmarks") / "baseline.json"
+
+
+def all_benchmarks() -> Iterator[Benchmark]:
+    """Return all benchmarks."""
+    for module in (bench_parsing, bench_weather, bench_sensor):
+        yield from module.benchmarks()
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse the command line arguments."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    parser.add_argument("-k", "--filter", default="", help="only run benchmarks with this text in their name")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS, help="samples per benchmark")
+    parser.add_argument("--save", type=Path, nargs="?", const=DEFAULT_BASELINE, help="save the results as baseline")
+    parser.add_argument("--compare", type=Path, nargs="?", const=DEFAULT_BASELINE, help="compare the results with a baseline")
+    parser.add_argument("--alpha", type=float, default=DEFAULT_ALPHA, help="significance level of a slowdown")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="minimum relative slowdown to flag")
+    return parser.parse_args()
+
+
+async def async_main(args: argparse.Namespace) -> int:
+    """Run the benchmarks, return the exit code."""
+    baseline = load_results(args.compare) if args.compare else {}
+    results: list[BenchmarkResult] = []
+    regressions = 0
+
+    for benchmark in all_benchmarks():
+        if args.filter not in benchmark.name:
+            continue
+
+        result = await async_run(benchmark, args.rounds)
+        results.append(result)
+        line = f"{result.name:<50} {result.median * 1e6:>12.2f} µs"
+
+        if result.name in baseline:
+            comparison = compare(baseline[result.name], result, args.alpha, args.threshold)
+            line += f" {comparison.change:>+8.1%} (p={comparison.p_value:.4f})"
+            if comparison.regression:
+                regressions += 1
+                line += " SLOWER"
+
+        print(line)
+
+    if args.save:
+        save_results(args.save, results)
+        print(f"Saved baseline to {args.save}")
+
+    if regressions:
+        print(f"{regressions} benchmark(s) are significantly slower than the baseline")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(async_main(parse_args())))
@@ -0,0 +1,15 @@
+"""Benchmarks for parsing responses."""
+
+from collections.abc import Iterator
+from functools import partial
+
+from weerlive import Response
+
+from .fixtures import FIXTURES, load_fixture
+from .runner import Benchmark
+
+
+def benchmarks() -> Iterator[Benchmark]:
+    """Return the benchmarks of parsing every fixture."""
+    for fixture in FIXTURES:
+        yield Benchmark(f"parse[{fixture}]", partial(Response.from_json, load_fixture(fixture)))
@@ -0,0 +1,34 @@
+"""Benchmarks for evaluating the sensor descriptions."""
+
+from collections.abc import Iterator
+from functools import partial
+
+from custom_components.knmi.sensor import DESCRIPTIONS
+from custom_components.knmi.snapshot import KnmiSnapshot
+from weerlive import Response
+
+from .fixtures import FIXTURES, load_response
+from .runner import Benchmark
+
+
+def _evaluate(response: Response) -> None:
+    """Evaluate the value and attributes of every sensor description."""
+    for description in DESCRIPTIONS:
+        description.value_fn(response)
+        description.state_attributes_fn(response)
+
+
+def _read_snapshot(response: Response, reads: int) -> None:
+    """Read the value and attributes of every sensor description from a new snapshot, like a state write does."""
+    snapshot = KnmiSnapshot()
+    for _ in range(reads):
+        for description in DESCRIPTIONS:
+            value = snapshot.get(response, description)
+            _ = value.value, value.attributes
+
+
+def benchmarks() -> Iterator[Benchmark]:
+    """Return the benchmarks of evaluating the sensors for every fixture."""
+    for fixture in FIXTURES:
+        yield Benchmark(f"sensors[{fixture}]", partial(_evaluate, load_response(fixture)))
+        yield Benchmark(f"sensor_snapshot[{fixture}]", partial(_read_snapshot, load_response(fixture), 3))
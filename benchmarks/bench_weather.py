@@ -0,0 +1,66 @@
+"""Benchmarks for the weather entity."""
+
+from collections.abc import Iterator
+from functools import partial
+from types import SimpleNamespace
+from typing import Any, cast
+
+from homeassistant.const import CONF_NAME
+from homeassistant.helpers.device_registry import DeviceInfo
+
+from custom_components.knmi.const import DOMAIN
+from custom_components.knmi.coordinator import KnmiDataUpdateCoordinator
+from custom_components.knmi.weather import CONDITIONS_MAP, DESCRIPTIONS, KnmiWeather
+from weerlive import Response
+
+from .fixtures import FIXTURES, load_response
+from .runner import Benchmark
+
+# Dashboards, forecast subscriptions and service calls getting the forecasts after an update.
+SUBSCRIBERS = 50
+
+
+def create_weather(fixture: str) -> KnmiWeather:
+    """Return a weather entity with the response of a fixture, without setting up Home Assistant."""
+    coordinator = SimpleNamespace(
+        data=load_response(fixture),
+        config_entry=SimpleNamespace(entry_id="benchmark", data={CONF_NAME: "Benchmark"}),
+        site_id="benchmark",
+        location=None,
+        device_info=DeviceInfo(identifiers={(DOMAIN, "benchmark")}, name="Benchmark"),
+    )
+    return KnmiWeather(conf_name="Benchmark", coordinator=cast("KnmiDataUpdateCoordinator", coordinator), description=DESCRIPTIONS[0])
+
+
+def _map_conditions(weather: KnmiWeather, conditions: list[Any]) -> None:
+    """Map all conditions."""
+    for condition in conditions:
+        weather.map_condition(condition)
+
+
+async def _async_forecast_subscribers(weather: KnmiWeather, responses: list[Response]) -> None:
+    """Update the data, and get both forecasts for every subscriber."""
+    coordinator = cast("SimpleNamespace", weather.coordinator)
+    coordinator.data = responses[0] if coordinator.data is responses[1] else responses[1]
+    for _ in range(SUBSCRIBERS):
+        await weather.async_forecast_daily()
+        await weather.async_forecast_hourly()
+
+
+def benchmarks() -> Iterator[Benchmark]:
+    """Return the benchmarks of the forecasts for every fixture, and of mapping all conditions."""
+    for fixture in FIXTURES:
+        weather = create_weather(fixture)
+        response = weather.coordinator.data
+        # Building the forecasts, which happens once for every update of the data.
+        yield Benchmark(f"forecast_daily[{fixture}]", partial(weather._build_daily_forecast, response))  # noqa: SLF001
+        yield Benchmark(f"forecast_hourly[{fixture}]", partial(weather._build_hourly_forecast, response))  # noqa: SLF001
+
+    # Many subscribers after an update, only the first one builds the forecasts.
+    weather = create_weather(FIXTURES[0])
+    responses = [load_response(FIXTURES[0]), load_response(FIXTURES[0])]
+    yield Benchmark(f"forecast_subscribers[{SUBSCRIBERS}]", partial(_async_forecast_subscribers, weather, responses))
+
+    weather = create_weather(FIXTURES[0])
+    conditions = list(CONDITIONS_MAP)
+    yield Benchmark("map_condition", lambda: _map_conditions(weather, conditions))
@@ -0,0 +1,78 @@
+"""Comparison of benchmark results with a baseline."""
+
+import math
+from dataclasses import dataclass
+
+from .runner import BenchmarkResult
+
+# A slowdown is flagged when it's statistically significant and larger than the threshold.
+DEFAULT_ALPHA = 0.01
+DEFAULT_THRESHOLD = 0.05
+
+
+def mann_whitney_u(first: list[float], second: list[float]) -> float:
+    """Return the two-sided p-value of the Mann-Whitney U test, with the normal approximation."""
+    size_first = len(first)
+    size_second = len(second)
+    size = size_first + size_second
+    if not size_first or not size_second:
+        return 1.0
+
+    values = sorted([(value, 0) for value in first] + [(value, 1) for value in second])
+
+    # Tied values get the average of their ranks.
+    rank_sum_first = 0.0
+    tie_correction = 0.0
+    start = 0
+    while start < size:
+        end = start
+        while end + 1 < size and values[end + 1][0] == values[start][0]:
+            end += 1
+        ties = end - start + 1
+        rank = (start + end) / 2 + 1
+        rank_sum_first += rank * sum(1 for index in range(start, end + 1) if values[index][1] == 0)
+        tie_correction += ties**3 - ties
+        start = end + 1
+
+    u_first = rank_sum_first - size_first * (size_first + 1) / 2
+    mean = size_first * size_second / 2
+    variance = size_first * size_second / 12 * ((size + 1) - tie_correction / (size * (size - 1)))
+    if variance <= 0:
+        return 1.0
+
+    # Continuity correction.
+    z = max(0.0, abs(u_first - mean) - 0.5) / math.sqrt(variance)
+    return math.erfc(z / math.sqrt(2))
+
+
+@dataclass(frozen=True, slots=True)
+class Comparison:
+    """Comparison of a benchmark result with its baseline."""
+
+    name: str
+    baseline: float
+    current: float
+    p_value: float
+    regression: bool
+
+    @property
+    def change(self) -> float:
+        """Return the relative change of the median."""
+        return self.current / self.baseline - 1
+
+
+def compare(
+    baseline: BenchmarkResult,
+    current: BenchmarkResult,
+    alpha: float = DEFAULT_ALPHA,
+    threshold: float = DEFAULT_THRESHOLD,
+) -> Comparison:
+    """Compare a result with its baseline, and flag significant slowdowns."""
+    p_value = mann_whitney_u(baseline.samples, current.samples)
+    return Comparison(
+        name=current.name,
+        baseline=baseline.median,
+        current=current.median,
+        p_value=p_value,
+        regression=p_value < alpha and current.median > baseline.median * (1 + threshold),
+    )
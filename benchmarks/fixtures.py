@@ -0,0 +1,20 @@
+"""Fixtures for the benchmarks, shared with the tests."""
+
+from functools import cache
+from pathlib import Path
+
+from weerlive import Response
+
+FIXTURES_PATH = Path(__file__).parent.parent / "tests" / "fixtures"
+FIXTURES = sorted(path.name for path in FIXTURES_PATH.glob("*.json"))
+
+
+@cache
+def load_fixture(name: str) -> str:
+    """Return the content of a fixture."""
+    return (FIXTURES_PATH / name).read_text(encoding="utf-8")
+
+
+def load_response(name: str) -> Response:
+    """Return a new response parsed from a fixture."""
+    return Response.from_json(load_fixture(name))
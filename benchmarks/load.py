@@ -0,0 +1,184 @@
+"""Load harness, many config entries against the local Weerlive stand-in.
+
+Run it with `python -m benchmarks.load`, see `--help` for the options.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import random
+import tracemalloc
+from collections.abc import AsyncIterator
+from datetime import timedelta
+from typing import Any
+
+from aiohttp import ClientSession
+from homeassistant.const import CONF_API_KEY, CONF_LATITUDE, CONF_LONGITUDE, CONF_NAME
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_test_home_assistant
+
+from custom_components.knmi.const import CONF_GRID_SIZE, DEFAULT_GRID_SIZE, DOMAIN
+from custom_components.knmi.coordinator import KnmiDataUpdateCoordinator
+from custom_components.knmi.stats import KnmiTimingHistogram
+from weerlive import WeerliveApi
+
+from .stub_server import RedirectingSession, StubConfig, WeerliveStubServer
+
+# Entries are placed at random locations in the Netherlands.
+LATITUDE_RANGE = (50.8, 53.5)
+LONGITUDE_RANGE = (3.4, 7.2)
+LAG_INTERVAL = 0.01
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse the command line arguments."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load", description=__doc__)
+    parser.add_argument("--entries", type=int, default=100, help="number of config entries")
+    parser.add_argument("--rounds", type=int, default=5, help="updates of all entries")
+    parser.add_argument("--api-keys", type=int, default=0, help="number of API keys shared by the entries, 0 gives every entry its own")
+    parser.add_argument("--grid-size", type=float, default=DEFAULT_GRID_SIZE, help="grid size option of the entries")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds the stub takes to respond")
+    parser.add_argument("--jitter", type=float, default=0.05, help="random extra seconds the stub takes to respond")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="ratio of requests answered with a server error")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="ratio of requests answered with a rate limit error")
+    parser.add_argument("--seed", type=int, default=None, help="seed for the locations and the stub")
+    return parser.parse_args()
+
+
+def create_coordinators(hass: HomeAssistant, session: RedirectingSession, args: argparse.Namespace) -> list[KnmiDataUpdateCoordinator]:
+    """Create a coordinator for every entry.
+
+    The scan interval is zero, so every round makes new requests, entries with the same API key in the same grid cell still share them.
+    No entities listen, so the coordinators don't schedule updates themselves.
+    """
+    locations = random.Random(args.seed)  # noqa: S311
+    coordinators: list[KnmiDataUpdateCoordinator] = []
+
+    for index in range(args.entries):
+        api_key = f"key{index % args.api_keys if args.api_keys else index}"
+        config_entry = MockConfigEntry(
+            domain=DOMAIN,
+            entry_id=f"load_{index}",
+            data={
+                CONF_NAME: f"Load {index}",
+                CONF_API_KEY: api_key,
+                CONF_LATITUDE: round(locations.uniform(*LATITUDE_RANGE), 3),
+                CONF_LONGITUDE: round(locations.uniform(*LONGITUDE_RANGE), 3),
+            },
+            options={CONF_GRID_SIZE: args.grid_size},
+        )
+        config_entry.add_to_hass(hass)
+        coordinators.append(
+            KnmiDataUpdateCoordinator(
+                hass=hass,
+                client=WeerliveApi(api_key, session),
+                config_entry=config_entry,
+                update_interval=timedelta(0),
+            )
+        )
+
+    return coordinators
+
+
+async def _async_monitor_lag(histogram: KnmiTimingHistogram) -> None:
+    """Record how late the event loop wakes up a sleeping task."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(LAG_INTERVAL)
+        histogram.record(max(0.0, loop.time() - start - LAG_INTERVAL))
+
+
+async def _async_refresh(coordinator: KnmiDataUpdateCoordinator, histogram: KnmiTimingHistogram) -> None:
+    """Refresh a coordinator and record the duration."""
+    with histogram.measure():
+        await coordinator.async_refresh()
+
+
+@contextlib.asynccontextmanager
+async def async_stub_session(stub: WeerliveStubServer) -> AsyncIterator[RedirectingSession]:
+    """Return a client session that sends the requests of the API client to the stub."""
+    url = await stub.async_start()
+    try:
+        async with ClientSession() as session:
+            yield RedirectingSession(session, url)
+    finally:
+        await stub.async_stop()
+
+
+async def async_measure_timings(args: argparse.Namespace, stub_config: StubConfig) -> dict[str, Any]:
+    """Update all entries a number of rounds, and measure the event loop lag and update latency."""
+    stub = WeerliveStubServer(stub_config)
+    lag = KnmiTimingHistogram(window=1_000_000)
+    latency = KnmiTimingHistogram(window=args.entries * args.rounds)
+
+    async with async_test_home_assistant() as hass, async_stub_session(stub) as session:
+        coordinators = create_coordinators(hass, session, args)
+        monitor = asyncio.create_task(_async_monitor_lag(lag))
+        try:
+            for _ in range(args.rounds):
+                await asyncio.gather(*(_async_refresh(coordinator, latency) for coordinator in coordinators))
+        finally:
+            monitor.cancel()
+            for coordinator in coordinators:
+                await coordinator.async_shutdown()
+
+        successful = sum(coordinator.last_update_success for coordinator in coordinators)
+
+    return {
+        "event_loop_lag_ms": lag.as_dict() | {"max": lag.percentile_ms(100)},
+        "update_latency_ms": latency.as_dict(),
+        "successful_entries": successful,
+        "requests": stub.stats.requests,
+        "requests_per_entry": round(stub.stats.requests / args.entries, 3),
+        "requests_per_entry_per_round": round(stub.stats.requests / args.entries / args.rounds, 3),
+        "statuses": dict(stub.stats.statuses),
+    }
+
+
+async def async_measure_memory(args: argparse.Namespace, stub_config: StubConfig) -> dict[str, Any]:
+    """Measure the memory used per entry, after one update.
+
+    This runs separately from the timings, tracing memory slows everything down.
+    """
+    stub = WeerliveStubServer(stub_config)
+
+    async with async_test_home_assistant() as hass, async_stub_session(stub) as session:
+        tracemalloc.start()
+        try:
+            start, _ = tracemalloc.get_traced_memory()
+            coordinators = create_coordinators(hass, session, args)
+            await asyncio.gather(*(coordinator.async_refresh() for coordinator in coordinators))
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        for coordinator in coordinators:
+            await coordinator.async_shutdown()
+
+    return {
+        "memory_per_entry_kib": round((current - start) / args.entries / 1024, 1),
+        "memory_peak_kib": round((peak - start) / 1024, 1),
+    }
+
+
+async def async_main(args: argparse.Namespace) -> None:
+    """Run the load test and print the report."""
+    stub_config = StubConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        seed=args.seed,
+    )
+
+    report = await async_measure_timings(args, stub_config)
+    report |= await async_measure_memory(args, stub_config)
+
+    print(f"{args.entries} entries, {args.rounds} rounds")
+    for name, value in report.items():
+        print(f"{name:<30} {value}")
+
+
+if __name__ == "__main__":
+    asyncio.run(async_main(parse_args()))
@@ -0,0 +1,91 @@
+"""Benchmark runner for knmi."""
+
+import inspect
+import json
+import platform
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from statistics import median
+from typing import Any
+
+RESULTS_VERSION = 1
+# Minimum duration of a single sample, fast benchmarks are repeated until it's reached.
+MIN_SAMPLE_TIME = 0.01
+DEFAULT_ROUNDS = 30
+
+
+@dataclass(frozen=True, slots=True)
+class Benchmark:
+    """A named function to benchmark, sync or async."""
+
+    name: str
+    func: Callable[[], Any]
+
+
+@dataclass(frozen=True, slots=True)
+class BenchmarkResult:
+    """Durations of single calls of a benchmark, in seconds."""
+
+    name: str
+    samples: list[float]
+
+    @property
+    def median(self) -> float:
+        """Return the median duration."""
+        return median(self.samples)
+
+
+async def _async_time(func: Callable[[], Any], number: int) -> float:
+    """Return the total duration of calling the function a number of times."""
+    if inspect.iscoroutinefunction(func):
+        async_func: Callable[[], Awaitable[Any]] = func
+        start = time.perf_counter()
+        for _ in range(number):
+            await async_func()
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    return time.perf_counter() - start
+
+
+async def _async_calibrate(func: Callable[[], Any]) -> int:
+    """Return the number of calls needed for one sample, this also warms up the benchmark."""
+    number = 1
+    while True:
+        for factor in (1, 2, 5):
+            if await _async_time(func, number * factor) >= MIN_SAMPLE_TIME:
+                return number * factor
+        number *= 10
+
+
+async def async_run(benchmark: Benchmark, rounds: int = DEFAULT_ROUNDS) -> BenchmarkResult:
+    """Run a benchmark and return the duration of a single call for every round."""
+    number = await _async_calibrate(benchmark.func)
+    samples = [await _async_time(benchmark.func, number) / number for _ in range(rounds)]
+    return BenchmarkResult(name=benchmark.name, samples=samples)
+
+
+def save_results(path: Path, results: Iterable[BenchmarkResult]) -> None:
+    """Save results as a baseline."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    content = {
+        "version": RESULTS_VERSION,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "benchmarks": {result.name: {"samples": result.samples} for result in results},
+    }
+    path.write_text(json.dumps(content, indent=2), encoding="utf-8")
+
+
+def load_results(path: Path) -> dict[str, BenchmarkResult]:
+    """Load the results of a baseline."""
+    content = json.loads(path.read_text(encoding="utf-8"))
+    if content.get("version") != RESULTS_VERSION:
+        msg = f"Unsupported baseline version: {content.get('version')}"
+        raise ValueError(msg)
+
+    return {name: BenchmarkResult(name=name, samples=result["samples"]) for name, result in content["benchmarks"].items()}
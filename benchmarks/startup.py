@@ -0,0 +1,132 @@
+"""Startup harness, the import time of the integration and the setup time of its config entries.
+
+Run it with `python -m benchmarks.startup`, see `--help` for the options.
+"""
+
+import argparse
+import asyncio
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any
+from unittest.mock import patch
+
+from homeassistant import loader
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import CONF_API_KEY, CONF_LATITUDE, CONF_LONGITUDE, CONF_NAME
+from homeassistant.setup import async_setup_component
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_test_home_assistant
+
+from custom_components.knmi.const import DOMAIN
+
+from .load import async_stub_session
+from .stub_server import StubConfig, WeerliveStubServer
+
+# Modules of the integration Home Assistant imports to set up an entry.
+INTEGRATION_MODULES = (
+    "custom_components.knmi",
+    "custom_components.knmi.binary_sensor",
+    "custom_components.knmi.sensor",
+    "custom_components.knmi.weather",
+)
+# Modules Home Assistant has imported before it imports the integration and its platforms.
+PRELOADED_MODULES = (
+    "homeassistant.core",
+    "homeassistant.helpers.update_coordinator",
+    "homeassistant.components.binary_sensor",
+    "homeassistant.components.sensor",
+    "homeassistant.components.weather",
+)
+# Imports the preloaded modules given before `--`, then prints the seconds it takes to import the others.
+IMPORT_SCRIPT = """
+import importlib, sys, time
+separator = sys.argv.index("--")
+for module in sys.argv[1:separator]:
+    importlib.import_module(module)
+start = time.perf_counter()
+for module in sys.argv[separator + 1:]:
+    importlib.import_module(module)
+print(time.perf_counter() - start)
+"""
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse the command line arguments."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup", description=__doc__)
+    parser.add_argument("--entries", type=int, nargs="+", default=[1, 50], help="numbers of config entries to set up")
+    parser.add_argument("--rounds", type=int, default=5, help="samples per measurement, every sample starts from scratch")
+    return parser.parse_args()
+
+
+def measure_import(modules: tuple[str, ...] = INTEGRATION_MODULES, *, preload: bool) -> float:
+    """Return the seconds a new interpreter takes to import modules of the integration, optionally after the modules Home Assistant preloads."""
+    preloaded = PRELOADED_MODULES if preload else ()
+    output = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", IMPORT_SCRIPT, *preloaded, "--", *modules],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return float(output.stdout)
+
+
+async def async_measure_setup(entries: int) -> float:
+    """Return the seconds it takes to set up the integration with a number of entries, until their entities are added.
+
+    The data is fetched in the background after the setup, so the stub's latency isn't part of it.
+    """
+    stub = WeerliveStubServer(StubConfig())
+
+    async with async_test_home_assistant() as hass, async_stub_session(stub) as session:
+        # Allow custom integrations, like the `enable_custom_integrations` fixture.
+        hass.data.pop(loader.DATA_CUSTOM_COMPONENTS)
+        for index in range(entries):
+            MockConfigEntry(
+                domain=DOMAIN,
+                entry_id=f"startup_{index}",
+                data={
+                    CONF_NAME: f"Startup {index}",
+                    CONF_API_KEY: f"key{index}",
+                    CONF_LATITUDE: 52.0 + index / 1000,
+                    CONF_LONGITUDE: 5.0 + index / 1000,
+                },
+            ).add_to_hass(hass)
+
+        with patch("custom_components.knmi.async_get_clientsession", return_value=session):
+            start = time.perf_counter()
+            await async_setup_component(hass, DOMAIN, {})
+            await hass.async_block_till_done()
+            duration = time.perf_counter() - start
+
+        loaded = sum(entry.state is ConfigEntryState.LOADED for entry in hass.config_entries.async_entries(DOMAIN))
+        if loaded != entries:
+            msg = f"Only {loaded} of {entries} entries were set up"
+            raise RuntimeError(msg)
+
+    return duration
+
+
+def _summary(samples: list[float]) -> dict[str, Any]:
+    """Return the first and the median sample in milliseconds."""
+    return {"first_ms": round(samples[0] * 1000, 1), "median_ms": round(statistics.median(samples) * 1000, 1)}
+
+
+async def async_main(args: argparse.Namespace) -> None:
+    """Measure the import and setup times and print the report."""
+    report: dict[str, Any] = {
+        "import_cold": _summary([measure_import(preload=False) for _ in range(args.rounds)]),
+        "import_after_home_assistant": _summary([measure_import(preload=True) for _ in range(args.rounds)]),
+        # The component without its platforms, the modules needed for `async_setup`.
+        "import_component": _summary([measure_import(INTEGRATION_MODULES[:1], preload=True) for _ in range(args.rounds)]),
+    }
+    for entries in args.entries:
+        report[f"setup[{entries}]"] = _summary([await async_measure_setup(entries) for _ in range(args.rounds)])
+
+    print(f"{args.rounds} rounds, the first setup includes importing the platforms")
+    for name, value in report.items():
+        print(f"{name:<30} {value}")
+
+
+if __name__ == "__main__":
+    asyncio.run(async_main(parse_args()))
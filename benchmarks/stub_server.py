@@ -0,0 +1,142 @@
+"""Local stand-in for the Weerlive API, for load tests."""
+
+import asyncio
+import json
+import random
+import socket
+import time
+from collections import Counter
+from contextlib import AbstractAsyncContextManager
+from dataclasses import dataclass, field
+from typing import Any
+
+from aiohttp import ClientResponse, ClientSession, web
+from yarl import URL
+
+from .fixtures import load_fixture
+
+# Error body of Weerlive when the daily limit of an API key is reached.
+RATE_LIMIT_BODY = {"liveweer": [{"fout": "Dagelijkse limiet 300 verzoeken overschreden"}]}
+
+
+@dataclass(slots=True)
+class StubConfig:
+    """Behaviour of the stub server."""
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    # Daily limit per API key, the API responds with a rate limit error when it's reached.
+    max_requests: int = 300
+    # Serve this fixture as is, or generate a payload based on it when False.
+    fixture: str = "response.json"
+    static: bool = False
+    seed: int | None = None
+
+
+@dataclass(slots=True)
+class StubStats:
+    """Requests handled by the stub server."""
+
+    requests: int = 0
+    statuses: Counter[int] = field(default_factory=Counter)
+    keys: Counter[str] = field(default_factory=Counter)
+    locations: Counter[str] = field(default_factory=Counter)
+
+
+class WeerliveStubServer:
+    """Serve fixture or generated Weerlive payloads, with configurable latency, errors and rate limits."""
+
+    def __init__(self, config: StubConfig | None = None, host: str = "127.0.0.1", port: int = 0) -> None:
+        """Initialize the stub server."""
+        self.config = config or StubConfig()
+        self.stats = StubStats()
+        self._host = host
+        self._port = port
+        self._random = random.Random(self.config.seed)  # noqa: S311
+        self._template: dict[str, Any] = json.loads(load_fixture(self.config.fixture))
+        self._runner: web.AppRunner | None = None
+        self.url: URL | None = None
+
+    async def async_start(self) -> URL:
+        """Start serving, return the base URL."""
+        app = web.Application()
+        app.router.add_get("/{path:.*}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind((self._host, self._port))
+        site = web.SockSite(self._runner, sock)
+        await site.start()
+
+        self.url = URL.build(scheme="http", host=self._host, port=sock.getsockname()[1])
+        return self.url
+
+    async def async_stop(self) -> None:
+        """Stop serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        """Handle a request like the Weerlive endpoint does."""
+        key = request.query.get("key", "")
+        location = request.query.get("locatie", "")
+        self.stats.requests += 1
+        self.stats.keys[key] += 1
+        self.stats.locations[location] += 1
+
+        delay = self.config.latency + self._random.uniform(0, self.config.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+
+        roll = self._random.random()
+        if roll < self.config.error_rate:
+            return self._respond(web.Response(status=500, text="Internal Server Error"))
+        if roll < self.config.error_rate + self.config.rate_limit_rate or self.stats.keys[key] > self.config.max_requests:
+            return self._respond(web.json_response(RATE_LIMIT_BODY, status=429))
+
+        payload = self._template if self.config.static else self._generate(self.stats.keys[key])
+        return self._respond(web.json_response(payload))
+
+    def _respond(self, response: web.Response) -> web.Response:
+        """Count the status of a response."""
+        self.stats.statuses[response.status] += 1
+        return response
+
+    def _generate(self, used: int) -> dict[str, Any]:
+        """Return a payload based on the fixture, with changing weather and usage counters."""
+        payload = json.loads(json.dumps(self._template))
+        live = payload["liveweer"][0]
+        live["timestamp"] = int(time.time())
+        live["temp"] = round(live["temp"] + self._random.uniform(-1, 1), 1)
+        payload["api"][0]["rest_verz"] = max(0, self.config.max_requests - used)
+        return payload
+
+
+class RedirectingSession:
+    """Send the requests of a client session to another host, so the real API client can be used against the stub."""
+
+    def __init__(self, session: ClientSession, base_url: URL) -> None:
+        """Initialize the redirecting session."""
+        self._session = session
+        self._base_url = base_url
+
+    def _rewrite(self, url: str | URL) -> URL:
+        """Return the URL on the other host."""
+        url = URL(url)
+        return self._base_url.with_path(url.path).with_query(url.query)
+
+    def request(self, method: str, url: str | URL, **kwargs: object) -> AbstractAsyncContextManager[ClientResponse]:
+        """Make a request on the other host."""
+        return self._session.request(method, self._rewrite(url), **kwargs)
+
+    def get(self, url: str | URL, **kwargs: object) -> AbstractAsyncContextManager[ClientResponse]:
+        """Make a GET request on the other host."""
+        return self._session.get(self._rewrite(url), **kwargs)
+
+    def __getattr__(self, name: str) -> object:
+        """Pass everything else to the session."""
+        return getattr(self._session, name)
@@ -4,26 +4,52 @@ For more details about this integration, please refer to
 https://github.com/golles/ha-knmi/
 """
 
+import asyncio
 import logging
 from datetime import timedelta
+from typing import TYPE_CHECKING
 
+import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_API_KEY, CONF_SCAN_INTERVAL, Platform
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.typing import ConfigType
+from homeassistant.util import dt as dt_util
 
-from weerlive import WeerliveApi
+from .const import CONF_LOCATIONS, DEFAULT_SCAN_INTERVAL, DOMAIN
+from .locations import IMPORT_LOCATION_SCHEMA, KnmiLocation, site_coordinates
+from .services import async_setup_services
 
-from .const import DEFAULT_SCAN_INTERVAL, DOMAIN
-from .coordinator import KnmiDataUpdateCoordinator
+# The modules of the API client and the coordinator are only imported once an entry is set up.
+if TYPE_CHECKING:
+    from weerlive import WeerliveApi
+
+    from .coordinator import KnmiRuntimeData
+
+# Locations in the YAML configuration are imported as config entries.
+CONFIG_SCHEMA = vol.Schema({vol.Optional(DOMAIN): vol.All(cv.ensure_list, [IMPORT_LOCATION_SCHEMA])}, extra=vol.ALLOW_EXTRA)
 
 PLATFORMS: list[Platform] = [Platform.BINARY_SENSOR, Platform.SENSOR, Platform.WEATHER]
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
 
-async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry[KnmiDataUpdateCoordinator]) -> bool:
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the services of this integration, and import the locations of the YAML configuration."""
+    async_setup_services(hass)
+
+    if DOMAIN in config:
+        from .importer import async_import_locations  # noqa: PLC0415
+
+        hass.async_create_task(async_import_locations(hass, config[DOMAIN]), f"{DOMAIN} import")
+
+    return True
+
+
+async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry[KnmiRuntimeData]) -> bool:
     """Set up this integration using UI."""
     hass.data.setdefault(DOMAIN, {})
 
@@ -35,6 +61,10 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry[KnmiD
         msg = "Missing required configuration options: api_key."
         raise ValueError(msg)
 
+    from weerlive import WeerliveApi  # noqa: PLC0415
+
+    from .coordinator import KnmiDataUpdateCoordinator, KnmiRuntimeData  # noqa: PLC0415
+
     client = WeerliveApi(api_key, async_get_clientsession(hass))
 
     _LOGGER.debug(
@@ -42,32 +72,87 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry[KnmiD
         scan_interval_seconds,
     )
 
-    config_entry.runtime_data = coordinator = KnmiDataUpdateCoordinator(
+    if CONF_LOCATIONS in config_entry.data:
+        await _async_setup_fleet(hass, config_entry, client, scan_interval)
+        return True
+
+    coordinator = KnmiDataUpdateCoordinator(
         hass=hass,
         client=client,
         config_entry=config_entry,
         update_interval=scan_interval,
     )
+    config_entry.runtime_data = KnmiRuntimeData(coordinators=[coordinator], entry_data=dict(config_entry.data))
 
-    await coordinator.async_config_entry_first_refresh()
+    # Entities are unavailable until the first data arrives, so the setup doesn't wait for the API.
+    restored = await coordinator.async_restore()
+    if not restored or coordinator.fetched_at is None or dt_util.utcnow() - coordinator.fetched_at >= scan_interval:
+        config_entry.async_create_background_task(hass, coordinator.async_spread_refresh(), f"{DOMAIN} refresh {config_entry.entry_id}")
 
     await hass.config_entries.async_forward_entry_setups(config_entry, PLATFORMS)
-    config_entry.async_on_unload(config_entry.add_update_listener(async_reload_entry))
+    config_entry.async_on_unload(config_entry.add_update_listener(async_update_entry))
 
     return True
 
 
-async def async_unload_entry(hass: HomeAssistant, config_entry: ConfigEntry[KnmiDataUpdateCoordinator]) -> bool:
+async def _async_setup_fleet(hass: HomeAssistant, config_entry: ConfigEntry[KnmiRuntimeData], client: WeerliveApi, scan_interval: timedelta) -> None:
+    """Set up a multi-location entry, with a coordinator for every location and one scheduler refreshing them."""
+    from .coordinator import KnmiDataUpdateCoordinator, KnmiRuntimeData  # noqa: PLC0415
+    from .scheduler import KnmiFleetScheduler  # noqa: PLC0415
+
+    coordinators = [
+        KnmiDataUpdateCoordinator(
+            hass=hass,
+            client=client,
+            config_entry=config_entry,
+            update_interval=scan_interval,
+            location=KnmiLocation.from_dict(location),
+        )
+        for location in config_entry.data[CONF_LOCATIONS]
+    ]
+    scheduler = KnmiFleetScheduler(hass, config_entry, coordinators)
+    config_entry.runtime_data = KnmiRuntimeData(coordinators=coordinators, scheduler=scheduler, entry_data=dict(config_entry.data))
+
+    # Locations with a young enough stored response are only due after the scan interval.
+    restored = await asyncio.gather(*(coordinator.async_restore() for coordinator in coordinators))
+    for coordinator, is_restored in zip(coordinators, restored, strict=True):
+        if is_restored and coordinator.fetched_at is not None:
+            coordinator.next_update = coordinator.fetched_at + scan_interval
+
+    await hass.config_entries.async_forward_entry_setups(config_entry, PLATFORMS)
+    scheduler.async_start()
+    config_entry.async_on_unload(scheduler.async_stop)
+    config_entry.async_on_unload(config_entry.add_update_listener(async_update_entry))
+
+
+async def async_unload_entry(hass: HomeAssistant, config_entry: ConfigEntry[KnmiRuntimeData]) -> bool:
     """Unload a config entry."""
     return await hass.config_entries.async_unload_platforms(config_entry, PLATFORMS)
 
 
-async def async_reload_entry(hass: HomeAssistant, config_entry: ConfigEntry[KnmiDataUpdateCoordinator]) -> None:
-    """Reload config entry."""
-    await hass.config_entries.async_reload(config_entry.entry_id)
+async def async_remove_entry(hass: HomeAssistant, config_entry: ConfigEntry[KnmiRuntimeData]) -> None:
+    """Remove the stored responses of a removed config entry."""
+    from .store import KnmiResponseStore  # noqa: PLC0415
+
+    for site_id in site_coordinates(config_entry.entry_id, config_entry.data):
+        await KnmiResponseStore(hass, site_id).async_remove()
+
+
+async def async_update_entry(hass: HomeAssistant, config_entry: ConfigEntry[KnmiRuntimeData]) -> None:
+    """Apply changed options to the running coordinators, only reload the entry when its data changed."""
+    runtime_data = config_entry.runtime_data
+    if config_entry.data != runtime_data.entry_data:
+        await hass.config_entries.async_reload(config_entry.entry_id)
+        return
+
+    _LOGGER.debug("Applying options without a reload")
+    for coordinator in runtime_data.coordinators:
+        coordinator.async_apply_options()
+    if runtime_data.scheduler is not None:
+        runtime_data.scheduler.async_reschedule()
 
 
-async def async_migrate_entry(hass: HomeAssistant, config_entry: ConfigEntry[KnmiDataUpdateCoordinator]) -> bool:
+async def async_migrate_entry(hass: HomeAssistant, config_entry: ConfigEntry[KnmiRuntimeData]) -> bool:
     """Migrate old entry."""
     _LOGGER.debug("Migrating from version %s", config_entry.version)
 
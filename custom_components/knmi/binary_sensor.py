@@ -2,6 +2,7 @@
 
 from collections.abc import Callable
 from dataclasses import dataclass
+from typing import Any
 
 from homeassistant.components.binary_sensor import BinarySensorDeviceClass, BinarySensorEntity, BinarySensorEntityDescription
 from homeassistant.config_entries import ConfigEntry
@@ -12,8 +13,9 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from weerlive import Response
 
 from .const import DEFAULT_NAME
-from .coordinator import KnmiDataUpdateCoordinator
-from .entity import KnmiEntity, KnmiEntityDescription
+from .coordinator import KnmiDataUpdateCoordinator, KnmiRuntimeData
+from .entity import KnmiEntity, KnmiEntityDescription, location_conf_name
+from .snapshot import KnmiSnapshot
 
 
 @dataclass(kw_only=True, frozen=True)
@@ -54,22 +56,28 @@ DESCRIPTIONS: list[KnmiBinarySensorDescription] = [
 
 async def async_setup_entry(
     hass: HomeAssistant,
-    config_entry: ConfigEntry[KnmiDataUpdateCoordinator],
+    config_entry: ConfigEntry[KnmiRuntimeData],
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up KNMI binary sensors based on a config entry."""
     conf_name = config_entry.data.get(CONF_NAME, hass.config.location_name)
-    coordinator = config_entry.runtime_data
-
-    # Add all sensors described above.
-    entities: list[KnmiBinarySensor] = [
-        KnmiBinarySensor(
-            conf_name=conf_name,
-            coordinator=coordinator,
-            description=description,
+    entities: list[KnmiBinarySensor] = []
+
+    for coordinator in config_entry.runtime_data.coordinators:
+        # The entities of a location share one snapshot of their values.
+        snapshot = KnmiSnapshot()
+        location_name = location_conf_name(conf_name, coordinator)
+
+        # Add all sensors described above.
+        entities.extend(
+            KnmiBinarySensor(
+                conf_name=location_name,
+                coordinator=coordinator,
+                description=description,
+                snapshot=snapshot,
+            )
+            for description in DESCRIPTIONS
         )
-        for description in DESCRIPTIONS
-    ]
 
     async_add_entities(entities)
 
@@ -84,16 +92,25 @@ class KnmiBinarySensor(KnmiEntity, BinarySensorEntity):
         conf_name: str,
         coordinator: KnmiDataUpdateCoordinator,
         description: KnmiBinarySensorDescription,
+        snapshot: KnmiSnapshot,
     ) -> None:
         """Initialize KNMI binary sensor."""
         super().__init__(coordinator=coordinator)
 
-        self._attr_attribution = coordinator.data.api.source
         self._attr_unique_id = f"{DEFAULT_NAME}_{conf_name}_{description.key}".lower()
 
         self.entity_description = description
+        self._snapshot = snapshot
 
     @property
     def is_on(self) -> bool:
         """Return true if the binary sensor is on."""
-        return self.entity_description.value_fn(self.coordinator.data)
+        return self._snapshot.get(self.coordinator.data, self.entity_description).value
+
+    def _state_attributes(self) -> dict[str, Any]:
+        """Return the state attributes, from the snapshot of the data."""
+        return self._snapshot.get(self.coordinator.data, self.entity_description).attributes
+
+    def _state_values(self) -> tuple[Any, ...]:
+        """Return the value the state is computed from."""
+        return (self.is_on,)
@@ -8,10 +8,26 @@ from homeassistant.config_entries import SOURCE_RECONFIGURE, ConfigEntry, Config
 from homeassistant.const import CONF_API_KEY, CONF_LATITUDE, CONF_LONGITUDE, CONF_NAME, CONF_SCAN_INTERVAL
 from homeassistant.core import callback
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
-
-from weerlive import WeerliveApi, WeerliveAPIConnectionError, WeerliveAPIKeyError, WeerliveAPIRateLimitError
-
-from .const import DEFAULT_SCAN_INTERVAL, DOMAIN
+from homeassistant.helpers.selector import TextSelector, TextSelectorConfig
+
+from weerlive import Response, WeerliveApi, WeerliveAPIConnectionError, WeerliveAPIKeyError, WeerliveAPIRateLimitError
+
+from .const import (
+    CONF_CACHE_MAX_AGE,
+    CONF_GRID_SIZE,
+    CONF_LOCATIONS,
+    CONF_MAX_STALE_AGE,
+    CONF_MIN_REFRESH_AGE,
+    DEFAULT_CACHE_MAX_AGE,
+    DEFAULT_GRID_SIZE,
+    DEFAULT_MAX_STALE_AGE,
+    DEFAULT_MIN_REFRESH_AGE,
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+)
+from .locations import KnmiLocation, format_locations, parse_locations, site_coordinates
+from .registry import async_get_fetch_registry, snap_to_grid
+from .store import KnmiResponseStore
 
 CONFIG_SCHEMA = vol.Schema(
     {
@@ -22,14 +38,26 @@ CONFIG_SCHEMA = vol.Schema(
     }
 )
 
+FLEET_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_NAME): str,
+        vol.Required(CONF_API_KEY): str,
+        vol.Required(CONF_LOCATIONS): TextSelector(TextSelectorConfig(multiline=True)),
+    }
+)
+
 
 class KnmiFlowHandler(ConfigFlow, domain=DOMAIN):
     """Config flow for knmi."""
 
     VERSION = 2
 
-    async def async_step_user(self, user_input: dict[str, Any] | None = None) -> ConfigFlowResult:
-        """Handle a flow initialized by the user."""
+    async def async_step_user(self, _user_input: dict[str, Any] | None = None) -> ConfigFlowResult:
+        """Handle a flow initialized by the user, for one or many locations."""
+        return self.async_show_menu(step_id="user", menu_options=["location", "fleet"])
+
+    async def async_step_location(self, user_input: dict[str, Any] | None = None) -> ConfigFlowResult:
+        """Handle the setup of a single location."""
         errors = {}
         user_input = user_input or {}
 
@@ -39,29 +67,10 @@ class KnmiFlowHandler(ConfigFlow, domain=DOMAIN):
             latitude = user_input[CONF_LATITUDE]
             longitude = user_input[CONF_LONGITUDE]
 
-            try:
-                await self._validate_user_input(
-                    api_key,
-                    latitude,
-                    longitude,
-                )
-            except WeerliveAPIConnectionError:
-                errors["base"] = "general"
-            except WeerliveAPIKeyError:
-                errors["base"] = "api_key"
-            except WeerliveAPIRateLimitError:
-                errors["base"] = "daily_limit"
+            if (error := await self._async_validate(api_key, latitude, longitude)) is not None:
+                errors["base"] = error
             else:
-                if self.source == SOURCE_RECONFIGURE:
-                    return self.async_update_reload_and_abort(
-                        self._get_reconfigure_entry(),
-                        title=name,
-                        data=user_input,
-                    )
-                return self.async_create_entry(
-                    title=name,
-                    data=user_input,
-                )
+                return await self._async_create_or_update_entry(name, user_input)
 
         default_data = {
             CONF_NAME: self.hass.config.location_name,
@@ -69,7 +78,7 @@ class KnmiFlowHandler(ConfigFlow, domain=DOMAIN):
             CONF_LONGITUDE: self.hass.config.longitude,
         }
         return self.async_show_form(
-            step_id="user",
+            step_id="location",
             data_schema=self.add_suggested_values_to_schema(CONFIG_SCHEMA, default_data),
             description_placeholders={
                 "weerlive_url": "https://weerlive.nl/delen.php",
@@ -77,18 +86,101 @@ class KnmiFlowHandler(ConfigFlow, domain=DOMAIN):
             errors=errors,
         )
 
-    async def _validate_user_input(self, api_key: str, latitude: float, longitude: float) -> None:
+    async def async_step_fleet(self, user_input: dict[str, Any] | None = None) -> ConfigFlowResult:
+        """Handle the setup of many locations in one entry, the API key is validated with the first location."""
+        errors = {}
+        user_input = user_input or {}
+
+        if user_input:
+            name = user_input[CONF_NAME]
+            api_key = user_input[CONF_API_KEY]
+
+            try:
+                locations = parse_locations(user_input[CONF_LOCATIONS])
+            except vol.Invalid:
+                errors[CONF_LOCATIONS] = "invalid_locations"
+            else:
+                if (error := await self._async_validate(api_key, locations[0].latitude, locations[0].longitude)) is not None:
+                    errors["base"] = error
+                else:
+                    data = {**user_input, CONF_LOCATIONS: [location.as_dict() for location in locations]}
+                    return await self._async_create_or_update_entry(name, data)
+
+        return self.async_show_form(
+            step_id="fleet",
+            data_schema=self.add_suggested_values_to_schema(FLEET_SCHEMA, user_input or {CONF_NAME: self.hass.config.location_name}),
+            description_placeholders={
+                "weerlive_url": "https://weerlive.nl/delen.php",
+            },
+            errors=errors,
+        )
+
+    async def async_step_import(self, import_data: dict[str, Any]) -> ConfigFlowResult:
+        """Handle a location imported from the YAML configuration."""
+        self._async_abort_entries_match({CONF_LATITUDE: import_data[CONF_LATITUDE], CONF_LONGITUDE: import_data[CONF_LONGITUDE]})
+
+        if (error := await self._async_validate(import_data[CONF_API_KEY], import_data[CONF_LATITUDE], import_data[CONF_LONGITUDE])) is not None:
+            return self.async_abort(reason=error)
+
+        return self.async_create_entry(title=import_data[CONF_NAME], data=import_data)
+
+    async def _async_validate(self, api_key: str, latitude: float, longitude: float) -> str | None:
+        """Validate the API key and coordinates, return the error if they're not valid."""
+        try:
+            response = await self._validate_user_input(api_key, latitude, longitude)
+        except WeerliveAPIConnectionError:
+            return "general"
+        except WeerliveAPIKeyError:
+            return "api_key"
+        except WeerliveAPIRateLimitError:
+            return "daily_limit"
+
+        # The first update of the entry uses the validation response, instead of requesting it again.
+        options = self._get_reconfigure_entry().options if self.source == SOURCE_RECONFIGURE else {}
+        cell = snap_to_grid(latitude, longitude, float(options.get(CONF_GRID_SIZE, DEFAULT_GRID_SIZE)))
+        async_get_fetch_registry(self.hass).async_seed(api_key, cell, response)
+
+        return None
+
+    async def _validate_user_input(self, api_key: str, latitude: float, longitude: float) -> Response:
         """Validate user input."""
         session = async_get_clientsession(self.hass)
         client = WeerliveApi(api_key, session)
-        await client.latitude_longitude(latitude, longitude)
+        return await client.latitude_longitude(latitude, longitude)
+
+    async def _async_create_or_update_entry(self, name: str, data: dict[str, Any]) -> ConfigFlowResult:
+        """Create the entry, or update the entry being reconfigured."""
+        if self.source == SOURCE_RECONFIGURE:
+            entry = self._get_reconfigure_entry()
+            # Stored responses of moved locations would be restored after the reload, instead of the new data.
+            coordinates = site_coordinates(entry.entry_id, data)
+            for site_id, previous in site_coordinates(entry.entry_id, entry.data).items():
+                if coordinates.get(site_id) != previous:
+                    await KnmiResponseStore(self.hass, site_id).async_remove()
+
+            return self.async_update_reload_and_abort(
+                entry,
+                title=name,
+                data=data,
+            )
+        return self.async_create_entry(
+            title=name,
+            data=data,
+        )
 
     async def async_step_reconfigure(self, _: dict[str, Any] | None = None) -> ConfigFlowResult:
         """Handle reconfiguration."""
         data = self._get_reconfigure_entry().data.copy()
 
+        if CONF_LOCATIONS in data:
+            locations = [KnmiLocation.from_dict(location) for location in data[CONF_LOCATIONS]]
+            return self.async_show_form(
+                step_id="fleet",
+                data_schema=self.add_suggested_values_to_schema(FLEET_SCHEMA, {**data, CONF_LOCATIONS: format_locations(locations)}),
+            )
+
         return self.async_show_form(
-            step_id="user",
+            step_id="location",
             data_schema=self.add_suggested_values_to_schema(CONFIG_SCHEMA, data),
         )
 
@@ -114,7 +206,23 @@ class KnmiOptionsFlowHandler(OptionsFlow):
                     vol.Required(
                         CONF_SCAN_INTERVAL,
                         default=self.config_entry.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
-                    ): vol.All(vol.Coerce(int), vol.Range(min=300, max=86400))
+                    ): vol.All(vol.Coerce(int), vol.Range(min=300, max=86400)),
+                    vol.Required(
+                        CONF_GRID_SIZE,
+                        default=self.config_entry.options.get(CONF_GRID_SIZE, DEFAULT_GRID_SIZE),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0, max=1)),
+                    vol.Required(
+                        CONF_CACHE_MAX_AGE,
+                        default=self.config_entry.options.get(CONF_CACHE_MAX_AGE, DEFAULT_CACHE_MAX_AGE),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=86400)),
+                    vol.Required(
+                        CONF_MIN_REFRESH_AGE,
+                        default=self.config_entry.options.get(CONF_MIN_REFRESH_AGE, DEFAULT_MIN_REFRESH_AGE),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=3600)),
+                    vol.Required(
+                        CONF_MAX_STALE_AGE,
+                        default=self.config_entry.options.get(CONF_MAX_STALE_AGE, DEFAULT_MAX_STALE_AGE),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=86400)),
                 }
             ),
         )
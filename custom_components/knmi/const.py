@@ -6,6 +6,43 @@ from typing import Final
 DOMAIN: Final = "knmi"
 NAME: Final = "KNMI"
 
+# Config entry data.
+CONF_LOCATIONS: Final = "locations"
+
+# Options.
+CONF_GRID_SIZE: Final = "grid_size"
+CONF_CACHE_MAX_AGE: Final = "cache_max_age"
+CONF_MIN_REFRESH_AGE: Final = "min_refresh_age"
+CONF_MAX_STALE_AGE: Final = "max_stale_age"
+
 # Defaults
 DEFAULT_NAME: Final = NAME
 DEFAULT_SCAN_INTERVAL: Final = 300
+DEFAULT_GRID_SIZE: Final = 0.01
+DEFAULT_CACHE_MAX_AGE: Final = 3600
+DEFAULT_MIN_REFRESH_AGE: Final = 60
+DEFAULT_MAX_STALE_AGE: Final = 3600
+
+# Attributes.
+ATTR_DATA_AGE: Final = "data_age"
+ATTR_STALE: Final = "stale"
+
+# Services.
+SERVICE_REFRESH: Final = "refresh"
+ATTR_CONFIG_ENTRY_ID: Final = "config_entry_id"
+SERVICE_GET_RESAMPLED_FORECAST: Final = "get_resampled_forecast"
+ATTR_STEP: Final = "step"
+ATTR_EXTENDED: Final = "extended"
+# Steps in minutes of the resampled forecast.
+RESAMPLE_STEPS: Final = [5, 10, 15, 20, 30, 60]
+DEFAULT_RESAMPLE_STEP: Final = 15
+
+# Keys in hass.data[DOMAIN].
+DATA_FETCH_REGISTRY: Final = "fetch_registry"
+DATA_QUOTA: Final = "quota"
+DATA_PHASE_SPREADER: Final = "phase_spreader"
+DATA_UNMAPPED_CONDITIONS: Final = "unmapped_conditions"
+
+# Repair issues.
+ISSUE_UNMAPPED_CONDITIONS: Final = "unmapped_conditions"
+ISSUE_IMPORT_FAILED: Final = "import_failed"
@@ -1,25 +1,60 @@
 """DataUpdateCoordinator for knmi."""
 
+import asyncio
+import hashlib
 import logging
-from datetime import timedelta
-from typing import Self
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from functools import cached_property, partial
+from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_LATITUDE, CONF_LONGITUDE
-from homeassistant.core import HomeAssistant
+from homeassistant.const import CONF_API_KEY, CONF_LATITUDE, CONF_LONGITUDE, CONF_NAME, CONF_SCAN_INTERVAL
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
+from homeassistant.helpers.json import json_bytes
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
-from weerlive import Response, WeerliveApi
+from weerlive import Response, WeerliveApi, WeerliveAPIConnectionError, WeerliveAPIRateLimitError
 
-from .const import DOMAIN
+from .const import (
+    CONF_CACHE_MAX_AGE,
+    CONF_GRID_SIZE,
+    CONF_MAX_STALE_AGE,
+    CONF_MIN_REFRESH_AGE,
+    DEFAULT_CACHE_MAX_AGE,
+    DEFAULT_GRID_SIZE,
+    DEFAULT_MAX_STALE_AGE,
+    DEFAULT_MIN_REFRESH_AGE,
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+)
+from .locations import KnmiLocation
+from .quota import async_get_quota_budget
+from .registry import Cell, KnmiFetchResult, async_get_fetch_registry, snap_to_grid
+from .retry import RETRY_ATTEMPTS, RETRY_BASE_DELAY, KnmiCircuitBreaker, backoff_delay
+from .scheduler import PHASE_LOCK_SPREAD, STARTUP_SPREAD, KnmiFleetScheduler, KnmiPhaseLock, async_get_phase_spreader
+from .stats import KnmiUpdateStats
+from .store import KnmiResponseStore
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
+# Context of the listeners that are updated after every refresh, the others are only updated when the data changes.
+REFRESH_CONTEXT = "refresh"
+
+
+def response_fingerprint(response: Response) -> str:
+    """Return a fingerprint of the weather content of a response, the API usage counters are left out."""
+    content = response.to_dict()
+    content.pop("api", None)
+    return hashlib.blake2b(json_bytes(content), digest_size=16).hexdigest()
+
 
 class KnmiDataUpdateCoordinator(DataUpdateCoordinator[Response]):
     """Class to manage fetching data from the API."""
 
-    config_entry: ConfigEntry[Self]
+    config_entry: ConfigEntry[KnmiRuntimeData]
 
     def __init__(
         self,
@@ -27,28 +62,306 @@ class KnmiDataUpdateCoordinator(DataUpdateCoordinator[Response]):
         client: WeerliveApi,
         config_entry: ConfigEntry,
         update_interval: timedelta,
+        location: KnmiLocation | None = None,
     ) -> None:
-        """Initialize."""
+        """Initialize, the location is only given for the locations of a multi-location entry."""
         self.client = client
+        self.location = location
+        self.site_id = config_entry.entry_id if location is None else location.site_id(config_entry.entry_id)
+        self.fetch_registry = async_get_fetch_registry(hass)
+        self.api_key: str = config_entry.data.get(CONF_API_KEY, "")
+        self.quota = async_get_quota_budget(hass, self.api_key)
+        self.store = KnmiResponseStore(hass, self.site_id)
+        self.spreader = async_get_phase_spreader(hass)
+        self.spreader.add(self.site_id)
+        self.breaker = KnmiCircuitBreaker()
+        self.phase_lock = KnmiPhaseLock()
+        self.scan_interval = update_interval
+
+        self.fingerprint: str | None = None
+        self.fetched_at: datetime | None = None
+        self.last_checked: datetime | None = None
+        self.next_update: datetime | None = None
+        self.suppressed_updates = 0
+        self.stale = False
+        self.stats = KnmiUpdateStats()
+
+        self._refresh_task: asyncio.Task[None] | None = None
+        self._refresh_max_age: timedelta | None = None
 
         super().__init__(
             hass=hass,
             logger=_LOGGER,
             name=DOMAIN,
             config_entry=config_entry,
-            update_interval=update_interval,
+            # The locations of a multi-location entry are refreshed by the fleet scheduler, not by timers of their own.
+            update_interval=update_interval if location is None else None,
+            # Listeners are only notified when the returned data differs, see `_async_update_data`.
+            always_update=False,
+        )
+
+        if (cell := self._cell()) is not None:
+            self.quota.sites[self.site_id] = cell
+
+    async def async_shutdown(self) -> None:
+        """Cancel any scheduled call, and ignore new runs."""
+        await super().async_shutdown()
+        self.quota.sites.pop(self.site_id, None)
+        self.spreader.discard(self.site_id)
+
+    async def async_request_refresh(self) -> None:
+        """Request a refresh, concurrent requests share one refresh and recent data is not refreshed."""
+        min_age = timedelta(seconds=self.config_entry.options.get(CONF_MIN_REFRESH_AGE, DEFAULT_MIN_REFRESH_AGE))
+        if self.data is not None and self.fetched_at is not None and dt_util.utcnow() - self.fetched_at < min_age:
+            _LOGGER.debug("Data fetched at %s is recent enough, not refreshing", self.fetched_at)
+            return
+
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = self.hass.async_create_task(
+                self._async_manual_refresh(min_age),
+                f"{DOMAIN} refresh {self.site_id}",
+            )
+
+        await asyncio.shield(self._refresh_task)
+
+    async def _async_manual_refresh(self, max_age: timedelta) -> None:
+        """Refresh, only using a shared response when it is younger than the given age."""
+        self._refresh_max_age = max_age
+        try:
+            await self.async_refresh()
+        finally:
+            self._refresh_max_age = None
+
+    async def async_restore(self) -> bool:
+        """Use the stored response when it is young enough, return if it was used."""
+        max_age = timedelta(seconds=self.config_entry.options.get(CONF_CACHE_MAX_AGE, DEFAULT_CACHE_MAX_AGE))
+
+        result = await self.store.async_load()
+        if result is None or dt_util.utcnow() - result.fetched_at > max_age:
+            return False
+
+        _LOGGER.debug("Restored response fetched at %s", result.fetched_at)
+
+        self.fingerprint = response_fingerprint(result.response)
+        self.fetched_at = result.fetched_at
+        self.async_set_updated_data(result.response)
+        # Entries restored after a restart would otherwise all poll one interval after the start.
+        self._schedule_next_update()
+
+        return True
+
+    async def async_spread_refresh(self) -> None:
+        """Refresh after the share of the start-up spread of this coordinator, so entries don't all poll at once after a restart."""
+        await asyncio.sleep((STARTUP_SPREAD * self.spreader.fraction(self.site_id)).total_seconds())
+        await self.async_refresh()
+
+    @cached_property
+    def device_info(self) -> DeviceInfo:
+        """Return the device of the location, shared by its entities."""
+        return DeviceInfo(
+            configuration_url="https://weerlive.nl/api/toegang/account.php",
+            entry_type=DeviceEntryType.SERVICE,
+            identifiers={(DOMAIN, self.site_id)},
+            manufacturer="Weerlive",
+            name=self.config_entry.data.get(CONF_NAME) if self.location is None else self.location.name,
+            sw_version=None,
         )
 
+    @callback
+    def async_apply_options(self) -> None:
+        """Apply changed options without a reload, only the scan interval isn't read when it's used."""
+        self.scan_interval = timedelta(seconds=self.config_entry.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL))
+        self._schedule_next_update()
+        if self.location is None and self._listeners:
+            # The running timer still has the previous interval.
+            self._schedule_refresh()
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update all registered listeners, and time it."""
+        with self.stats.fan_out.measure():
+            super().async_update_listeners()
+
+    @callback
+    def async_update_refresh_listeners(self) -> None:
+        """Update the listeners with the refresh context, for a refresh the coordinator doesn't update its listeners for."""
+        with self.stats.fan_out.measure():
+            for update_callback, context in list(self._listeners.values()):
+                if context == REFRESH_CONTEXT:
+                    update_callback()
+
+    @property
+    def data_age(self) -> timedelta | None:
+        """Return the age of the data."""
+        if self.fetched_at is None:
+            return None
+        return dt_util.utcnow() - self.fetched_at
+
     async def _async_update_data(self) -> Response:
-        """Update data via library."""
+        """Update data via library, keep serving the last data for a while when that fails."""
+        try:
+            with self.stats.update.measure():
+                data = await self._async_update_response()
+        except UpdateFailed:
+            self.stats.record_outcome(success=False)
+            max_stale_age = timedelta(seconds=self.config_entry.options.get(CONF_MAX_STALE_AGE, DEFAULT_MAX_STALE_AGE))
+            data_age = self.data_age
+            if self.data is None or data_age is None or data_age > max_stale_age:
+                if not self.last_update_success:
+                    # The coordinator only updates its listeners for the first of repeated failures.
+                    self.async_update_refresh_listeners()
+                raise
+
+            _LOGGER.debug("Update failed, serving data of %s old", data_age)
+            self.stale = True
+            # The data doesn't change, so the entities are notified to update their data age.
+            self.async_update_listeners()
+            return self.data
+        else:
+            self.stats.record_outcome(success=True)
+
+        # The coordinator doesn't update its listeners when the data didn't change, unless the previous update failed.
+        if data is self.data and self.last_update_success:
+            if self.stale:
+                self.async_update_listeners()
+            else:
+                self.async_update_refresh_listeners()
+        self.stale = False
+
+        return data
+
+    def _coordinates(self) -> tuple[float, float] | None:
+        """Return the coordinates of the location."""
+        if self.location is not None:
+            return self.location.latitude, self.location.longitude
+
         latitude = self.config_entry.data.get(CONF_LATITUDE)
         longitude = self.config_entry.data.get(CONF_LONGITUDE)
-
         if latitude is None or longitude is None:
+            return None
+        return float(latitude), float(longitude)
+
+    def _cell(self) -> Cell | None:
+        """Return the grid cell of the location, locations in the same cell share requests."""
+        if (coordinates := self._coordinates()) is None:
+            return None
+        return snap_to_grid(*coordinates, float(self.config_entry.options.get(CONF_GRID_SIZE, DEFAULT_GRID_SIZE)))
+
+    async def _async_update_response(self) -> Response:
+        """Update the response via the library."""
+        coordinates = self._coordinates()
+        cell = self._cell()
+        if coordinates is None or cell is None:
             raise UpdateFailed
 
+        # The grid size option can change without a reload.
+        self.quota.sites[self.site_id] = cell
+
+        if self.quota.is_paused(dt_util.utcnow()):
+            self._schedule_next_update()
+            msg = f"Daily API limit reached, paused until {self.quota.paused_until}"
+            raise UpdateFailed(msg)
+
+        if not self.breaker.allow_request(dt_util.utcnow()):
+            self._schedule_next_update()
+            msg = f"Too many failed updates, paused until {self.breaker.opened_until}"
+            raise UpdateFailed(msg)
+
+        # Coordinators with the same API key in the same grid cell share a single request and response.
+        max_age = self.scan_interval if self._refresh_max_age is None else self._refresh_max_age
         try:
-            return await self.client.latitude_longitude(latitude=float(latitude), longitude=float(longitude))
+            result = await self.fetch_registry.async_fetch(
+                self.api_key,
+                cell,
+                max_age,
+                partial(self._async_fetch, *coordinates),
+            )
+        except WeerliveAPIRateLimitError as exception:
+            self.quota.async_pause(dt_util.utcnow())
+            self._schedule_next_update()
+            msg = f"Daily API limit reached, paused until {self.quota.paused_until}"
+            raise UpdateFailed(msg) from exception
         except Exception as exception:
             _LOGGER.warning("Failed to update data: %s", exception)
+            self.breaker.record_failure(dt_util.utcnow())
+            self._schedule_next_update()
             raise UpdateFailed from exception
+
+        with self.stats.process.measure():
+            return self._process_result(result)
+
+    def _process_result(self, result: KnmiFetchResult) -> Response:
+        """Process a fetched response, return the current data when the weather didn't change."""
+        self.breaker.record_success()
+        if result.response.api is not None:
+            self.quota.async_update(result.response.api.remaining_requests, result.fetched_at)
+        if result.response.live is not None:
+            self.phase_lock.observe(result.response.live.time, result.fetched_at)
+        self._schedule_next_update()
+
+        self.store.async_save(result)
+        self.fetched_at = result.fetched_at
+        self.last_checked = dt_util.utcnow()
+
+        fingerprint = self.fingerprint if result.response is self.data else response_fingerprint(result.response)
+        if self.data is not None and fingerprint == self.fingerprint:
+            # Returning the current data keeps the coordinator from notifying the entities, only the refresh listeners show the API usage.
+            self.data.api = result.response.api
+            self.suppressed_updates += 1
+            return self.data
+
+        self.fingerprint = fingerprint
+        return result.response
+
+    async def _async_fetch(self, latitude: float, longitude: float) -> Response:
+        """Fetch data from the API, with a few quick retries on connection errors."""
+        for attempt in range(RETRY_ATTEMPTS):
+            try:
+                with self.stats.fetch.measure():
+                    return await self.client.latitude_longitude(latitude=latitude, longitude=longitude)
+            except WeerliveAPIConnectionError as exception:
+                delay = backoff_delay(RETRY_BASE_DELAY, attempt)
+                _LOGGER.debug("Connection error, retrying in %.1f seconds: %s", delay.total_seconds(), exception)
+                self.breaker.retries += 1
+                await asyncio.sleep(delay.total_seconds())
+
+        with self.stats.fetch.measure():
+            return await self.client.latitude_longitude(latitude=latitude, longitude=longitude)
+
+    def _schedule_next_update(self) -> None:
+        """Set the interval until the next update.
+
+        The daily quota is spread over the day, failed updates are retried with a backoff
+        and otherwise polls are aligned to the moment Weerlive is expected to have new data.
+        """
+        now = dt_util.utcnow()
+        interval = self.quota.interval(self.scan_interval, now)
+
+        if self.quota.is_paused(now):
+            next_interval = interval
+        elif (retry_delay := self.breaker.retry_delay(now)) is not None:
+            next_interval = retry_delay
+        elif (next_poll := self.phase_lock.next_poll(now, interval)) is not None:
+            # All coordinators expect new data at the same moment, so their polls are spread over a window after it.
+            next_interval = next_poll - now + PHASE_LOCK_SPREAD * self.spreader.fraction(self.site_id)
+        else:
+            next_interval = self.spreader.next_poll(self.site_id, now, interval) - now
+
+        self.next_update = now + next_interval
+        if self.location is None:
+            self.update_interval = next_interval
+
+
+@dataclass(slots=True)
+class KnmiRuntimeData:
+    """Coordinators of a config entry, one for every location."""
+
+    coordinators: list[KnmiDataUpdateCoordinator]
+    scheduler: KnmiFleetScheduler | None = None
+    # The config entry data the coordinators were set up with, changing it needs a reload.
+    entry_data: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def coordinator(self) -> KnmiDataUpdateCoordinator:
+        """Return the coordinator of the first location, the only one of a single location entry."""
+        return self.coordinators[0]
@@ -1,20 +1,49 @@
 """Diagnostics support for knmi."""
 
+from typing import Any
+
 from homeassistant.components.diagnostics import async_redact_data
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_API_KEY, CONF_LATITUDE, CONF_LONGITUDE
 from homeassistant.core import HomeAssistant
 
-from .coordinator import KnmiDataUpdateCoordinator
+from .coordinator import KnmiDataUpdateCoordinator, KnmiRuntimeData
 
 TO_REDACT = {CONF_API_KEY, CONF_LATITUDE, CONF_LONGITUDE}
 
 
-async def async_get_config_entry_diagnostics(_hass: HomeAssistant, config_entry: ConfigEntry[KnmiDataUpdateCoordinator]) -> dict:
-    """Return diagnostics for a config entry."""
-    coordinator = config_entry.runtime_data
+async def async_get_config_entry_diagnostics(_hass: HomeAssistant, config_entry: ConfigEntry[KnmiRuntimeData]) -> dict:
+    """Return diagnostics for a config entry, with the diagnostics of every location of a multi-location entry."""
+    runtime_data = config_entry.runtime_data
+    diagnostics: dict[str, Any] = {"config_entry": async_redact_data(config_entry.as_dict(), TO_REDACT)}
+
+    if runtime_data.scheduler is None:
+        return diagnostics | _coordinator_diagnostics(runtime_data.coordinator)
+
+    return diagnostics | {
+        "scheduler": runtime_data.scheduler.as_dict(),
+        "locations": {coordinator.site_id: _coordinator_diagnostics(coordinator) for coordinator in runtime_data.coordinators},
+    }
+
 
+def _coordinator_diagnostics(coordinator: KnmiDataUpdateCoordinator) -> dict[str, Any]:
+    """Return diagnostics for a coordinator."""
     return {
-        "config_entry": async_redact_data(config_entry.as_dict(), TO_REDACT),
         "data": coordinator.data.to_dict() if coordinator.data else {},
+        "fetch_registry": coordinator.fetch_registry.as_dict(),
+        "updates": {
+            "last_checked": coordinator.last_checked,
+            "next_update": coordinator.next_update,
+            "phase": coordinator.spreader.fraction(coordinator.site_id),
+            "suppressed": coordinator.suppressed_updates,
+            "stale": coordinator.stale,
+            "data_age": coordinator.data_age.total_seconds() if coordinator.data_age else None,
+        },
+        "stats": coordinator.stats.as_dict(),
+        "circuit_breaker": coordinator.breaker.as_dict(),
+        "phase_lock": coordinator.phase_lock.as_dict(),
+        "quota": {
+            **coordinator.quota.as_dict(),
+            "update_interval": coordinator.update_interval.total_seconds() if coordinator.update_interval else None,
+        },
     }
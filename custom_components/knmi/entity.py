@@ -6,14 +6,13 @@ from collections.abc import Callable
 from dataclasses import dataclass
 from typing import Any
 
-from homeassistant.const import CONF_NAME
-from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
+from homeassistant.core import callback
 from homeassistant.helpers.entity import EntityDescription
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from weerlive import Response
 
-from .const import DOMAIN
+from .const import ATTR_DATA_AGE, ATTR_STALE
 from .coordinator import KnmiDataUpdateCoordinator
 
 
@@ -24,6 +23,13 @@ class KnmiEntityDescription(EntityDescription):
     state_attributes_fn: Callable[[Response], dict[str, Any]] = lambda _: {}
 
 
+def location_conf_name(conf_name: str, coordinator: KnmiDataUpdateCoordinator) -> str:
+    """Return the name the unique ids of the entities of a coordinator are based on, every location has its own."""
+    if coordinator.location is None:
+        return conf_name
+    return f"{conf_name}_{coordinator.location.key}"
+
+
 class KnmiEntity(CoordinatorEntity[KnmiDataUpdateCoordinator]):
     """Representation of a KNMI entity."""
 
@@ -31,25 +37,65 @@ class KnmiEntity(CoordinatorEntity[KnmiDataUpdateCoordinator]):
 
     _attr_has_entity_name = True
 
+    # Everything the state of the last write was computed from, to skip writes when nothing changed.
+    _written_state: tuple[Any, ...] | None = None
+
     def __init__(
         self,
         coordinator: KnmiDataUpdateCoordinator,
+        context: str | None = None,
     ) -> None:
-        """Initialize the KNMI entity."""
-        super().__init__(coordinator=coordinator)
+        """Initialize the KNMI entity, entities with the refresh context are updated after every refresh."""
+        super().__init__(coordinator=coordinator, context=context)
 
         self.coordinator = coordinator
 
-        self._attr_device_info = DeviceInfo(
-            configuration_url="https://weerlive.nl/api/toegang/account.php",
-            entry_type=DeviceEntryType.SERVICE,
-            identifiers={(DOMAIN, coordinator.config_entry.entry_id)},
-            manufacturer="Weerlive",
-            name=coordinator.config_entry.data.get(CONF_NAME),
-            sw_version=None,
-        )
+        # Built once per location, its entities share it.
+        self._attr_device_info = coordinator.device_info
+
+    async def async_added_to_hass(self) -> None:
+        """Compute the attributes of the first write."""
+        await super().async_added_to_hass()
+        self._written_state = self._compute_state()
 
     @property
-    def extra_state_attributes(self) -> dict[str, Any]:
-        """Return entity specific state attributes."""
+    def available(self) -> bool:
+        """Return if entity is available, data is received in the background after setup."""
+        return super().available and self.coordinator.data is not None
+
+    def _state_values(self) -> tuple[Any, ...]:
+        """Return the values the state and the state attributes of the platform are computed from."""
+        return (self.state, self.state_attributes)
+
+    def _extra_state_attributes(self) -> dict[str, Any]:
+        """Return entity specific state attributes, and the data age while the data is stale."""
+        attributes = self._state_attributes()
+        data_age = self.coordinator.data_age
+        if self.coordinator.stale and data_age is not None:
+            return {**attributes, ATTR_STALE: True, ATTR_DATA_AGE: int(data_age.total_seconds())}
+        return attributes
+
+    def _state_attributes(self) -> dict[str, Any]:
+        """Return the state attributes of the entity description."""
         return self.entity_description.state_attributes_fn(self.coordinator.data)
+
+    def _compute_state(self) -> tuple[Any, ...]:
+        """Compute the attributes the next write uses, return everything its state is computed from."""
+        if not self.available:
+            return (False,)
+
+        self._attr_extra_state_attributes = self._extra_state_attributes()
+        data = self.coordinator.data
+        self._attr_attribution = None if data is None or data.api is None else data.api.source
+        return (True, self._state_values(), self._attr_extra_state_attributes, self._attr_attribution)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data, the state is only written when it changed since the last write."""
+        written_state = self._compute_state()
+        if written_state == self._written_state:
+            self.coordinator.stats.skipped_writes += 1
+            return
+
+        self._written_state = written_state
+        self.async_write_ha_state()
@@ -0,0 +1,124 @@
+"""Resampling of the forecasts for knmi.
+
+The hourly forecast is interpolated to shorter steps, and the daily forecast is turned into an hourly
+series past the hourly forecast, with a diurnal temperature curve. Both only use the fetched data.
+"""
+
+import math
+from collections.abc import Callable, Iterable
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+HOUR = timedelta(hours=1)
+# Hours of the daily minimum and maximum temperature, in local time.
+DIURNAL_MIN_HOUR = 5
+DIURNAL_MAX_HOUR = 15
+
+
+@dataclass(slots=True, frozen=True)
+class ForecastPoint:
+    """Forecast at a point in time, in native units (°C, mm in the step, km/h)."""
+
+    datetime: str
+    condition: str | None
+    temperature: float | None
+    precipitation: float | None
+    precipitation_probability: int | None
+    wind_bearing: float | None
+    wind_speed: float | None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the point as a dict, for service responses."""
+        return asdict(self)
+
+
+def _interpolate(start: float | None, end: float | None, fraction: float) -> float | None:
+    """Return the linear interpolation between two values, the start value when one is missing."""
+    if start is None or end is None:
+        return start
+    return round(start + (end - start) * fraction, 1)
+
+
+def resample_hourly(hourly_forecast: Iterable[Any], step: timedelta, map_condition: Callable[[str | None], str | None]) -> list[ForecastPoint]:
+    """Return the hourly forecast in shorter steps.
+
+    Temperature and wind speed are interpolated linearly, precipitation is spread evenly over the hour
+    and the condition and wind bearing of the hour are kept.
+    """
+    hours = [hour for hour in hourly_forecast if hour.time is not None]
+    points: list[ForecastPoint] = []
+    steps_per_hour = max(1, HOUR // step)
+
+    for index, hour in enumerate(hours):
+        following = hours[index + 1] if index + 1 < len(hours) else hour
+        condition = map_condition(hour.image)
+        precipitation = None if hour.precipitation is None else round(hour.precipitation / steps_per_hour, 2)
+
+        for position in range(steps_per_hour):
+            fraction = position / steps_per_hour
+            points.append(
+                ForecastPoint(
+                    datetime=(hour.time + step * position).isoformat(),
+                    condition=condition,
+                    temperature=_interpolate(hour.temperature, following.temperature, fraction),
+                    precipitation=precipitation,
+                    precipitation_probability=None,
+                    wind_bearing=hour.wind_direction_degree,
+                    wind_speed=_interpolate(hour.wind_speed_kmh, following.wind_speed_kmh, fraction),
+                )
+            )
+
+    return points
+
+
+def diurnal_temperature(hour: int, minimum: float, maximum: float, previous_maximum: float, next_minimum: float) -> float:
+    """Return the temperature at an hour of the day.
+
+    The temperature follows a half cosine from the minimum at 05:00 to the maximum at 15:00, and from
+    there to the minimum of the next day. Before 05:00 it falls from the maximum of the previous day.
+    """
+    night = 24 - DIURNAL_MAX_HOUR + DIURNAL_MIN_HOUR
+    if hour < DIURNAL_MIN_HOUR:
+        start, end, fraction = previous_maximum, minimum, (hour + 24 - DIURNAL_MAX_HOUR) / night
+    elif hour <= DIURNAL_MAX_HOUR:
+        start, end, fraction = minimum, maximum, (hour - DIURNAL_MIN_HOUR) / (DIURNAL_MAX_HOUR - DIURNAL_MIN_HOUR)
+    else:
+        start, end, fraction = maximum, next_minimum, (hour - DIURNAL_MAX_HOUR) / night
+
+    return round(start + (end - start) * (1 - math.cos(math.pi * fraction)) / 2, 1)
+
+
+def extend_hourly(daily_forecast: Iterable[Any], after: datetime | None, map_condition: Callable[[str | None], str | None]) -> list[ForecastPoint]:
+    """Return an hourly series from the daily forecast, for the hours after the given time.
+
+    Days without a minimum or maximum temperature are skipped.
+    """
+    days = [day for day in daily_forecast if day.day is not None and day.min_temperature is not None and day.max_temperature is not None]
+    points: list[ForecastPoint] = []
+
+    for index, day in enumerate(days):
+        previous = days[index - 1] if index > 0 else day
+        following = days[index + 1] if index + 1 < len(days) else day
+        condition = map_condition(day.image)
+
+        for hour in range(24):
+            time = day.day + HOUR * hour
+            if after is not None and time <= after:
+                continue
+
+            points.append(
+                ForecastPoint(
+                    datetime=time.isoformat(),
+                    condition=condition,
+                    temperature=diurnal_temperature(
+                        hour, day.min_temperature, day.max_temperature, previous.max_temperature, following.min_temperature
+                    ),
+                    precipitation=None,
+                    precipitation_probability=day.precipitation_probability,
+                    wind_bearing=day.wind_direction_degree,
+                    wind_speed=day.wind_speed_kmh,
+                )
+            )
+
+    return points
@@ -0,0 +1,52 @@
+"""Import of locations from the YAML configuration for knmi."""
+
+import asyncio
+import logging
+from typing import Any
+
+from homeassistant.config_entries import SOURCE_IMPORT
+from homeassistant.const import CONF_LATITUDE, CONF_LONGITUDE, CONF_NAME
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResult, FlowResultType
+
+from .const import DOMAIN
+from .issues import async_report_import_failures
+
+# Locations validated at the same time by the import.
+IMPORT_CONCURRENCY = 4
+
+_LOGGER: logging.Logger = logging.getLogger(__package__)
+
+
+async def async_import_locations(hass: HomeAssistant, records: list[dict[str, Any]]) -> dict[str, str]:
+    """Start an import flow for every location, a few at a time, return the reasons of the ones that failed by name.
+
+    Locations with the coordinates of an earlier location are skipped, as are locations that already have an entry.
+    """
+    unique: dict[tuple[float, float], dict[str, Any]] = {}
+    for record in records:
+        coordinates = (record[CONF_LATITUDE], record[CONF_LONGITUDE])
+        if (previous := unique.get(coordinates)) is not None:
+            _LOGGER.warning("Skipping the import of %s, it has the coordinates of %s", record[CONF_NAME], previous[CONF_NAME])
+            continue
+        unique[coordinates] = record
+
+    semaphore = asyncio.Semaphore(IMPORT_CONCURRENCY)
+
+    async def import_location(record: dict[str, Any]) -> FlowResult:
+        async with semaphore:
+            return await hass.config_entries.flow.async_init(DOMAIN, context={"source": SOURCE_IMPORT}, data=record)
+
+    # A location that raises is a failure too, it doesn't abort the import of the others.
+    results = await asyncio.gather(*(import_location(record) for record in unique.values()), return_exceptions=True)
+    failures: dict[str, str] = {}
+    for record, result in zip(unique.values(), results, strict=True):
+        if isinstance(result, BaseException):
+            _LOGGER.error("Failed to import %s: %s", record[CONF_NAME], result)
+            failures[record[CONF_NAME]] = "unknown"
+        elif result["type"] is FlowResultType.ABORT and result["reason"] != "already_configured":
+            failures[record[CONF_NAME]] = result["reason"]
+    _LOGGER.debug("Imported %s locations, %s failed", len(unique) - len(failures), len(failures))
+
+    async_report_import_failures(hass, failures)
+    return failures
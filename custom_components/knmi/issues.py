@@ -0,0 +1,53 @@
+"""Repair issues for knmi."""
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import issue_registry as ir
+
+from .const import DATA_UNMAPPED_CONDITIONS, DOMAIN, ISSUE_IMPORT_FAILED, ISSUE_UNMAPPED_CONDITIONS
+
+ISSUES_URL = "https://github.com/golles/ha-knmi/issues"
+
+
+@callback
+def async_report_unmapped_condition(hass: HomeAssistant, value: str) -> bool:
+    """Record a weather condition that can't be mapped, return if it wasn't seen before.
+
+    The repair issue lists all conditions seen since Home Assistant started.
+    """
+    unmapped: set[str] = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_UNMAPPED_CONDITIONS, set())
+    if value in unmapped:
+        return False
+
+    unmapped.add(value)
+    ir.async_create_issue(
+        hass,
+        DOMAIN,
+        ISSUE_UNMAPPED_CONDITIONS,
+        is_fixable=False,
+        is_persistent=False,
+        learn_more_url=ISSUES_URL,
+        severity=ir.IssueSeverity.WARNING,
+        translation_key=ISSUE_UNMAPPED_CONDITIONS,
+        translation_placeholders={"conditions": ", ".join(sorted(f'"{condition}"' for condition in unmapped))},
+    )
+
+    return True
+
+
+@callback
+def async_report_import_failures(hass: HomeAssistant, failures: dict[str, str]) -> None:
+    """Report the locations of the YAML configuration that couldn't be imported, or clear the report when all succeeded."""
+    if not failures:
+        ir.async_delete_issue(hass, DOMAIN, ISSUE_IMPORT_FAILED)
+        return
+
+    ir.async_create_issue(
+        hass,
+        DOMAIN,
+        ISSUE_IMPORT_FAILED,
+        is_fixable=False,
+        is_persistent=False,
+        severity=ir.IssueSeverity.ERROR,
+        translation_key=ISSUE_IMPORT_FAILED,
+        translation_placeholders={"locations": ", ".join(f"{name} ({reason})" for name, reason in sorted(failures.items()))},
+    )
@@ -0,0 +1,98 @@
+"""Locations of a multi-location config entry for knmi."""
+
+from dataclasses import dataclass
+from typing import Any, Self
+
+import homeassistant.helpers.config_validation as cv
+import voluptuous as vol
+from homeassistant.const import CONF_API_KEY, CONF_LATITUDE, CONF_LONGITUDE, CONF_NAME
+from homeassistant.util import slugify
+
+from .const import CONF_LOCATIONS
+
+# Separator of the fields of a location, in the config flow.
+LOCATION_SEPARATOR = ","
+
+# A location of the YAML configuration, it's imported as a config entry.
+IMPORT_LOCATION_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_NAME): cv.string,
+        vol.Required(CONF_LATITUDE): cv.latitude,
+        vol.Required(CONF_LONGITUDE): cv.longitude,
+        vol.Required(CONF_API_KEY): cv.string,
+    }
+)
+
+
+@dataclass(slots=True, frozen=True)
+class KnmiLocation:
+    """A named location of a multi-location config entry."""
+
+    name: str
+    latitude: float
+    longitude: float
+
+    @property
+    def key(self) -> str:
+        """Return the key of the location, it's unique within the config entry."""
+        return slugify(self.name)
+
+    def site_id(self, entry_id: str) -> str:
+        """Return the id of the location, it's unique among all config entries."""
+        return f"{entry_id}_{self.key}"
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Self:
+        """Return the location from its config entry data."""
+        return cls(name=data[CONF_NAME], latitude=float(data[CONF_LATITUDE]), longitude=float(data[CONF_LONGITUDE]))
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the location as config entry data."""
+        return {CONF_NAME: self.name, CONF_LATITUDE: self.latitude, CONF_LONGITUDE: self.longitude}
+
+
+def parse_locations(text: str) -> list[KnmiLocation]:
+    """Return the locations of the lines of a text, a line is formatted as `name, latitude, longitude`.
+
+    Raises `vol.Invalid` for malformed lines, coordinates out of range and names that aren't unique.
+    """
+    locations: list[KnmiLocation] = []
+    keys: set[str] = set()
+
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+
+        name, separator, coordinates = line.strip().partition(LOCATION_SEPARATOR)
+        latitude, _, longitude = coordinates.partition(LOCATION_SEPARATOR)
+        if not separator or not name.strip():
+            msg = f"Invalid location: {line}"
+            raise vol.Invalid(msg)
+
+        location = KnmiLocation(name=name.strip(), latitude=cv.latitude(latitude.strip()), longitude=cv.longitude(longitude.strip()))
+        if not location.key or location.key in keys:
+            msg = f"Duplicate location: {location.name}"
+            raise vol.Invalid(msg)
+
+        keys.add(location.key)
+        locations.append(location)
+
+    if not locations:
+        msg = "No locations"
+        raise vol.Invalid(msg)
+
+    return locations
+
+
+def format_locations(locations: list[KnmiLocation]) -> str:
+    """Return the locations as text, one location per line."""
+    return "\n".join(f"{location.name}{LOCATION_SEPARATOR} {location.latitude}{LOCATION_SEPARATOR} {location.longitude}" for location in locations)
+
+
+def site_coordinates(entry_id: str, data: dict[str, Any]) -> dict[str, tuple[float | None, float | None]]:
+    """Return the coordinates of every location of config entry data, by site id."""
+    if CONF_LOCATIONS not in data:
+        return {entry_id: (data.get(CONF_LATITUDE), data.get(CONF_LONGITUDE))}
+
+    locations = [KnmiLocation.from_dict(location) for location in data[CONF_LOCATIONS]]
+    return {location.site_id(entry_id): (location.latitude, location.longitude) for location in locations}
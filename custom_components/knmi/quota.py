@@ -0,0 +1,123 @@
+"""Daily API quota accounting for knmi."""
+
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from .const import DATA_QUOTA, DOMAIN
+from .registry import Cell
+
+# Weerlive resets the daily quota at midnight, Dutch time.
+QUOTA_TIME_ZONE = dt_util.get_time_zone("Europe/Amsterdam")
+# Requests kept aside for manual refreshes and restarts.
+QUOTA_RESERVE = 5
+# Margin after the reset before polling again, to cope with clock differences.
+QUOTA_RESET_MARGIN = timedelta(minutes=1)
+
+
+def next_quota_reset(now: datetime) -> datetime:
+    """Return the moment the daily quota resets after `now`."""
+    tomorrow = now.astimezone(QUOTA_TIME_ZONE).date() + timedelta(days=1)
+    return datetime.combine(tomorrow, time.min, tzinfo=QUOTA_TIME_ZONE)
+
+
+@dataclass(slots=True)
+class KnmiQuotaBudget:
+    """Spread the remaining daily requests of one API key over the grid cells of the locations using it.
+
+    Locations in the same grid cell share their requests, so they only count once.
+    """
+
+    # Grid cell of every location using the API key, by site id.
+    sites: dict[str, Cell] = field(default_factory=dict)
+    remaining: int | None = None
+    updated_at: datetime | None = None
+    paused_until: datetime | None = None
+
+    _day: date | None = field(default=None, init=False, repr=False)
+    _first_remaining: int | None = field(default=None, init=False, repr=False)
+    _first_seen: datetime | None = field(default=None, init=False, repr=False)
+
+    @callback
+    def async_update(self, remaining: int | None, fetched_at: datetime) -> None:
+        """Record the remaining requests reported by the API."""
+        if remaining is None or (self.updated_at is not None and fetched_at <= self.updated_at):
+            return
+
+        day = fetched_at.astimezone(QUOTA_TIME_ZONE).date()
+        if day != self._day:
+            self._day = day
+            self._first_remaining = remaining
+            self._first_seen = fetched_at
+            self.paused_until = None
+
+        self.remaining = remaining
+        self.updated_at = fetched_at
+
+    @callback
+    def async_pause(self, now: datetime) -> None:
+        """Stop polling until the quota resets, after the API reported the limit was reached."""
+        self.remaining = 0
+        self.updated_at = now
+        self.paused_until = next_quota_reset(now) + QUOTA_RESET_MARGIN
+
+    def is_paused(self, now: datetime) -> bool:
+        """Return if polling is paused because the quota is used up."""
+        return self.paused_until is not None and now < self.paused_until
+
+    def interval(self, scan_interval: timedelta, now: datetime) -> timedelta:
+        """Return the interval that makes the remaining requests last until the reset."""
+        if self.paused_until is not None and now < self.paused_until:
+            return self.paused_until - now
+
+        if self.remaining is None:
+            return scan_interval
+
+        until_reset = next_quota_reset(now) - now
+        requests_per_cell = (self.remaining - QUOTA_RESERVE) / max(len(set(self.sites.values())), 1)
+
+        if requests_per_cell < 1:
+            return until_reset + QUOTA_RESET_MARGIN
+
+        return max(scan_interval, until_reset / requests_per_cell)
+
+    def projected_exhaustion(self, now: datetime | None = None) -> datetime | None:
+        """Return when the quota runs out at the rate it was used today."""
+        now = now or dt_util.utcnow()
+
+        if self.is_paused(now):
+            return self.updated_at
+
+        if self.remaining is None or self._first_remaining is None or self._first_seen is None or self.updated_at is None:
+            return None
+
+        used = self._first_remaining - self.remaining
+        elapsed = (self.updated_at - self._first_seen).total_seconds()
+        if used <= 0 or elapsed <= 0:
+            return None
+
+        return self.updated_at + timedelta(seconds=self.remaining * elapsed / used)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the budget for diagnostics."""
+        return {
+            "sites": len(self.sites),
+            "cells": len(set(self.sites.values())),
+            "remaining": self.remaining,
+            "updated_at": self.updated_at,
+            "paused_until": self.paused_until,
+            "projected_exhaustion": self.projected_exhaustion(),
+        }
+
+
+@callback
+def async_get_quota_budget(hass: HomeAssistant, api_key: str) -> KnmiQuotaBudget:
+    """Return the quota budget shared by all config entries using the API key."""
+    budgets: dict[str, KnmiQuotaBudget] = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_QUOTA, {})
+    if api_key not in budgets:
+        budgets[api_key] = KnmiQuotaBudget()
+
+    return budgets[api_key]
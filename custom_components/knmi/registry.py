@@ -0,0 +1,115 @@
+"""Shared Weerlive fetches for knmi."""
+
+import asyncio
+import math
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from weerlive import Response
+
+from .const import DATA_FETCH_REGISTRY, DOMAIN
+
+# Grid cell of coordinates, see `snap_to_grid`.
+Cell = tuple[float, float, float]
+
+# Responses fetched outside the registry, like the one validating the config flow, are only shared this long.
+SEED_MAX_AGE = timedelta(minutes=1)
+
+
+def snap_to_grid(latitude: float, longitude: float, grid_size: float) -> Cell:
+    """Return the grid cell the coordinates fall in, a grid size of 0 only matches identical coordinates."""
+    if grid_size <= 0:
+        return (0.0, latitude, longitude)
+
+    return (
+        grid_size,
+        round(math.floor(latitude / grid_size) * grid_size, 6),
+        round(math.floor(longitude / grid_size) * grid_size, 6),
+    )
+
+
+@dataclass(slots=True, frozen=True)
+class KnmiFetchResult:
+    """A Weerlive response and the moment it was fetched."""
+
+    response: Response
+    fetched_at: datetime
+    seeded: bool = False
+
+
+class KnmiFetchRegistry:
+    """Share one in-flight request and one cached response per API key and grid cell.
+
+    Responses aren't shared between API keys, so the remaining requests and rate limits of a response are those of the key using it.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize."""
+        self._hass = hass
+        self._cache: dict[tuple[str, Cell], KnmiFetchResult] = {}
+        self._inflight: dict[tuple[str, Cell], asyncio.Task[KnmiFetchResult]] = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    async def async_fetch(
+        self,
+        api_key: str,
+        cell: Cell,
+        max_age: timedelta,
+        fetch: Callable[[], Awaitable[Response]],
+    ) -> KnmiFetchResult:
+        """Return a response for the API key and cell, only calling `fetch` when there is no usable one."""
+        key = (api_key, cell)
+        cached = self._cache.get(key)
+        if cached is not None and dt_util.utcnow() - cached.fetched_at < (min(max_age, SEED_MAX_AGE) if cached.seeded else max_age):
+            self.hits += 1
+            return cached
+
+        if (task := self._inflight.get(key)) is not None:
+            self.hits += 1
+            return await asyncio.shield(task)
+
+        self.misses += 1
+        task = self._hass.async_create_task(self._async_fetch_and_cache(key, fetch), f"{DOMAIN} fetch {cell}")
+        if not task.done():
+            self._inflight[key] = task
+
+        return await asyncio.shield(task)
+
+    @callback
+    def async_seed(self, api_key: str, cell: Cell, response: Response) -> None:
+        """Share a response that was just fetched outside the registry, for a short while."""
+        self._cache[api_key, cell] = KnmiFetchResult(response=response, fetched_at=dt_util.utcnow(), seeded=True)
+
+    async def _async_fetch_and_cache(self, key: tuple[str, Cell], fetch: Callable[[], Awaitable[Response]]) -> KnmiFetchResult:
+        """Fetch a response and store it for the API key and cell."""
+        try:
+            result = KnmiFetchResult(response=await fetch(), fetched_at=dt_util.utcnow())
+            self._cache[key] = result
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the registry counters for diagnostics."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "cells": len(self._cache),
+        }
+
+
+@callback
+def async_get_fetch_registry(hass: HomeAssistant) -> KnmiFetchRegistry:
+    """Return the fetch registry shared by all config entries."""
+    domain_data: dict[str, Any] = hass.data.setdefault(DOMAIN, {})
+    if DATA_FETCH_REGISTRY not in domain_data:
+        domain_data[DATA_FETCH_REGISTRY] = KnmiFetchRegistry(hass)
+
+    return domain_data[DATA_FETCH_REGISTRY]
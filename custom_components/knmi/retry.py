@@ -0,0 +1,87 @@
+"""Retry policy and circuit breaker for knmi."""
+
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from enum import StrEnum
+from typing import Any
+
+# Quick retries within one update, for connection errors only.
+RETRY_ATTEMPTS = 2
+RETRY_BASE_DELAY = timedelta(seconds=2)
+# Delay before the next update after a failed one, doubled for every consecutive failure.
+BACKOFF_BASE_DELAY = timedelta(seconds=30)
+BACKOFF_MAX_DELAY = timedelta(hours=1)
+# Consecutive failed updates before the circuit breaker opens.
+BREAKER_THRESHOLD = 5
+
+
+def backoff_delay(base: timedelta, attempt: int, maximum: timedelta = BACKOFF_MAX_DELAY) -> timedelta:
+    """Return an exponential delay for the attempt (starting at 0), with jitter in its upper half."""
+    delay = min(maximum, base * 2**attempt)
+    return delay / 2 + delay * random.uniform(0, 0.5)  # noqa: S311
+
+
+class BreakerState(StrEnum):
+    """States of the circuit breaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+@dataclass(slots=True)
+class KnmiCircuitBreaker:
+    """Stop requests after repeated failures, and probe with a single request after a cooldown."""
+
+    state: BreakerState = BreakerState.CLOSED
+    failures: int = 0
+    opened_until: datetime | None = None
+    retries: int = 0
+    trips: int = 0
+
+    _retry_at: datetime | None = field(default=None, init=False, repr=False)
+
+    def allow_request(self, now: datetime) -> bool:
+        """Return if a request may be made, an open breaker lets one probe through after the cooldown."""
+        if self.state == BreakerState.OPEN:
+            if self.opened_until is not None and now < self.opened_until:
+                return False
+            self.state = BreakerState.HALF_OPEN
+
+        return True
+
+    def record_success(self) -> None:
+        """Close the breaker after a successful request."""
+        self.state = BreakerState.CLOSED
+        self.failures = 0
+        self.opened_until = None
+        self._retry_at = None
+
+    def record_failure(self, now: datetime) -> None:
+        """Register a failed update, and open the breaker when there were too many."""
+        self.failures += 1
+        delay = backoff_delay(BACKOFF_BASE_DELAY, self.failures - 1)
+
+        if self.state == BreakerState.HALF_OPEN or self.failures >= BREAKER_THRESHOLD:
+            self.state = BreakerState.OPEN
+            self.opened_until = now + delay
+            self.trips += 1
+
+        self._retry_at = now + delay
+
+    def retry_delay(self, now: datetime) -> timedelta | None:
+        """Return the delay before the next attempt after failures, None when there were none."""
+        if self._retry_at is None:
+            return None
+        return max(self._retry_at - now, timedelta(0))
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the breaker state for diagnostics."""
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "opened_until": self.opened_until,
+            "retries": self.retries,
+            "trips": self.trips,
+        }
@@ -0,0 +1,253 @@
+"""Poll scheduling for knmi."""
+
+import asyncio
+import hashlib
+import logging
+from bisect import insort
+from collections import deque
+from datetime import datetime, timedelta
+from itertools import pairwise
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.util import dt as dt_util
+
+from .const import DATA_PHASE_SPREADER, DOMAIN
+
+if TYPE_CHECKING:
+    from .coordinator import KnmiDataUpdateCoordinator
+
+_LOGGER: logging.Logger = logging.getLogger(__package__)
+
+# Upstream refreshes that are remembered, and needed before polls are aligned to them.
+PHASE_LOCK_HISTORY = 12
+PHASE_LOCK_MIN_OBSERVATIONS = 3
+# Margin on top of the learned publish delay, to cope with variation in it.
+PHASE_LOCK_MARGIN = timedelta(seconds=30)
+# The upstream refresh period is rounded to whole minutes.
+PHASE_LOCK_RESOLUTION = timedelta(minutes=1)
+# Window the first refreshes after a restart are spread over, and the polls just after an expected upstream refresh.
+STARTUP_SPREAD = timedelta(seconds=30)
+PHASE_LOCK_SPREAD = timedelta(seconds=60)
+# Poll slots are counted from the epoch, so they don't depend on when Home Assistant started.
+SLOT_EPOCH = datetime(1970, 1, 1, tzinfo=dt_util.UTC)
+# Locations of a multi-location entry that are refreshed at the same time, and the delay between their starts.
+FLEET_CONCURRENCY = 4
+FLEET_STAGGER = timedelta(seconds=0.25)
+
+
+class KnmiPhaseLock:
+    """Learn when Weerlive refreshes its data, to poll just after new data is expected."""
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self._refreshes: deque[datetime] = deque(maxlen=PHASE_LOCK_HISTORY)
+        self._publish_delay: timedelta | None = None
+
+    def observe(self, refreshed_at: datetime | None, seen_at: datetime) -> None:
+        """Record the upstream refresh time of a response, and when it was first seen."""
+        if refreshed_at is None or (self._refreshes and refreshed_at <= self._refreshes[-1]):
+            return
+
+        self._refreshes.append(refreshed_at)
+
+        # The shortest delay between a refresh and seeing it, is the closest to the real publish delay.
+        delay = max(seen_at - refreshed_at, timedelta(0))
+        if self._publish_delay is None or delay < self._publish_delay:
+            self._publish_delay = delay
+
+    @property
+    def period(self) -> timedelta | None:
+        """Return the learned upstream refresh period."""
+        if len(self._refreshes) < PHASE_LOCK_MIN_OBSERVATIONS:
+            return None
+
+        shortest = min(later - earlier for earlier, later in pairwise(self._refreshes))
+        return max(round(shortest / PHASE_LOCK_RESOLUTION), 1) * PHASE_LOCK_RESOLUTION
+
+    def next_poll(self, now: datetime, min_interval: timedelta) -> datetime | None:
+        """Return the first moment new data is expected, at least `min_interval` from now."""
+        if (period := self.period) is None or self._publish_delay is None:
+            return None
+
+        delay = min(self._publish_delay + PHASE_LOCK_MARGIN, period / 2)
+        expected = self._refreshes[-1] + delay
+        earliest = now + min_interval
+
+        if expected < earliest:
+            expected += -((expected - earliest) // period) * period
+
+        return expected
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the learned cadence for diagnostics."""
+        return {
+            "observations": len(self._refreshes),
+            "period": period.total_seconds() if (period := self.period) else None,
+            "publish_delay": self._publish_delay.total_seconds() if self._publish_delay is not None else None,
+        }
+
+
+def _phase_hash(site_id: str) -> int:
+    """Return a stable hash of a site id, the built-in hash of strings differs between runs."""
+    return int.from_bytes(hashlib.blake2b(site_id.encode(), digest_size=8).digest())
+
+
+class KnmiPhaseSpreader:
+    """Spread the polls of all coordinators of the domain evenly over the interval.
+
+    Coordinators are ordered by a hash of their id, and get a phase by their position. Adding or removing
+    one re-spreads the others, which follow the new phases from their next poll.
+    """
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self._site_ids: list[str] = []
+
+    def __len__(self) -> int:
+        """Return the number of coordinators."""
+        return len(self._site_ids)
+
+    def add(self, site_id: str) -> None:
+        """Add a coordinator."""
+        if site_id not in self._site_ids:
+            insort(self._site_ids, site_id, key=lambda item: (_phase_hash(item), item))
+
+    def discard(self, site_id: str) -> None:
+        """Remove a coordinator."""
+        if site_id in self._site_ids:
+            self._site_ids.remove(site_id)
+
+    def fraction(self, site_id: str) -> float:
+        """Return the phase of a coordinator, as a fraction of the interval."""
+        if site_id not in self._site_ids:
+            return 0.0
+        return self._site_ids.index(site_id) / len(self._site_ids)
+
+    def next_poll(self, site_id: str, now: datetime, interval: timedelta) -> datetime:
+        """Return the first poll slot of a coordinator at least half an interval from now.
+
+        Once polls are in their slot, the next slot is exactly one interval later.
+        """
+        earliest = now + interval / 2
+        offset = interval * self.fraction(site_id)
+        return earliest + (offset - (earliest - SLOT_EPOCH)) % interval
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the number of spread coordinators for diagnostics."""
+        return {"coordinators": len(self._site_ids)}
+
+
+@callback
+def async_get_phase_spreader(hass: HomeAssistant) -> KnmiPhaseSpreader:
+    """Return the phase spreader shared by all config entries."""
+    domain_data: dict[str, Any] = hass.data.setdefault(DOMAIN, {})
+    if DATA_PHASE_SPREADER not in domain_data:
+        domain_data[DATA_PHASE_SPREADER] = KnmiPhaseSpreader()
+
+    return domain_data[DATA_PHASE_SPREADER]
+
+
+class KnmiFleetScheduler:
+    """Refresh the locations of a multi-location entry from one timer.
+
+    The timer fires when the first location is due, the due locations are then refreshed a few at a time
+    with their starts spread out. Every location keeps its own quota, backoff and phase lock timing.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        config_entry: ConfigEntry,
+        coordinators: list[KnmiDataUpdateCoordinator],
+        concurrency: int = FLEET_CONCURRENCY,
+        stagger: timedelta = FLEET_STAGGER,
+    ) -> None:
+        """Initialize."""
+        self._hass = hass
+        self._config_entry = config_entry
+        self._coordinators = coordinators
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._stagger = stagger
+        self._unsub: CALLBACK_TYPE | None = None
+        self._stopped = False
+        self._running = False
+
+    @property
+    def next_update(self) -> datetime | None:
+        """Return when the timer fires."""
+        if self._stopped:
+            return None
+        return min((coordinator.next_update or dt_util.utcnow() for coordinator in self._coordinators), default=None)
+
+    @callback
+    def async_start(self) -> None:
+        """Start the timer, locations without data are due right away."""
+        self._stopped = False
+        self._schedule()
+
+    @callback
+    def async_reschedule(self) -> None:
+        """Schedule the timer again after the next updates of the locations changed."""
+        # A running refresh schedules the timer when it's done.
+        if not self._stopped and not self._running:
+            self._schedule()
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop the timer."""
+        self._stopped = True
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+
+    def _schedule(self) -> None:
+        """Schedule the timer for the first location that is due."""
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+
+        if (next_update := self.next_update) is not None:
+            self._unsub = async_track_point_in_utc_time(self._hass, self._handle_timer, next_update)
+
+    @callback
+    def _handle_timer(self, now: datetime) -> None:
+        """Refresh the locations that are due."""
+        self._unsub = None
+        self._running = True
+        due = [coordinator for coordinator in self._coordinators if coordinator.next_update is None or coordinator.next_update <= now]
+        _LOGGER.debug("Refreshing %s of %s locations", len(due), len(self._coordinators))
+        self._config_entry.async_create_background_task(
+            self._hass,
+            self._async_refresh(due),
+            f"{DOMAIN} fleet refresh {self._config_entry.entry_id}",
+        )
+
+    async def _async_refresh(self, coordinators: list[KnmiDataUpdateCoordinator]) -> None:
+        """Refresh locations a few at a time, and schedule the timer again."""
+        try:
+            await asyncio.gather(*(self._async_refresh_location(index, coordinator) for index, coordinator in enumerate(coordinators)))
+        finally:
+            self._running = False
+            if not self._stopped:
+                self._schedule()
+
+    async def _async_refresh_location(self, index: int, coordinator: KnmiDataUpdateCoordinator) -> None:
+        """Refresh a location after its share of the stagger."""
+        await asyncio.sleep(index * self._stagger.total_seconds())
+        async with self._semaphore:
+            started = dt_util.utcnow()
+            await coordinator.async_refresh()
+
+        # Updates that fail before scheduling themselves are retried after the scan interval.
+        if coordinator.next_update is None or coordinator.next_update <= started:
+            coordinator.next_update = started + coordinator.scan_interval
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the state of the scheduler for diagnostics."""
+        return {
+            "locations": len(self._coordinators),
+            "next_update": self.next_update,
+        }
@@ -3,10 +3,20 @@
 from collections.abc import Callable
 from dataclasses import dataclass
 from datetime import datetime
+from typing import Any
 
 from homeassistant.components.sensor import SensorDeviceClass, SensorEntity, SensorEntityDescription, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_NAME, PERCENTAGE, UnitOfIrradiance, UnitOfLength, UnitOfPressure, UnitOfSpeed, UnitOfTemperature
+from homeassistant.const import (
+    CONF_NAME,
+    PERCENTAGE,
+    UnitOfIrradiance,
+    UnitOfLength,
+    UnitOfPressure,
+    UnitOfSpeed,
+    UnitOfTemperature,
+    UnitOfTime,
+)
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
@@ -15,8 +25,10 @@ from homeassistant.helpers.typing import StateType
 from weerlive import Response
 
 from .const import DEFAULT_NAME
-from .coordinator import KnmiDataUpdateCoordinator
-from .entity import KnmiEntity, KnmiEntityDescription
+from .coordinator import REFRESH_CONTEXT, KnmiDataUpdateCoordinator, KnmiRuntimeData
+from .entity import KnmiEntity, KnmiEntityDescription, location_conf_name
+from .retry import BreakerState
+from .snapshot import KnmiSnapshot
 
 
 @dataclass(kw_only=True, frozen=True)
@@ -24,6 +36,16 @@ class KnmiSensorDescription(KnmiEntityDescription, SensorEntityDescription):
     """Class describing KNMI sensor entities."""
 
     value_fn: Callable[[Response], StateType | datetime | None]
+    # The API usage changes with every request, also when the weather didn't change and the entities aren't updated.
+    api_usage: bool = False
+
+
+@dataclass(kw_only=True, frozen=True)
+class KnmiCoordinatorSensorDescription(KnmiEntityDescription, SensorEntityDescription):
+    """Class describing KNMI sensor entities based on the coordinator state."""
+
+    value_fn: Callable[[KnmiDataUpdateCoordinator], StateType | datetime | None]
+    attributes_fn: Callable[[KnmiDataUpdateCoordinator], dict[str, Any]] = lambda _: {}
 
 
 DESCRIPTIONS: list[KnmiSensorDescription] = [
@@ -137,6 +159,7 @@ DESCRIPTIONS: list[KnmiSensorDescription] = [
         entity_category=EntityCategory.DIAGNOSTIC,
         translation_key="rest_verz",
         value_fn=lambda data: data.api.remaining_requests,
+        api_usage=True,
         entity_registry_enabled_default=False,
     ),
     KnmiSensorDescription(
@@ -199,25 +222,101 @@ DESCRIPTIONS: list[KnmiSensorDescription] = [
     ),
 ]
 
+COORDINATOR_DESCRIPTIONS: list[KnmiCoordinatorSensorDescription] = [
+    KnmiCoordinatorSensorDescription(
+        key="quota_exhausted_at",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        translation_key="quota_exhausted_at",
+        value_fn=lambda coordinator: coordinator.quota.projected_exhaustion(),
+        entity_registry_enabled_default=False,
+    ),
+    KnmiCoordinatorSensorDescription(
+        key="circuit_breaker",
+        device_class=SensorDeviceClass.ENUM,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        options=[state.value for state in BreakerState],
+        translation_key="circuit_breaker",
+        value_fn=lambda coordinator: coordinator.breaker.state,
+        attributes_fn=lambda coordinator: {
+            "failures": coordinator.breaker.failures,
+            "retries": coordinator.breaker.retries,
+            "trips": coordinator.breaker.trips,
+            "opened_until": coordinator.breaker.opened_until,
+        },
+        entity_registry_enabled_default=False,
+    ),
+    KnmiCoordinatorSensorDescription(
+        key="update_duration",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        translation_key="update_duration",
+        value_fn=lambda coordinator: coordinator.stats.update.percentile_ms(95),
+        attributes_fn=lambda coordinator: {
+            "p50": coordinator.stats.update.percentile_ms(50),
+            "p99": coordinator.stats.update.percentile_ms(99),
+            "fetch_p95": coordinator.stats.fetch.percentile_ms(95),
+            "process_p95": coordinator.stats.process.percentile_ms(95),
+            "fan_out_p95": coordinator.stats.fan_out.percentile_ms(95),
+        },
+        entity_registry_enabled_default=False,
+    ),
+    KnmiCoordinatorSensorDescription(
+        key="update_success_ratio",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        translation_key="update_success_ratio",
+        value_fn=lambda coordinator: None if coordinator.stats.success_ratio is None else round(coordinator.stats.success_ratio * 100, 1),
+        entity_registry_enabled_default=False,
+    ),
+    KnmiCoordinatorSensorDescription(
+        key="data_age",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        translation_key="data_age",
+        value_fn=lambda coordinator: None if coordinator.data_age is None else int(coordinator.data_age.total_seconds()),
+        entity_registry_enabled_default=False,
+    ),
+]
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
-    config_entry: ConfigEntry[KnmiDataUpdateCoordinator],
+    config_entry: ConfigEntry[KnmiRuntimeData],
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up KNMI sensors based on a config entry."""
     conf_name = config_entry.data.get(CONF_NAME, hass.config.location_name)
-    coordinator = config_entry.runtime_data
-
-    # Add all sensors described above.
-    entities: list[KnmiSensor] = [
-        KnmiSensor(
-            conf_name=conf_name,
-            coordinator=coordinator,
-            description=description,
+    entities: list[KnmiSensor | KnmiCoordinatorSensor] = []
+
+    for coordinator in config_entry.runtime_data.coordinators:
+        # The entities of a location share one snapshot of their values.
+        snapshot = KnmiSnapshot()
+        location_name = location_conf_name(conf_name, coordinator)
+
+        # Add all sensors described above.
+        entities.extend(
+            KnmiSensor(
+                conf_name=location_name,
+                coordinator=coordinator,
+                description=description,
+                snapshot=snapshot,
+            )
+            for description in DESCRIPTIONS
+        )
+        entities.extend(
+            KnmiCoordinatorSensor(
+                conf_name=location_name,
+                coordinator=coordinator,
+                description=description,
+            )
+            for description in COORDINATOR_DESCRIPTIONS
         )
-        for description in DESCRIPTIONS
-    ]
 
     async_add_entities(entities)
 
@@ -232,16 +331,62 @@ class KnmiSensor(KnmiEntity, SensorEntity):
         conf_name: str,
         coordinator: KnmiDataUpdateCoordinator,
         description: KnmiSensorDescription,
+        snapshot: KnmiSnapshot,
     ) -> None:
-        """Initialize KNMI sensor."""
-        super().__init__(coordinator=coordinator)
+        """Initialize KNMI sensor, a sensor of the API usage is updated after every refresh."""
+        super().__init__(coordinator=coordinator, context=REFRESH_CONTEXT if description.api_usage else None)
 
-        self._attr_attribution = self.coordinator.data.api.source
         self._attr_unique_id = f"{DEFAULT_NAME}_{conf_name}_{description.key}".lower()
 
         self.entity_description = description
+        self._snapshot = snapshot
 
     @property
     def native_value(self) -> StateType | datetime | None:
         """Return the state."""
-        return self.entity_description.value_fn(self.coordinator.data)
+        return self._snapshot.get(self.coordinator.data, self.entity_description).value
+
+    def _state_attributes(self) -> dict[str, Any]:
+        """Return the state attributes, from the snapshot of the data."""
+        return self._snapshot.get(self.coordinator.data, self.entity_description).attributes
+
+    def _state_values(self) -> tuple[Any, ...]:
+        """Return the value the state is computed from."""
+        return (self.native_value,)
+
+
+class KnmiCoordinatorSensor(KnmiEntity, SensorEntity):
+    """Defines a KNMI sensor based on the coordinator state."""
+
+    entity_description: KnmiCoordinatorSensorDescription
+
+    def __init__(
+        self,
+        conf_name: str,
+        coordinator: KnmiDataUpdateCoordinator,
+        description: KnmiCoordinatorSensorDescription,
+    ) -> None:
+        """Initialize KNMI coordinator sensor, it's updated after every refresh, also the ones that don't change the data."""
+        super().__init__(coordinator=coordinator, context=REFRESH_CONTEXT)
+
+        self._attr_unique_id = f"{DEFAULT_NAME}_{conf_name}_{description.key}".lower()
+
+        self.entity_description = description
+
+    @property
+    def available(self) -> bool:
+        """Return if entity is available, the coordinator state is also relevant when updates fail."""
+        return True
+
+    @property
+    def native_value(self) -> StateType | datetime | None:
+        """Return the state."""
+        return self.entity_description.value_fn(self.coordinator)
+
+    def _state_values(self) -> tuple[Any, ...]:
+        """Return the value the state is computed from."""
+        return (self.native_value,)
+
+    def _extra_state_attributes(self) -> dict[str, Any]:
+        """Return entity specific state attributes."""
+        return self.entity_description.attributes_fn(self.coordinator)
@@ -0,0 +1,87 @@
+"""Services for knmi."""
+
+import asyncio
+from typing import TYPE_CHECKING
+
+import homeassistant.helpers.config_validation as cv
+import voluptuous as vol
+from homeassistant.config_entries import ConfigEntry, ConfigEntryState
+from homeassistant.const import Platform
+from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse, callback
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import service
+
+from .const import (
+    ATTR_CONFIG_ENTRY_ID,
+    ATTR_EXTENDED,
+    ATTR_STEP,
+    DEFAULT_RESAMPLE_STEP,
+    DOMAIN,
+    RESAMPLE_STEPS,
+    SERVICE_GET_RESAMPLED_FORECAST,
+    SERVICE_REFRESH,
+)
+
+if TYPE_CHECKING:
+    from .coordinator import KnmiDataUpdateCoordinator, KnmiRuntimeData
+
+# Locations refreshed at the same time by the refresh service.
+REFRESH_CONCURRENCY = 4
+
+REFRESH_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): vol.All(cv.ensure_list, [cv.string]),
+    }
+)
+
+RESAMPLED_FORECAST_SCHEMA = {
+    vol.Optional(ATTR_STEP, default=DEFAULT_RESAMPLE_STEP): vol.All(vol.Coerce(int), vol.In(RESAMPLE_STEPS)),
+    vol.Optional(ATTR_EXTENDED, default=True): cv.boolean,
+}
+
+
+def _get_loaded_entries(hass: HomeAssistant, entry_ids: list[str] | None) -> list[ConfigEntry[KnmiRuntimeData]]:
+    """Return the requested loaded config entries, or all of them when none are requested."""
+    if entry_ids is None:
+        return [entry for entry in hass.config_entries.async_entries(DOMAIN) if entry.state is ConfigEntryState.LOADED]
+
+    entries: list[ConfigEntry[KnmiRuntimeData]] = []
+    for entry_id in entry_ids:
+        entry = hass.config_entries.async_get_entry(entry_id)
+        if entry is None or entry.domain != DOMAIN or entry.state is not ConfigEntryState.LOADED:
+            raise ServiceValidationError(
+                translation_domain=DOMAIN,
+                translation_key="entry_not_loaded",
+                translation_placeholders={"entry_id": entry_id},
+            )
+        entries.append(entry)
+
+    return entries
+
+
+async def _async_refresh(call: ServiceCall) -> None:
+    """Refresh the data of all locations of many config entries, a few at a time."""
+    entries = _get_loaded_entries(call.hass, call.data.get(ATTR_CONFIG_ENTRY_ID))
+    semaphore = asyncio.Semaphore(REFRESH_CONCURRENCY)
+
+    async def refresh(coordinator: KnmiDataUpdateCoordinator) -> None:
+        async with semaphore:
+            await coordinator.async_request_refresh()
+
+    await asyncio.gather(*(refresh(coordinator) for entry in entries for coordinator in entry.runtime_data.coordinators))
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Set up the services for knmi."""
+    hass.services.async_register(DOMAIN, SERVICE_REFRESH, _async_refresh, schema=REFRESH_SCHEMA)
+    # Registered once for the weather entities of all entries, instead of by the platform of every entry.
+    service.async_register_platform_entity_service(
+        hass,
+        DOMAIN,
+        SERVICE_GET_RESAMPLED_FORECAST,
+        entity_domain=Platform.WEATHER,
+        schema=RESAMPLED_FORECAST_SCHEMA,
+        func="async_get_resampled_forecast",
+        supports_response=SupportsResponse.ONLY,
+    )
@@ -0,0 +1,59 @@
+"""Snapshot of the entity values for knmi."""
+
+from collections.abc import Callable
+from typing import Any, NamedTuple, Protocol
+
+from weerlive import Response
+
+
+class KnmiSnapshotDescription(Protocol):
+    """Entity description with a value based on the data."""
+
+    @property
+    def key(self) -> str:
+        """Return the key of the description."""
+
+    @property
+    def value_fn(self) -> Callable[[Response], Any]:
+        """Return the function returning the value."""
+
+    @property
+    def state_attributes_fn(self) -> Callable[[Response], dict[str, Any]]:
+        """Return the function returning the state attributes."""
+
+
+class KnmiSnapshotValue(NamedTuple):
+    """Value and state attributes of an entity description."""
+
+    value: Any
+    attributes: dict[str, Any]
+
+
+class KnmiSnapshot:
+    """Values of the entity descriptions of a platform, evaluated once for every update of the data.
+
+    Only the descriptions that are read are evaluated, so disabled entities don't cost anything.
+    The API usage counters are copied into the current data when only they changed, that's an update too.
+    """
+
+    __slots__ = ("_api", "_data", "_values")
+
+    def __init__(self) -> None:
+        """Initialize the snapshot."""
+        self._data: Response | None = None
+        self._api: object | None = None
+        self._values: dict[str, KnmiSnapshotValue] = {}
+
+    def get(self, data: Response, description: KnmiSnapshotDescription) -> KnmiSnapshotValue:
+        """Return the value and attributes of the description for the data."""
+        if data is not self._data or data.api is not self._api:
+            self._data = data
+            self._api = data.api
+            self._values = {}
+
+        snapshot_value = self._values.get(description.key)
+        if snapshot_value is None:
+            snapshot_value = KnmiSnapshotValue(description.value_fn(data), description.state_attributes_fn(data))
+            self._values[description.key] = snapshot_value
+
+        return snapshot_value
@@ -0,0 +1,95 @@
+"""Update timing statistics for knmi."""
+
+import math
+import time
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+# Number of recent updates the statistics are based on.
+STATS_WINDOW = 100
+PERCENTILES = (50, 95, 99)
+
+
+class KnmiTimingHistogram:
+    """Rolling window of durations, with percentiles over the most recent ones."""
+
+    __slots__ = ("_samples",)
+
+    def __init__(self, window: int = STATS_WINDOW) -> None:
+        """Initialize the histogram."""
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        """Return the number of samples."""
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        """Record a duration."""
+        self._samples.append(seconds)
+
+    @contextmanager
+    def measure(self) -> Iterator[None]:
+        """Record the duration of the block, also when it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(time.perf_counter() - start)
+
+    def percentile(self, percentile: float) -> float | None:
+        """Return the nearest-rank percentile in seconds."""
+        if not self._samples:
+            return None
+        samples = sorted(self._samples)
+        return samples[max(0, math.ceil(percentile / 100 * len(samples)) - 1)]
+
+    def percentile_ms(self, percentile: float) -> float | None:
+        """Return the nearest-rank percentile in milliseconds."""
+        value = self.percentile(percentile)
+        return None if value is None else round(value * 1000, 3)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the percentiles in milliseconds, for diagnostics."""
+        return {"count": len(self._samples)} | {f"p{percentile}": self.percentile_ms(percentile) for percentile in PERCENTILES}
+
+
+@dataclass(slots=True)
+class KnmiUpdateStats:
+    """Timings of the stages of an update, and the outcome of recent updates.
+
+    The fetch stage includes parsing the response, the library does both in one call.
+    """
+
+    update: KnmiTimingHistogram = field(default_factory=KnmiTimingHistogram)
+    fetch: KnmiTimingHistogram = field(default_factory=KnmiTimingHistogram)
+    process: KnmiTimingHistogram = field(default_factory=KnmiTimingHistogram)
+    fan_out: KnmiTimingHistogram = field(default_factory=KnmiTimingHistogram)
+    # State writes of entities skipped because nothing changed.
+    skipped_writes: int = 0
+
+    _outcomes: deque[bool] = field(default_factory=lambda: deque(maxlen=STATS_WINDOW), init=False, repr=False)
+
+    def record_outcome(self, *, success: bool) -> None:
+        """Record if an update succeeded."""
+        self._outcomes.append(success)
+
+    @property
+    def success_ratio(self) -> float | None:
+        """Return the ratio of recent updates that succeeded."""
+        if not self._outcomes:
+            return None
+        return sum(self._outcomes) / len(self._outcomes)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistics, for diagnostics."""
+        return {
+            "update": self.update.as_dict(),
+            "fetch": self.fetch.as_dict(),
+            "process": self.process.as_dict(),
+            "fan_out": self.fan_out.as_dict(),
+            "success_ratio": self.success_ratio,
+            "skipped_writes": self.skipped_writes,
+        }
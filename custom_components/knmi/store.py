@@ -0,0 +1,59 @@
+"""Persistent response cache for knmi."""
+
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from weerlive import Response
+
+from .const import DOMAIN
+from .registry import KnmiFetchResult
+
+_LOGGER: logging.Logger = logging.getLogger(__package__)
+
+STORAGE_VERSION = 1
+# Writes are delayed and coalesced, the store is always flushed when Home Assistant stops.
+STORAGE_SAVE_DELAY = 900
+
+
+class KnmiResponseStore:
+    """Keep the last good response of a config entry on disk."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize."""
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}")
+
+    async def async_load(self) -> KnmiFetchResult | None:
+        """Return the stored response, if there is a valid one."""
+        if not (data := await self._store.async_load()):
+            return None
+
+        try:
+            fetched_at = dt_util.parse_datetime(data["fetched_at"])
+            response = Response.from_dict(data["response"])
+        except (KeyError, TypeError, ValueError) as exception:
+            _LOGGER.debug("Ignoring stored response: %s", exception)
+            return None
+
+        if fetched_at is None:
+            return None
+
+        return KnmiFetchResult(response=response, fetched_at=fetched_at)
+
+    @callback
+    def async_save(self, result: KnmiFetchResult) -> None:
+        """Schedule saving the response."""
+        self._store.async_delay_save(
+            lambda: {
+                "fetched_at": result.fetched_at.isoformat(),
+                "response": result.response.to_dict(),
+            },
+            STORAGE_SAVE_DELAY,
+        )
+
+    async def async_remove(self) -> None:
+        """Remove the stored response."""
+        await self._store.async_remove()
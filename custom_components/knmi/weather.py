@@ -1,7 +1,14 @@
 """Weather platform for knmi."""
 
 import logging
+import math
+from collections import Counter
+from collections.abc import Callable
 from dataclasses import dataclass
+from datetime import timedelta
+from functools import lru_cache
+from statistics import fmean
+from typing import Any, Literal
 
 from homeassistant.components.weather import (
     ATTR_CONDITION_CLEAR_NIGHT,
@@ -21,17 +28,25 @@ from homeassistant.components.weather import (
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_NAME, UnitOfLength, UnitOfPressure, UnitOfSpeed, UnitOfTemperature
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, ServiceResponse, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .const import DEFAULT_NAME
-from .coordinator import KnmiDataUpdateCoordinator
-from .entity import KnmiEntity, KnmiEntityDescription
+from weerlive import Response
+
+from .const import DEFAULT_NAME, DOMAIN
+from .coordinator import KnmiDataUpdateCoordinator, KnmiRuntimeData
+from .entity import KnmiEntity, KnmiEntityDescription, location_conf_name
+from .forecast import extend_hourly, resample_hourly
+from .issues import async_report_unmapped_condition
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
 SNOW_TO_RAIN_TEMP_CELSIUS = 6
 
+ForecastType = Literal["daily", "hourly", "twice_daily"]
+# Forecasts built from the data, and compared after every update.
+FORECAST_TYPES: tuple[ForecastType, ...] = ("daily", "hourly", "twice_daily")
+
 
 @dataclass(kw_only=True, frozen=True)
 class KnmiWeatherDescription(KnmiEntityDescription, WeatherEntityDescription):
@@ -67,24 +82,56 @@ CONDITIONS_MAP = {
     "-": None,
     "_": None,
 }
+# Night variants of conditions start or end with this.
+NIGHT = "nacht"
+# Shorter known conditions aren't used for the fallback by prefix.
+MIN_PREFIX_LENGTH = 3
+
+
+@lru_cache(maxsize=64)
+def fallback_condition(value: str | None) -> str | None:
+    """Map an unknown condition by its day or night variant, or by the longest known condition it starts with."""
+    if not value:
+        return None
+
+    night = value.startswith(NIGHT) or value.endswith(NIGHT)
+    stripped = value.removeprefix(NIGHT).removesuffix(NIGHT)
+    if stripped in CONDITIONS_MAP:
+        condition = CONDITIONS_MAP[stripped]
+    else:
+        prefixes = [known for known in CONDITIONS_MAP if len(known) >= MIN_PREFIX_LENGTH and stripped.startswith(known)]
+        condition = CONDITIONS_MAP[max(prefixes, key=len)] if prefixes else None
+
+    if night and condition == ATTR_CONDITION_SUNNY:
+        return ATTR_CONDITION_CLEAR_NIGHT
+    return condition
+
+
+def mean_bearing(bearings: list[float]) -> float | None:
+    """Return the circular mean of wind bearings in degrees, or None when they cancel out."""
+    x = sum(math.cos(math.radians(bearing)) for bearing in bearings)
+    y = sum(math.sin(math.radians(bearing)) for bearing in bearings)
+    if math.isclose(x, 0, abs_tol=1e-9) and math.isclose(y, 0, abs_tol=1e-9):
+        return None
+    return round(math.degrees(math.atan2(y, x))) % 360
 
 
 async def async_setup_entry(
     hass: HomeAssistant,
-    config_entry: ConfigEntry[KnmiDataUpdateCoordinator],
+    config_entry: ConfigEntry[KnmiRuntimeData],
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up KNMI weather based on a config entry."""
     conf_name = config_entry.data.get(CONF_NAME, hass.config.location_name)
-    coordinator = config_entry.runtime_data
 
-    # Add all sensors described above.
+    # Add all sensors described above, for every location.
     entities: list[KnmiWeather] = [
         KnmiWeather(
-            conf_name=conf_name,
+            conf_name=location_conf_name(conf_name, coordinator),
             coordinator=coordinator,
             description=description,
         )
+        for coordinator in config_entry.runtime_data.coordinators
         for description in DESCRIPTIONS
     ]
 
@@ -100,7 +147,7 @@ class KnmiWeather(KnmiEntity, WeatherEntity):
     _attr_native_temperature_unit = UnitOfTemperature.CELSIUS
     _attr_native_visibility_unit = UnitOfLength.METERS
     _attr_native_wind_speed_unit = UnitOfSpeed.KILOMETERS_PER_HOUR
-    _attr_supported_features = WeatherEntityFeature.FORECAST_DAILY | WeatherEntityFeature.FORECAST_HOURLY
+    _attr_supported_features = WeatherEntityFeature.FORECAST_DAILY | WeatherEntityFeature.FORECAST_HOURLY | WeatherEntityFeature.FORECAST_TWICE_DAILY
 
     def __init__(
         self,
@@ -111,18 +158,30 @@ class KnmiWeather(KnmiEntity, WeatherEntity):
         """Initialize KNMI weather entity."""
         super().__init__(coordinator=coordinator)
 
-        self._attr_attribution = self.coordinator.data.api.source
         self._attr_unique_id = f"{DEFAULT_NAME}_{conf_name}".lower()
 
         self.entity_description = description
 
+        self._forecast_builders: dict[ForecastType, Callable[[Response], list[Forecast]]] = {
+            "daily": self._build_daily_forecast,
+            "hourly": self._build_hourly_forecast,
+            "twice_daily": self._build_twice_daily_forecast,
+        }
+        # Built forecasts, with the data they were built from.
+        self._forecasts: dict[ForecastType, tuple[Response, list[Forecast]]] = {}
+        self._resampled: dict[tuple[int, bool], tuple[Response, list[dict[str, Any]]]] = {}
+
     def map_condition(self, value: str | None) -> str | None:
-        """Map weather conditions from KNMI to HA."""
-        try:
-            return CONDITIONS_MAP[value]  # type: ignore  # noqa: PGH003
-        except KeyError:
-            _LOGGER.exception('Weather condition "%s" can\'t be mapped, please raise a bug', value)
-        return None
+        """Map weather conditions from KNMI to HA, unknown conditions are logged once."""
+        if not value:
+            return None
+        if value in CONDITIONS_MAP:
+            return CONDITIONS_MAP[value]
+
+        condition = fallback_condition(value)
+        if async_report_unmapped_condition(self.coordinator.hass, value):
+            _LOGGER.warning('Weather condition "%s" can\'t be mapped, please raise a bug. Using "%s" instead', value, condition)
+        return condition
 
     @property
     def condition(self) -> str | None:
@@ -177,11 +236,59 @@ class KnmiWeather(KnmiEntity, WeatherEntity):
         """Return the visibility in native units."""
         return self.coordinator.data.live.visibility
 
+    def _state_values(self) -> tuple[Any, ...]:
+        """Return the live data the state and the state attributes are computed from."""
+        return (self.coordinator.data.live,)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data, forecast listeners are only notified of the forecasts that changed.
+
+        Only forecasts with listeners are built here, the others are built when they're requested.
+        """
+        changed: list[ForecastType] = []
+        for forecast_type in FORECAST_TYPES:
+            if not self._forecast_listeners.get(forecast_type):
+                continue
+            previous = self._forecasts.get(forecast_type)
+            if self._cached_forecast(forecast_type) != (previous[1] if previous else None):
+                changed.append(forecast_type)
+
+        super()._handle_coordinator_update()
+
+        if changed:
+            self.coordinator.config_entry.async_create_task(
+                self.hass,
+                self.async_update_listeners(changed),
+                f"{DOMAIN} forecast listeners {self.entity_id}",
+            )
+
+    def _cached_forecast(self, forecast_type: ForecastType) -> list[Forecast] | None:
+        """Return a forecast, it's only built once for every update of the data."""
+        data = self.coordinator.data
+        if data is None:
+            return None
+
+        cached = self._forecasts.get(forecast_type)
+        if cached is None or cached[0] is not data:
+            cached = (data, self._forecast_builders[forecast_type](data))
+            self._forecasts[forecast_type] = cached
+
+        return cached[1]
+
     async def async_forecast_daily(self) -> list[Forecast] | None:
         """Return the daily forecast in native units."""
+        return self._cached_forecast("daily")
+
+    async def async_forecast_hourly(self) -> list[Forecast] | None:
+        """Return the hourly forecast in native units."""
+        return self._cached_forecast("hourly")
+
+    def _build_daily_forecast(self, data: Response) -> list[Forecast]:
+        """Build the daily forecast in native units."""
         forecasts: list[Forecast] = []
 
-        for daily_forecast in self.coordinator.data.daily_forecast:
+        for daily_forecast in data.daily_forecast:
             if daily_forecast.day is None:
                 continue
 
@@ -203,11 +310,11 @@ class KnmiWeather(KnmiEntity, WeatherEntity):
 
         return forecasts
 
-    async def async_forecast_hourly(self) -> list[Forecast] | None:
-        """Return the hourly forecast in native units."""
+    def _build_hourly_forecast(self, data: Response) -> list[Forecast]:
+        """Build the hourly forecast in native units."""
         forecasts: list[Forecast] = []
 
-        for hourly_forecast in self.coordinator.data.hourly_forecast:
+        for hourly_forecast in data.hourly_forecast:
             if hourly_forecast.time is None:
                 continue
 
@@ -229,5 +336,70 @@ class KnmiWeather(KnmiEntity, WeatherEntity):
         return forecasts
 
     async def async_forecast_twice_daily(self) -> list[Forecast] | None:
-        """Return the daily forecast in native units."""
-        raise NotImplementedError
+        """Return the day and night forecast in native units."""
+        return self._cached_forecast("twice_daily")
+
+    def _build_twice_daily_forecast(self, data: Response) -> list[Forecast]:
+        """Build the day and night forecast in native units, from the hourly forecast.
+
+        Hours starting between sunrise and sunset are part of the day, the others of the night.
+        """
+        if data.live is None or data.live.sunrise is None or data.live.sunset is None:
+            return []
+
+        sunrise = data.live.sunrise
+        sunset = data.live.sunset
+        periods: list[tuple[bool, list[Any]]] = []
+
+        for hourly_forecast in data.hourly_forecast:
+            if hourly_forecast.time is None:
+                continue
+
+            local_time = hourly_forecast.time.astimezone(sunrise.tzinfo).time()
+            is_daytime = sunrise.time() <= local_time < sunset.time()
+            if not periods or periods[-1][0] != is_daytime:
+                periods.append((is_daytime, []))
+            periods[-1][1].append(hourly_forecast)
+
+        return [self._aggregate_period(hours, is_daytime=is_daytime) for is_daytime, hours in periods]
+
+    def _aggregate_period(self, hours: list[Any], *, is_daytime: bool) -> Forecast:
+        """Aggregate the hourly forecasts of a day or night."""
+        temperatures = [hour.temperature for hour in hours if hour.temperature is not None]
+        precipitation = [hour.precipitation for hour in hours if hour.precipitation is not None]
+        wind_speeds = [hour.wind_speed_kmh for hour in hours if hour.wind_speed_kmh is not None]
+        wind_bearings = [hour.wind_direction_degree for hour in hours if hour.wind_direction_degree is not None]
+
+        conditions = Counter(condition for hour in hours if (condition := self.map_condition(hour.image)) is not None)
+        condition = conditions.most_common(1)[0][0] if conditions else None
+        if condition == ATTR_CONDITION_SUNNY and not is_daytime:
+            condition = ATTR_CONDITION_CLEAR_NIGHT
+
+        return Forecast(
+            condition=condition,
+            datetime=hours[0].time.isoformat(),
+            is_daytime=is_daytime,
+            native_precipitation=round(sum(precipitation), 1) if precipitation else None,  # Millimeter.
+            native_temperature=max(temperatures, default=None),
+            native_templow=min(temperatures, default=None),
+            wind_bearing=mean_bearing(wind_bearings),
+            native_wind_speed=round(fmean(wind_speeds), 1) if wind_speeds else None,
+        )
+
+    async def async_get_resampled_forecast(self, step: int, *, extended: bool) -> ServiceResponse:
+        """Return the hourly forecast in steps of minutes, optionally followed by an hourly series for the next days."""
+        data = self.coordinator.data
+        if data is None:
+            return {"forecast": []}
+
+        key = (step, extended)
+        cached = self._resampled.get(key)
+        if cached is None or cached[0] is not data:
+            points = resample_hourly(data.hourly_forecast, timedelta(minutes=step), self.map_condition)
+            if extended:
+                last_hour = max((hour.time for hour in data.hourly_forecast if hour.time is not None), default=None)
+                points.extend(extend_hourly(data.daily_forecast, last_hour, self.map_condition))
+            cached = (data, [point.as_dict() for point in points])
+            self._resampled[key] = cached
+
+        return {"forecast": cached[1]}
@@ -4,7 +4,7 @@ from homeassistant.const import CONF_API_KEY, CONF_LATITUDE, CONF_LONGITUDE, CON
 from homeassistant.core import HomeAssistant
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
-from custom_components.knmi.const import DOMAIN
+from custom_components.knmi.const import CONF_LOCATIONS, DOMAIN
 
 
 def get_mock_config_data() -> dict[str, str | float]:
@@ -26,12 +26,30 @@ def get_mock_config_entry() -> MockConfigEntry:
     )
 
 
+def get_mock_fleet_config_entry() -> MockConfigEntry:
+    """Create a mock config entry with many locations for testing."""
+    return MockConfigEntry(
+        domain=DOMAIN,
+        entry_id="test_fleet",
+        data={
+            CONF_NAME: "Sites",
+            CONF_API_KEY: "abc123xyz000",
+            CONF_LOCATIONS: [
+                {CONF_NAME: "Purmerend", CONF_LATITUDE: 52.5, CONF_LONGITUDE: 4.95},
+                {CONF_NAME: "Utrecht", CONF_LATITUDE: 52.09, CONF_LONGITUDE: 5.12},
+                {CONF_NAME: "Den Helder", CONF_LATITUDE: 52.95, CONF_LONGITUDE: 4.76},
+            ],
+        },
+    )
+
+
 async def setup_integration(hass: HomeAssistant) -> MockConfigEntry:
     """Set up the custom component for tests."""
     config_entry = get_mock_config_entry()
     config_entry.add_to_hass(hass)
     assert await hass.config_entries.async_setup(config_entry.entry_id)
-    await hass.async_block_till_done()
+    # Data is fetched in the background after setup.
+    await hass.async_block_till_done(wait_background_tasks=True)
 
     return config_entry
 
@@ -39,10 +39,11 @@ def mock_async_get_clientsession() -> Generator[None]:
 def fixture_mock_weerlive_client() -> Generator[AsyncMock]:
     """Auto-patch WeerliveApi in all tests and return the mock for configuration."""
     mock_client = AsyncMock(spec=WeerliveApi)
+    mock_client.latitude_longitude.return_value = Response.from_json(load_fixture("response.json"))
     mock_client_class = Mock(return_value=mock_client)
 
     with (
-        patch("custom_components.knmi.WeerliveApi", mock_client_class),
+        patch("weerlive.WeerliveApi", mock_client_class),
         patch("custom_components.knmi.config_flow.WeerliveApi", mock_client_class),
     ):
         yield mock_client
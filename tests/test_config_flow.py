@@ -1,20 +1,24 @@
 """Test for config flow."""
 
 from collections.abc import Generator
+from datetime import timedelta
+from typing import Any
 from unittest.mock import AsyncMock, patch
 
 import pytest
-from homeassistant.config_entries import SOURCE_USER
+from homeassistant.config_entries import SOURCE_IMPORT, SOURCE_USER
 from homeassistant.const import CONF_API_KEY, CONF_LATITUDE, CONF_LONGITUDE, CONF_NAME, CONF_SCAN_INTERVAL
 from homeassistant.core import HomeAssistant
 from homeassistant.data_entry_flow import FlowResultType
 
-from custom_components.knmi.const import DOMAIN
+from custom_components.knmi.const import CONF_CACHE_MAX_AGE, CONF_GRID_SIZE, CONF_LOCATIONS, CONF_MIN_REFRESH_AGE, DEFAULT_GRID_SIZE, DOMAIN
+from custom_components.knmi.registry import async_get_fetch_registry, snap_to_grid
+from custom_components.knmi.store import STORAGE_VERSION
 from weerlive import WeerliveAPIConnectionError, WeerliveAPIKeyError, WeerliveAPIRateLimitError
 
-from . import get_mock_config_data, setup_integration, unload_integration
+from . import get_mock_config_data, get_mock_fleet_config_entry, setup_integration, unload_integration
 
-MOCK_UPDATE_CONFIG = {CONF_SCAN_INTERVAL: 600}
+MOCK_UPDATE_CONFIG = {CONF_SCAN_INTERVAL: 600, CONF_GRID_SIZE: 0.05, CONF_CACHE_MAX_AGE: 1800, CONF_MIN_REFRESH_AGE: 120}
 
 
 @pytest.fixture(autouse=True, name="bypass_setup")
@@ -30,9 +34,12 @@ async def test_successful_config_flow(hass: HomeAssistant) -> None:
     # Initialize a config flow
     result = await hass.config_entries.flow.async_init(DOMAIN, context={"source": SOURCE_USER})
 
-    # Check that the config flow shows the user form as the first step
-    assert result["type"] == FlowResultType.FORM
+    # Check that the config flow shows the menu as the first step, and then the location form
+    assert result["type"] == FlowResultType.MENU
     assert result["step_id"] == "user"
+    result = await hass.config_entries.flow.async_configure(result["flow_id"], {"next_step_id": "location"})
+    assert result["type"] == FlowResultType.FORM
+    assert result["step_id"] == "location"
 
     # If a user were to fill in all fields, it would result in this function call
     result2 = await hass.config_entries.flow.async_configure(result["flow_id"], user_input=config_data)
@@ -45,6 +52,21 @@ async def test_successful_config_flow(hass: HomeAssistant) -> None:
     assert result2["result"]
 
 
+async def test_config_flow_seeds_response(hass: HomeAssistant, mock_weerlive_client: AsyncMock) -> None:
+    """Test the response validating the config flow is used for the first update."""
+    config_data = get_mock_config_data()
+    result = await hass.config_entries.flow.async_init(DOMAIN, context={"source": SOURCE_USER})
+    result = await hass.config_entries.flow.async_configure(result["flow_id"], {"next_step_id": "location"})
+    await hass.config_entries.flow.async_configure(result["flow_id"], user_input=config_data)
+
+    fetch = AsyncMock()
+    cell = snap_to_grid(float(config_data[CONF_LATITUDE]), float(config_data[CONF_LONGITUDE]), DEFAULT_GRID_SIZE)
+    result = await async_get_fetch_registry(hass).async_fetch(str(config_data[CONF_API_KEY]), cell, timedelta(minutes=5), fetch)
+
+    assert result.response is mock_weerlive_client.latitude_longitude.return_value
+    fetch.assert_not_awaited()
+
+
 @pytest.mark.parametrize(
     ("side_effect", "error"),
     [
@@ -61,9 +83,12 @@ async def test_unsuccessful_config_flow(side_effect: Exception, error: str, hass
     # Initialize a config flow
     result = await hass.config_entries.flow.async_init(DOMAIN, context={"source": SOURCE_USER})
 
-    # Check that the config flow shows the user form as the first step
-    assert result["type"] == FlowResultType.FORM
+    # Check that the config flow shows the menu as the first step, and then the location form
+    assert result["type"] == FlowResultType.MENU
     assert result["step_id"] == "user"
+    result = await hass.config_entries.flow.async_configure(result["flow_id"], {"next_step_id": "location"})
+    assert result["type"] == FlowResultType.FORM
+    assert result["step_id"] == "location"
 
     # If a user were to fill in an incomplete form, it would result in this function call
     result2 = await hass.config_entries.flow.async_configure(result["flow_id"], user_input=config_data)
@@ -73,6 +98,40 @@ async def test_unsuccessful_config_flow(side_effect: Exception, error: str, hass
     assert result2["errors"] == {"base": error}
 
 
+async def test_import_config_flow(hass: HomeAssistant) -> None:
+    """Test a location imported from the YAML configuration."""
+    config_data = get_mock_config_data()
+    result = await hass.config_entries.flow.async_init(DOMAIN, context={"source": SOURCE_IMPORT}, data=config_data)
+
+    assert result["type"] == FlowResultType.CREATE_ENTRY
+    assert result["title"] == config_data[CONF_NAME]
+    assert result["data"] == config_data
+
+    # Importing the same coordinates again keeps the existing entry.
+    result = await hass.config_entries.flow.async_init(DOMAIN, context={"source": SOURCE_IMPORT}, data={**config_data, CONF_NAME: "Other"})
+
+    assert result["type"] == FlowResultType.ABORT
+    assert result["reason"] == "already_configured"
+    assert len(hass.config_entries.async_entries(DOMAIN)) == 1
+
+
+@pytest.mark.parametrize(
+    ("side_effect", "reason"),
+    [
+        (WeerliveAPIConnectionError, "general"),
+        (WeerliveAPIKeyError, "api_key"),
+        (WeerliveAPIRateLimitError, "daily_limit"),
+    ],
+)
+async def test_unsuccessful_import_config_flow(side_effect: Exception, reason: str, hass: HomeAssistant, mock_weerlive_client: AsyncMock) -> None:
+    """Test an imported location that can't be validated."""
+    mock_weerlive_client.latitude_longitude.side_effect = side_effect
+    result = await hass.config_entries.flow.async_init(DOMAIN, context={"source": SOURCE_IMPORT}, data=get_mock_config_data())
+
+    assert result["type"] == FlowResultType.ABORT
+    assert result["reason"] == reason
+
+
 async def test_step_reconfigure(hass: HomeAssistant) -> None:
     """Test for reconfigure step."""
     updated_data = {
@@ -85,7 +144,7 @@ async def test_step_reconfigure(hass: HomeAssistant) -> None:
 
     result = await config_entry.start_reconfigure_flow(hass)
     assert result["type"] == FlowResultType.FORM
-    assert result["step_id"] == "user"
+    assert result["step_id"] == "location"
 
     result2 = await hass.config_entries.flow.async_configure(
         result["flow_id"],
@@ -98,6 +157,90 @@ async def test_step_reconfigure(hass: HomeAssistant) -> None:
     assert config_entry.data == {**updated_data}
 
 
+async def test_successful_fleet_config_flow(hass: HomeAssistant, mock_weerlive_client: AsyncMock) -> None:
+    """Test a successful config flow for many locations."""
+    result = await hass.config_entries.flow.async_init(DOMAIN, context={"source": SOURCE_USER})
+    result = await hass.config_entries.flow.async_configure(result["flow_id"], {"next_step_id": "fleet"})
+    assert result["type"] == FlowResultType.FORM
+    assert result["step_id"] == "fleet"
+
+    result2 = await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        user_input={
+            CONF_NAME: "Sites",
+            CONF_API_KEY: "abc123xyz000",
+            CONF_LOCATIONS: "Purmerend, 52.5, 4.95\n\nUtrecht, 52.09, 5.12\n",
+        },
+    )
+
+    assert result2["type"] == FlowResultType.CREATE_ENTRY
+    assert result2["title"] == "Sites"
+    assert result2["data"][CONF_LOCATIONS] == [
+        {CONF_NAME: "Purmerend", CONF_LATITUDE: 52.5, CONF_LONGITUDE: 4.95},
+        {CONF_NAME: "Utrecht", CONF_LATITUDE: 52.09, CONF_LONGITUDE: 5.12},
+    ]
+    # Only the first location is used to validate the API key.
+    mock_weerlive_client.latitude_longitude.assert_awaited_once_with(52.5, 4.95)
+
+
+@pytest.mark.parametrize(
+    "locations",
+    [
+        "",
+        "Purmerend",
+        "Purmerend, 52.5",
+        "Purmerend, 52.5, east",
+        "Purmerend, 152.5, 4.95",
+        "Purmerend, 52.5, 4.95\npurmerend, 52.6, 4.96",
+    ],
+)
+async def test_fleet_config_flow_invalid_locations(hass: HomeAssistant, locations: str) -> None:
+    """Test invalid locations are reported."""
+    result = await hass.config_entries.flow.async_init(DOMAIN, context={"source": SOURCE_USER})
+    result = await hass.config_entries.flow.async_configure(result["flow_id"], {"next_step_id": "fleet"})
+
+    result2 = await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        user_input={CONF_NAME: "Sites", CONF_API_KEY: "abc123xyz000", CONF_LOCATIONS: locations},
+    )
+
+    assert result2["type"] == FlowResultType.FORM
+    assert result2["errors"] == {CONF_LOCATIONS: "invalid_locations"}
+
+
+async def test_step_reconfigure_fleet(hass: HomeAssistant) -> None:
+    """Test for reconfigure step of an entry with many locations."""
+    config_entry = get_mock_fleet_config_entry()
+    config_entry.add_to_hass(hass)
+
+    result = await config_entry.start_reconfigure_flow(hass)
+    assert result["type"] == FlowResultType.FORM
+    assert result["step_id"] == "fleet"
+
+    result2 = await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        user_input={CONF_NAME: "Sites", CONF_API_KEY: "1234567890", CONF_LOCATIONS: "Amsterdam, 52.37, 4.9"},
+    )
+    assert result2["type"] == FlowResultType.ABORT
+    assert result2["reason"] == "reconfigure_successful"
+    assert config_entry.data[CONF_LOCATIONS] == [{CONF_NAME: "Amsterdam", CONF_LATITUDE: 52.37, CONF_LONGITUDE: 4.9}]
+
+
+async def test_step_reconfigure_removes_moved_response(hass: HomeAssistant, hass_storage: dict[str, Any]) -> None:
+    """Test the stored response is removed when the location moved, so the new location is used after the reload."""
+    hass_storage["knmi.test_entry"] = {"version": STORAGE_VERSION, "minor_version": 1, "key": "knmi.test_entry", "data": {}}
+    config_entry = await setup_integration(hass)
+
+    result = await config_entry.start_reconfigure_flow(hass)
+    await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        user_input={**get_mock_config_data(), CONF_LATITUDE: 52.09, CONF_LONGITUDE: 5.12},
+    )
+    await hass.async_block_till_done()
+
+    assert "knmi.test_entry" not in hass_storage
+
+
 async def test_options_flow(hass: HomeAssistant) -> None:
     """Test an options flow."""
     # Create a new MockConfigEntry and add to HASS (we're bypassing config
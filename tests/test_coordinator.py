@@ -1,15 +1,20 @@
 """Test for data update coordinator."""
 
+import asyncio
 from datetime import timedelta
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
+from freezegun.api import FrozenDateTimeFactory
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.update_coordinator import UpdateFailed
-from pytest_homeassistant_custom_component.common import MockConfigEntry
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry, load_fixture
 
-from custom_components.knmi.const import DOMAIN
-from custom_components.knmi.coordinator import KnmiDataUpdateCoordinator
+from custom_components.knmi.const import CONF_MAX_STALE_AGE, CONF_MIN_REFRESH_AGE, DOMAIN
+from custom_components.knmi.coordinator import REFRESH_CONTEXT, KnmiDataUpdateCoordinator
+from custom_components.knmi.retry import BREAKER_THRESHOLD, BreakerState
+from weerlive import Response, WeerliveAPIConnectionError, WeerliveAPIError, WeerliveAPIRateLimitError
 
 from . import get_mock_config_data, get_mock_config_entry
 
@@ -24,7 +29,7 @@ async def test_async_update_data_success(hass: HomeAssistant, mock_weerlive_clie
     )
     coordinator.config_entry = get_mock_config_entry()
     result = await coordinator._async_update_data()  # pylint: disable=protected-access
-    assert isinstance(result, AsyncMock)
+    assert result is mock_weerlive_client.latitude_longitude.return_value
     mock_weerlive_client.latitude_longitude.assert_awaited_once_with(
         latitude=get_mock_config_data()["latitude"],
         longitude=get_mock_config_data()["longitude"],
@@ -63,3 +68,223 @@ async def test_async_update_data_api_failure(hass: HomeAssistant, mock_weerlive_
     )
     with pytest.raises(UpdateFailed):
         await coordinator._async_update_data()  # pylint: disable=protected-access
+
+
+async def test_async_update_data_rate_limited(hass: HomeAssistant, mock_weerlive_client: AsyncMock) -> None:
+    """Test polling pauses until the quota resets after the API reports the daily limit was reached."""
+    mock_weerlive_client.latitude_longitude.side_effect = WeerliveAPIRateLimitError("limit")
+    coordinator = KnmiDataUpdateCoordinator(
+        hass=hass,
+        client=mock_weerlive_client,
+        config_entry=get_mock_config_entry(),
+        update_interval=timedelta(minutes=5),
+    )
+    with pytest.raises(UpdateFailed):
+        await coordinator._async_update_data()  # pylint: disable=protected-access
+
+    assert coordinator.quota.is_paused(dt_util.utcnow())
+    assert coordinator.update_interval
+    assert coordinator.update_interval > timedelta(minutes=5)
+
+    # No requests are made while paused.
+    with pytest.raises(UpdateFailed):
+        await coordinator._async_update_data()  # pylint: disable=protected-access
+
+    assert mock_weerlive_client.latitude_longitude.await_count == 1
+
+
+async def test_async_update_data_updates_quota(hass: HomeAssistant, mock_weerlive_client: AsyncMock) -> None:
+    """Test the remaining requests are recorded in the quota budget."""
+    coordinator = KnmiDataUpdateCoordinator(
+        hass=hass,
+        client=mock_weerlive_client,
+        config_entry=get_mock_config_entry(),
+        update_interval=timedelta(minutes=5),
+    )
+    await coordinator._async_update_data()  # pylint: disable=protected-access
+
+    assert coordinator.quota.remaining == 132
+    assert coordinator.quota.sites == {"test_entry": (0.01, 52.35, 4.76)}
+
+    await coordinator.async_shutdown()
+    assert coordinator.quota.sites == {}
+
+
+async def test_unchanged_response_is_suppressed(hass: HomeAssistant, mock_weerlive_client: AsyncMock) -> None:
+    """Test listeners are only notified when the weather changed, the API usage counters of other responses are copied into the data."""
+    unchanged = Response.from_json(load_fixture("response.json"))
+    api_changed = Response.from_json(load_fixture("response.json"))
+    api_changed.api.remaining_requests = 131
+    changed = Response.from_json(load_fixture("response.json"))
+    changed.live.temperature = 11.5
+    mock_weerlive_client.latitude_longitude.side_effect = [Response.from_json(load_fixture("response.json")), unchanged, api_changed, changed]
+
+    coordinator = KnmiDataUpdateCoordinator(
+        hass=hass,
+        client=mock_weerlive_client,
+        config_entry=get_mock_config_entry(),
+        update_interval=timedelta(minutes=5),
+    )
+    # Skip the shared cache, so every refresh fetches a new response.
+    coordinator.scan_interval = timedelta(0)
+
+    listener = Mock()
+    remove_listener = coordinator.async_add_listener(listener)
+    # Listeners with the refresh context are called once for every refresh.
+    refresh_listener = Mock()
+    remove_refresh_listener = coordinator.async_add_listener(refresh_listener, REFRESH_CONTEXT)
+
+    await coordinator.async_refresh()
+    assert listener.call_count == 1
+    assert refresh_listener.call_count == 1
+    first_data = coordinator.data
+
+    await coordinator.async_refresh()
+    assert listener.call_count == 1
+    assert refresh_listener.call_count == 2
+    assert coordinator.data is first_data
+    assert coordinator.suppressed_updates == 1
+    assert coordinator.last_checked is not None
+
+    await coordinator.async_refresh()
+    assert listener.call_count == 1
+    assert refresh_listener.call_count == 3
+    assert coordinator.data is first_data
+    assert coordinator.data.api.remaining_requests == 131
+    assert coordinator.suppressed_updates == 2
+
+    await coordinator.async_refresh()
+    assert listener.call_count == 2
+    assert refresh_listener.call_count == 4
+    assert coordinator.data is changed
+    assert coordinator.suppressed_updates == 2
+
+    remove_listener()
+    remove_refresh_listener()
+
+
+async def test_async_update_data_connection_retry(hass: HomeAssistant, mock_weerlive_client: AsyncMock) -> None:
+    """Test connection errors are retried quickly within one update."""
+    mock_weerlive_client.latitude_longitude.side_effect = [
+        WeerliveAPIConnectionError("timeout"),
+        mock_weerlive_client.latitude_longitude.return_value,
+    ]
+    coordinator = KnmiDataUpdateCoordinator(
+        hass=hass,
+        client=mock_weerlive_client,
+        config_entry=get_mock_config_entry(),
+        update_interval=timedelta(minutes=5),
+    )
+
+    with patch("custom_components.knmi.coordinator.asyncio.sleep") as mock_sleep:
+        assert await coordinator._async_update_data()  # pylint: disable=protected-access
+
+    mock_sleep.assert_awaited_once()
+    assert mock_weerlive_client.latitude_longitude.await_count == 2
+    assert coordinator.breaker.retries == 1
+    assert coordinator.breaker.state == BreakerState.CLOSED
+
+
+async def test_async_update_data_backoff_and_breaker(hass: HomeAssistant, mock_weerlive_client: AsyncMock) -> None:
+    """Test failed updates back off and eventually open the circuit breaker."""
+    mock_weerlive_client.latitude_longitude.side_effect = WeerliveAPIError("error")
+    coordinator = KnmiDataUpdateCoordinator(
+        hass=hass,
+        client=mock_weerlive_client,
+        config_entry=get_mock_config_entry(),
+        update_interval=timedelta(minutes=5),
+    )
+
+    with pytest.raises(UpdateFailed):
+        await coordinator._async_update_data()  # pylint: disable=protected-access
+
+    # The next attempt is sooner than the scan interval.
+    assert coordinator.update_interval
+    assert coordinator.update_interval < timedelta(minutes=5)
+
+    for _ in range(BREAKER_THRESHOLD - 1):
+        with pytest.raises(UpdateFailed):
+            await coordinator._async_update_data()  # pylint: disable=protected-access
+
+    assert coordinator.breaker.state == BreakerState.OPEN
+    assert mock_weerlive_client.latitude_longitude.await_count == BREAKER_THRESHOLD
+
+    # No requests are made while the breaker is open.
+    with pytest.raises(UpdateFailed):
+        await coordinator._async_update_data()  # pylint: disable=protected-access
+
+    assert mock_weerlive_client.latitude_longitude.await_count == BREAKER_THRESHOLD
+
+
+async def test_async_request_refresh_single_flight(hass: HomeAssistant, mock_weerlive_client: AsyncMock) -> None:
+    """Test concurrent refresh requests share one update."""
+    coordinator = KnmiDataUpdateCoordinator(
+        hass=hass,
+        client=mock_weerlive_client,
+        config_entry=get_mock_config_entry(),
+        update_interval=timedelta(minutes=5),
+    )
+
+    await asyncio.gather(*(coordinator.async_request_refresh() for _ in range(5)))
+
+    mock_weerlive_client.latitude_longitude.assert_awaited_once()
+    assert coordinator.data is mock_weerlive_client.latitude_longitude.return_value
+
+
+async def test_async_request_refresh_min_age(hass: HomeAssistant, mock_weerlive_client: AsyncMock, freezer: FrozenDateTimeFactory) -> None:
+    """Test a refresh is skipped while the data is younger than the minimum age."""
+    config_entry = MockConfigEntry(domain=DOMAIN, entry_id="test_entry", data=get_mock_config_data(), options={CONF_MIN_REFRESH_AGE: 60})
+    coordinator = KnmiDataUpdateCoordinator(
+        hass=hass,
+        client=mock_weerlive_client,
+        config_entry=config_entry,
+        update_interval=timedelta(minutes=5),
+    )
+
+    await coordinator.async_request_refresh()
+    await coordinator.async_request_refresh()
+    mock_weerlive_client.latitude_longitude.assert_awaited_once()
+
+    # The shared response is also too old to be used for a manual refresh.
+    freezer.tick(timedelta(seconds=61))
+    await coordinator.async_request_refresh()
+    assert mock_weerlive_client.latitude_longitude.await_count == 2
+
+
+async def test_async_update_data_serves_stale(hass: HomeAssistant, mock_weerlive_client: AsyncMock, freezer: FrozenDateTimeFactory) -> None:
+    """Test failed updates keep the last data until it is too old."""
+    config_entry = MockConfigEntry(domain=DOMAIN, entry_id="test_entry", data=get_mock_config_data(), options={CONF_MAX_STALE_AGE: 600})
+    coordinator = KnmiDataUpdateCoordinator(
+        hass=hass,
+        client=mock_weerlive_client,
+        config_entry=config_entry,
+        update_interval=timedelta(minutes=5),
+    )
+    await coordinator.async_refresh()
+    data = coordinator.data
+    listener = Mock()
+    coordinator.async_add_listener(listener)
+
+    freezer.tick(timedelta(minutes=6))
+    mock_weerlive_client.latitude_longitude.side_effect = WeerliveAPIError("error")
+    await coordinator.async_refresh()
+
+    assert coordinator.last_update_success
+    assert coordinator.stale
+    assert coordinator.data is data
+    listener.assert_called()
+
+    # Recovering with unchanged data still clears the stale state.
+    listener.reset_mock()
+    freezer.tick(timedelta(minutes=1))
+    mock_weerlive_client.latitude_longitude.side_effect = None
+    await coordinator.async_refresh()
+
+    assert not coordinator.stale
+    listener.assert_called()
+
+    freezer.tick(timedelta(minutes=11))
+    mock_weerlive_client.latitude_longitude.side_effect = WeerliveAPIError("error")
+    await coordinator.async_refresh()
+
+    assert not coordinator.last_update_success
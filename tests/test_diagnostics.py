@@ -2,14 +2,15 @@
 
 import pytest
 from homeassistant.components.diagnostics import REDACTED
+from homeassistant.const import CONF_LATITUDE
 from homeassistant.core import HomeAssistant
 from pytest_homeassistant_custom_component.components.diagnostics import get_diagnostics_for_config_entry
 from pytest_homeassistant_custom_component.typing import ClientSessionGenerator
 
-from custom_components.knmi.const import DOMAIN
+from custom_components.knmi.const import CONF_LOCATIONS, DOMAIN
 from custom_components.knmi.diagnostics import TO_REDACT
 
-from . import setup_integration, unload_integration
+from . import get_mock_fleet_config_entry, setup_integration, unload_integration
 
 
 @pytest.mark.usefixtures("mocked_data")
@@ -26,5 +27,32 @@ async def test_config_entry_diagnostics(hass: HomeAssistant, hass_client: Client
         assert result["config_entry"]["data"][key] == REDACTED
 
     assert result["data"]["live"]["city"] == "Purmerend"
+    assert result["fetch_registry"] == {"hits": 0, "misses": 1, "cells": 1}
+    assert result["quota"]["remaining"] == 132
+    assert result["updates"]["suppressed"] == 0
+    assert result["updates"]["stale"] is False
+    assert result["stats"]["update"]["count"] == 1
+    assert result["stats"]["success_ratio"] == 1
+    assert result["circuit_breaker"]["state"] == "closed"
+    assert result["phase_lock"]["observations"] == 1
+    assert result["quota"]["sites"] == 1
+    assert result["quota"]["cells"] == 1
+
+    await unload_integration(hass, config_entry)
+
+
+@pytest.mark.usefixtures("mocked_data")
+async def test_fleet_config_entry_diagnostics(hass: HomeAssistant, hass_client: ClientSessionGenerator) -> None:
+    """Test config entry diagnostics of a multi-location entry."""
+    config_entry = get_mock_fleet_config_entry()
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    result = await get_diagnostics_for_config_entry(hass, hass_client, config_entry)
+
+    assert result["config_entry"]["data"][CONF_LOCATIONS][0][CONF_LATITUDE] == REDACTED
+    assert result["scheduler"]["locations"] == 3
+    assert set(result["locations"]) == {"test_fleet_purmerend", "test_fleet_utrecht", "test_fleet_den_helder"}
 
     await unload_integration(hass, config_entry)
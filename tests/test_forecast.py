@@ -0,0 +1,115 @@
+"""Tests for the forecast resampling."""
+
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from custom_components.knmi.forecast import diurnal_temperature, extend_hourly, resample_hourly
+
+TIMEZONE = ZoneInfo("Europe/Amsterdam")
+
+
+def _hour(hour: int, temperature: float, precipitation: float, wind_speed: float) -> SimpleNamespace:
+    """Return an hourly forecast."""
+    return SimpleNamespace(
+        time=datetime(2024, 2, 15, hour, tzinfo=TIMEZONE),
+        image="regen",
+        temperature=temperature,
+        precipitation=precipitation,
+        wind_direction_degree=180,
+        wind_speed_kmh=wind_speed,
+    )
+
+
+def _day(day: int, minimum: float, maximum: float) -> SimpleNamespace:
+    """Return a daily forecast."""
+    return SimpleNamespace(
+        day=datetime(2024, 2, day, tzinfo=TIMEZONE),
+        image="zonnig",
+        min_temperature=minimum,
+        max_temperature=maximum,
+        precipitation_probability=20,
+        wind_direction_degree=90,
+        wind_speed_kmh=10,
+    )
+
+
+def test_resample_hourly() -> None:
+    """Test the hourly forecast is interpolated to shorter steps."""
+    hours = [_hour(10, 10, 2, 20), _hour(11, 14, 0, 12)]
+
+    points = resample_hourly(hours, timedelta(minutes=15), str.upper)
+
+    assert len(points) == 8
+    assert [point.datetime for point in points[:4]] == [
+        "2024-02-15T10:00:00+01:00",
+        "2024-02-15T10:15:00+01:00",
+        "2024-02-15T10:30:00+01:00",
+        "2024-02-15T10:45:00+01:00",
+    ]
+    assert [point.temperature for point in points[:4]] == [10, 11, 12, 13]
+    assert [point.wind_speed for point in points[:4]] == [20, 18, 16, 14]
+    assert {point.precipitation for point in points[:4]} == {0.5}
+    assert {point.condition for point in points} == {"REGEN"}
+    assert {point.wind_bearing for point in points} == {180}
+
+    # The last hour has nothing to interpolate to.
+    assert {point.temperature for point in points[4:]} == {14}
+    assert points[4].as_dict() == {
+        "datetime": "2024-02-15T11:00:00+01:00",
+        "condition": "REGEN",
+        "temperature": 14,
+        "precipitation": 0,
+        "precipitation_probability": None,
+        "wind_bearing": 180,
+        "wind_speed": 12,
+    }
+
+
+def test_resample_hourly_missing_values() -> None:
+    """Test hours without a time are skipped and missing values are kept missing."""
+    hours = [_hour(10, 10, 2, 20), _hour(11, 14, 0, 12)]
+    hours[0].temperature = None
+    hours[0].precipitation = None
+    hours[1].time = None
+
+    points = resample_hourly(hours, timedelta(minutes=30), str.upper)
+
+    assert len(points) == 2
+    assert {point.temperature for point in points} == {None}
+    assert {point.precipitation for point in points} == {None}
+
+
+@pytest.mark.parametrize(
+    ("hour", "expected"),
+    [
+        (0, 5.7),
+        (5, 4),
+        (10, 8.5),
+        (15, 13),
+        (20, 10.7),
+        (23, 8.1),
+    ],
+)
+def test_diurnal_temperature(hour: int, expected: float) -> None:
+    """Test the temperature follows the minimum and maximum of the days."""
+    assert diurnal_temperature(hour, 4, 13, 10, 5) == expected
+
+
+def test_extend_hourly() -> None:
+    """Test an hourly series is made from the daily forecast, after the hourly forecast."""
+    days = [_day(15, 4, 13), _day(16, 5, 10), _day(17, None, None)]
+
+    points = extend_hourly(days, datetime(2024, 2, 15, 22, tzinfo=TIMEZONE), str.upper)
+
+    # The last day has no temperatures.
+    assert len(points) == 25
+    assert points[0].datetime == "2024-02-15T23:00:00+01:00"
+    assert points[-1].datetime == "2024-02-16T23:00:00+01:00"
+    assert points[6].temperature == 5
+    assert points[16].temperature == 10
+    assert {point.condition for point in points} == {"ZONNIG"}
+    assert {point.precipitation_probability for point in points} == {20}
+    assert {point.precipitation for point in points} == {None}
@@ -0,0 +1,93 @@
+"""Tests for the import of locations from the YAML configuration."""
+
+from collections.abc import Generator
+from typing import Any
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from homeassistant.const import CONF_API_KEY, CONF_LATITUDE, CONF_LONGITUDE, CONF_NAME
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers import issue_registry as ir
+from homeassistant.setup import async_setup_component
+from pytest_homeassistant_custom_component.common import load_fixture
+
+from custom_components.knmi.const import DOMAIN, ISSUE_IMPORT_FAILED
+from custom_components.knmi.importer import async_import_locations
+from weerlive import Response, WeerliveAPIKeyError
+
+RECORDS = [
+    {CONF_NAME: "Purmerend", CONF_LATITUDE: 52.5, CONF_LONGITUDE: 4.95, CONF_API_KEY: "abc123xyz000"},
+    {CONF_NAME: "Utrecht", CONF_LATITUDE: 52.09, CONF_LONGITUDE: 5.12, CONF_API_KEY: "abc123xyz000"},
+    {CONF_NAME: "Purmerend centrum", CONF_LATITUDE: 52.5, CONF_LONGITUDE: 4.95, CONF_API_KEY: "abc123xyz000"},
+    {CONF_NAME: "Den Helder", CONF_LATITUDE: 52.95, CONF_LONGITUDE: 4.76, CONF_API_KEY: "invalid"},
+]
+
+
+@pytest.fixture(autouse=True, name="bypass_setup")
+def fixture_bypass_setup_fixture() -> Generator[None]:
+    """Prevent actual setup of the imported entries during tests."""
+    with patch("custom_components.knmi.async_setup_entry", return_value=True):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def fixture_invalid_api_key(mock_weerlive_client: AsyncMock) -> None:
+    """Reject the API key of Den Helder."""
+    response = Response.from_json(load_fixture("response.json"))
+
+    async def latitude_longitude(latitude: float, _longitude: float) -> Response:
+        if latitude == 52.95:
+            raise WeerliveAPIKeyError
+        return response
+
+    mock_weerlive_client.latitude_longitude.side_effect = latitude_longitude
+
+
+async def test_import_locations(hass: HomeAssistant, issue_registry: ir.IssueRegistry, mock_weerlive_client: AsyncMock) -> None:
+    """Test locations are imported once per coordinates, and failures are reported."""
+    failures = await async_import_locations(hass, RECORDS)
+
+    assert failures == {"Den Helder": "api_key"}
+    assert sorted(entry.title for entry in hass.config_entries.async_entries(DOMAIN)) == ["Purmerend", "Utrecht"]
+    assert mock_weerlive_client.latitude_longitude.await_count == 3
+    issue = issue_registry.async_get_issue(DOMAIN, ISSUE_IMPORT_FAILED)
+    assert issue
+    assert issue.translation_placeholders == {"locations": "Den Helder (api_key)"}
+
+    # Importing again only validates the location that failed, and clears the report when it succeeds.
+    mock_weerlive_client.latitude_longitude.reset_mock(side_effect=True)
+    mock_weerlive_client.latitude_longitude.return_value = Response.from_json(load_fixture("response.json"))
+    failures = await async_import_locations(hass, RECORDS)
+
+    assert failures == {}
+    assert len(hass.config_entries.async_entries(DOMAIN)) == 3
+    assert mock_weerlive_client.latitude_longitude.await_count == 1
+    assert issue_registry.async_get_issue(DOMAIN, ISSUE_IMPORT_FAILED) is None
+
+
+async def test_import_locations_exception(hass: HomeAssistant, issue_registry: ir.IssueRegistry) -> None:
+    """Test a location that raises is reported as failed, and doesn't abort the import of the others."""
+    async_init = hass.config_entries.flow.async_init
+
+    async def flow_init(handler: str, *, context: dict[str, Any], data: dict[str, Any]) -> FlowResult:
+        if data[CONF_NAME] == "Utrecht":
+            raise RuntimeError
+        return await async_init(handler, context=context, data=data)
+
+    with patch.object(hass.config_entries.flow, "async_init", side_effect=flow_init):
+        failures = await async_import_locations(hass, RECORDS)
+
+    assert failures == {"Den Helder": "api_key", "Utrecht": "unknown"}
+    assert [entry.title for entry in hass.config_entries.async_entries(DOMAIN)] == ["Purmerend"]
+    issue = issue_registry.async_get_issue(DOMAIN, ISSUE_IMPORT_FAILED)
+    assert issue
+    assert issue.translation_placeholders == {"locations": "Den Helder (api_key), Utrecht (unknown)"}
+
+
+async def test_import_from_yaml(hass: HomeAssistant) -> None:
+    """Test the locations of the YAML configuration are imported at setup."""
+    assert await async_setup_component(hass, DOMAIN, {DOMAIN: RECORDS})
+    await hass.async_block_till_done()
+
+    assert sorted(entry.title for entry in hass.config_entries.async_entries(DOMAIN)) == ["Purmerend", "Utrecht"]
@@ -1,46 +1,141 @@
 """Test setup."""
 
+from datetime import timedelta
+from typing import Any
 from unittest.mock import AsyncMock, patch
 
 import pytest
 from _pytest.logging import LogCaptureFixture
 from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import STATE_UNAVAILABLE
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers import entity_registry as er
-from pytest_homeassistant_custom_component.common import MockConfigEntry
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_fire_time_changed, load_fixture
 
 from custom_components.knmi import async_migrate_entry, async_setup_entry
 from custom_components.knmi.const import DOMAIN
 from custom_components.knmi.coordinator import KnmiDataUpdateCoordinator
-from weerlive import WeerliveAPIError
+from custom_components.knmi.store import STORAGE_VERSION
+from weerlive import Response, WeerliveAPIError
 
-from . import get_mock_config_entry, setup_integration, unload_integration
+from . import get_mock_fleet_config_entry, setup_integration, unload_integration
 
 
 async def test_setup_and_unload_entry(hass: HomeAssistant) -> None:
     """Test entry setup and unload."""
     config_entry = await setup_integration(hass)
 
-    # Check that the client is stored as runtime_data
-    assert isinstance(config_entry.runtime_data, KnmiDataUpdateCoordinator)
+    # Check that the coordinator is stored as runtime_data
+    assert isinstance(config_entry.runtime_data.coordinator, KnmiDataUpdateCoordinator)
+    assert config_entry.runtime_data.scheduler is None
 
     # Unload the entry
     await unload_integration(hass, config_entry)
 
 
+async def test_setup_and_unload_fleet_entry(hass: HomeAssistant, mock_weerlive_client: AsyncMock, device_registry: dr.DeviceRegistry) -> None:
+    """Test every location of a multi-location entry gets a device and entities, refreshed by one scheduler."""
+    config_entry = get_mock_fleet_config_entry()
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    runtime_data = config_entry.runtime_data
+    assert runtime_data.scheduler is not None
+    assert len(runtime_data.coordinators) == 3
+    assert mock_weerlive_client.latitude_longitude.await_count == 3
+    for coordinator in runtime_data.coordinators:
+        assert coordinator.update_interval is None
+        assert coordinator.next_update is not None
+
+    assert len(dr.async_entries_for_config_entry(device_registry, config_entry.entry_id)) == 3
+    for entity_id in ("weather.purmerend", "weather.utrecht", "weather.den_helder", "sensor.den_helder_temperature"):
+        state = hass.states.get(entity_id)
+        assert state
+        assert state.state != STATE_UNAVAILABLE
+
+    await unload_integration(hass, config_entry)
+
+
 async def test_setup_entry_exception(hass: HomeAssistant, mock_weerlive_client: AsyncMock) -> None:
-    """Test setup entry raises ConfigEntryNotReady on connection error."""
-    # Configure the mock to raise an error on latitude_longitude
+    """Test setup doesn't wait for the API, entities are unavailable until data is received."""
     mock_weerlive_client.latitude_longitude.side_effect = WeerliveAPIError()
 
-    # Create config entry and use HA's setup system which properly sets state
-    config_entry = get_mock_config_entry()
-    config_entry.add_to_hass(hass)
+    config_entry = await setup_integration(hass)
+
+    assert config_entry.state == ConfigEntryState.LOADED
+    state = hass.states.get("sensor.home_temperature")
+    assert state
+    assert state.state == STATE_UNAVAILABLE
+
+    await unload_integration(hass, config_entry)
+
+
+def store_response(hass_storage: dict[str, Any], age: timedelta) -> None:
+    """Store the response fixture for the mock config entry."""
+    hass_storage["knmi.test_entry"] = {
+        "version": STORAGE_VERSION,
+        "minor_version": 1,
+        "key": "knmi.test_entry",
+        "data": {
+            "fetched_at": (dt_util.utcnow() - age).isoformat(),
+            "response": Response.from_json(load_fixture("response.json")).to_dict(),
+        },
+    }
+
+
+async def test_setup_entry_with_stored_response(hass: HomeAssistant, hass_storage: dict[str, Any], mock_weerlive_client: AsyncMock) -> None:
+    """Test a recently stored response is used without a request."""
+    store_response(hass_storage, timedelta(minutes=1))
+
+    config_entry = await setup_integration(hass)
+
+    mock_weerlive_client.latitude_longitude.assert_not_awaited()
+    state = hass.states.get("sensor.home_temperature")
+    assert state
+    assert state.state == "10.5"
+
+    await unload_integration(hass, config_entry)
+
+
+async def test_setup_entry_revalidates_stored_response(hass: HomeAssistant, hass_storage: dict[str, Any], mock_weerlive_client: AsyncMock) -> None:
+    """Test an older stored response is used and revalidated in the background."""
+    store_response(hass_storage, timedelta(minutes=30))
+    mock_weerlive_client.latitude_longitude.side_effect = WeerliveAPIError()
+
+    config_entry = await setup_integration(hass)
+
+    assert config_entry.state == ConfigEntryState.LOADED
+    mock_weerlive_client.latitude_longitude.assert_awaited_once()
+
+    # The revalidation failed, so the stored response is served as stale data.
+    state = hass.states.get("sensor.home_temperature")
+    assert state
+    assert state.state == "10.5"
+    assert state.attributes["stale"] is True
+    assert state.attributes["data_age"] >= 1800
 
-    # This should raise ConfigEntryNotReady due to connection error
-    # The setup will fail and raise ConfigEntryNotReady
-    assert not await hass.config_entries.async_setup(config_entry.entry_id)
-    assert config_entry.state == ConfigEntryState.SETUP_RETRY
+    await unload_integration(hass, config_entry)
+
+
+async def test_setup_entry_ignores_expired_stored_response(
+    hass: HomeAssistant, hass_storage: dict[str, Any], mock_weerlive_client: AsyncMock
+) -> None:
+    """Test a stored response older than the maximum age is not used."""
+    store_response(hass_storage, timedelta(days=1))
+    mock_weerlive_client.latitude_longitude.side_effect = WeerliveAPIError()
+
+    config_entry = await setup_integration(hass)
+
+    mock_weerlive_client.latitude_longitude.assert_awaited_once()
+    state = hass.states.get("sensor.home_temperature")
+    assert state
+    assert state.state == STATE_UNAVAILABLE
+
+    await unload_integration(hass, config_entry)
 
 
 async def test_setup_entry_no_api_key(hass: HomeAssistant) -> None:
@@ -58,19 +153,53 @@ async def test_setup_entry_no_api_key(hass: HomeAssistant) -> None:
         await async_setup_entry(hass, config_entry)
 
 
-async def test_async_reload_entry(hass: HomeAssistant) -> None:
-    """Test reloading the entry."""
+async def test_options_applied_without_reload(hass: HomeAssistant) -> None:
+    """Test changed options are applied to the running coordinator."""
     config_entry = await setup_integration(hass)
+    coordinator = config_entry.runtime_data.coordinator
 
     assert config_entry.state == ConfigEntryState.LOADED
 
-    # Mock the config_entries.async_reload method to verify it gets called
     with patch.object(hass.config_entries, "async_reload") as mock_reload:
-        # Update the entry options - this should trigger the reload listener
         hass.config_entries.async_update_entry(config_entry, options={"scan_interval": 600})
         await hass.async_block_till_done()
 
-        # Verify that async_reload was called with the correct entry ID
+        mock_reload.assert_not_called()
+
+    assert coordinator.scan_interval == timedelta(seconds=600)
+    assert coordinator.update_interval >= timedelta(seconds=300)
+
+
+async def test_fleet_options_applied_without_reload(hass: HomeAssistant, mock_weerlive_client: AsyncMock) -> None:
+    """Test changed options are applied to the coordinators of a fleet entry."""
+    config_entry = get_mock_fleet_config_entry()
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert mock_weerlive_client.latitude_longitude.await_count == 3
+
+    with patch.object(hass.config_entries, "async_reload") as mock_reload:
+        hass.config_entries.async_update_entry(config_entry, options={"scan_interval": 600})
+        await hass.async_block_till_done()
+
+        mock_reload.assert_not_called()
+
+    for coordinator in config_entry.runtime_data.coordinators:
+        assert coordinator.scan_interval == timedelta(seconds=600)
+    assert config_entry.runtime_data.scheduler.next_update is not None
+
+    await unload_integration(hass, config_entry)
+
+
+async def test_data_change_reloads_entry(hass: HomeAssistant) -> None:
+    """Test changed data reloads the entry."""
+    config_entry = await setup_integration(hass)
+
+    with patch.object(hass.config_entries, "async_reload") as mock_reload:
+        hass.config_entries.async_update_entry(config_entry, data={**config_entry.data, "latitude": 52.0})
+        await hass.async_block_till_done()
+
         mock_reload.assert_called_once_with(config_entry.entry_id)
 
 
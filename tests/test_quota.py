@@ -0,0 +1,85 @@
+"""Tests for the daily quota budget."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.knmi.quota import QUOTA_RESERVE, QUOTA_RESET_MARGIN, QUOTA_TIME_ZONE, async_get_quota_budget, next_quota_reset
+
+NOW = datetime(2024, 2, 14, 12, 0, tzinfo=QUOTA_TIME_ZONE)
+
+
+@pytest.mark.parametrize(
+    ("now", "expected"),
+    [
+        (datetime(2024, 2, 14, 12, 0, tzinfo=QUOTA_TIME_ZONE), datetime(2024, 2, 15, 0, 0, tzinfo=QUOTA_TIME_ZONE)),
+        (datetime(2024, 2, 14, 23, 30, tzinfo=QUOTA_TIME_ZONE), datetime(2024, 2, 15, 0, 0, tzinfo=QUOTA_TIME_ZONE)),
+        (datetime(2024, 3, 30, 23, 30, tzinfo=QUOTA_TIME_ZONE), datetime(2024, 3, 31, 0, 0, tzinfo=QUOTA_TIME_ZONE)),
+    ],
+)
+def test_next_quota_reset(now: datetime, expected: datetime) -> None:
+    """Test the quota resets at midnight, Dutch time."""
+    assert next_quota_reset(now) == expected
+
+
+async def test_budget_is_shared_per_api_key(hass: HomeAssistant) -> None:
+    """Test entries with the same API key share a budget."""
+    assert async_get_quota_budget(hass, "key1") is async_get_quota_budget(hass, "key1")
+    assert async_get_quota_budget(hass, "key1") is not async_get_quota_budget(hass, "key2")
+
+
+async def test_interval_spreads_remaining_requests(hass: HomeAssistant) -> None:
+    """Test the remaining requests are spread over the rest of the day and all entries."""
+    budget = async_get_quota_budget(hass, "key")
+    scan_interval = timedelta(minutes=5)
+
+    assert budget.interval(scan_interval, NOW) == scan_interval
+
+    budget.sites.update({"entry1": (0.01, 52.35, 4.76), "entry2": (0.01, 52.09, 5.12)})
+    budget.async_update(48 + QUOTA_RESERVE, NOW)
+
+    # 12 hours left, 24 requests per entry.
+    assert budget.interval(scan_interval, NOW) == timedelta(minutes=30)
+
+    # Entries in the same grid cell share their requests.
+    budget.sites["entry3"] = (0.01, 52.35, 4.76)
+    assert budget.interval(scan_interval, NOW) == timedelta(minutes=30)
+
+    budget.async_update(1000, NOW + timedelta(seconds=1))
+    assert budget.interval(scan_interval, NOW) == scan_interval
+
+    budget.async_update(QUOTA_RESERVE, NOW + timedelta(seconds=2))
+    assert budget.interval(scan_interval, NOW) == timedelta(hours=12) + QUOTA_RESET_MARGIN
+
+
+async def test_pause_until_reset(hass: HomeAssistant) -> None:
+    """Test polling pauses until the quota resets."""
+    budget = async_get_quota_budget(hass, "key")
+    budget.async_pause(NOW)
+
+    assert budget.is_paused(NOW)
+    assert budget.interval(timedelta(minutes=5), NOW) == timedelta(hours=12) + QUOTA_RESET_MARGIN
+    assert budget.projected_exhaustion(NOW) == NOW
+    assert not budget.is_paused(NOW + timedelta(hours=13))
+
+    # A new day starts with a fresh budget.
+    budget.async_update(300, NOW + timedelta(hours=13))
+    assert budget.paused_until is None
+
+
+async def test_projected_exhaustion(hass: HomeAssistant) -> None:
+    """Test the exhaustion projection uses today's usage rate."""
+    budget = async_get_quota_budget(hass, "key")
+
+    assert budget.projected_exhaustion(NOW) is None
+
+    budget.async_update(200, NOW)
+    assert budget.projected_exhaustion(NOW) is None
+
+    budget.async_update(190, NOW + timedelta(hours=1))
+    assert budget.projected_exhaustion(NOW) == NOW + timedelta(hours=20)
+
+    # Older observations are ignored.
+    budget.async_update(250, NOW)
+    assert budget.remaining == 190
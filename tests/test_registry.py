@@ -0,0 +1,121 @@
+"""Tests for the shared fetch registry."""
+
+import asyncio
+from datetime import timedelta
+from unittest.mock import AsyncMock
+
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.core import HomeAssistant
+
+from custom_components.knmi.const import DATA_FETCH_REGISTRY, DOMAIN
+from custom_components.knmi.registry import SEED_MAX_AGE, async_get_fetch_registry, snap_to_grid
+
+
+@pytest.mark.parametrize(
+    ("first", "second", "grid_size", "same_cell"),
+    [
+        ((52.354, 4.763), (52.354, 4.763), 0, True),
+        ((52.354, 4.763), (52.355, 4.763), 0, False),
+        ((52.354, 4.763), (52.356, 4.768), 0.01, True),
+        ((52.354, 4.763), (52.364, 4.763), 0.01, False),
+    ],
+)
+def test_snap_to_grid(first: tuple[float, float], second: tuple[float, float], grid_size: float, same_cell: bool) -> None:  # noqa: FBT001
+    """Test snapping coordinates to grid cells."""
+    assert (snap_to_grid(*first, grid_size) == snap_to_grid(*second, grid_size)) is same_cell
+
+
+async def test_registry_is_shared(hass: HomeAssistant) -> None:
+    """Test the registry is stored once under the domain data."""
+    registry = async_get_fetch_registry(hass)
+
+    assert async_get_fetch_registry(hass) is registry
+    assert hass.data[DOMAIN][DATA_FETCH_REGISTRY] is registry
+
+
+async def test_cached_response(hass: HomeAssistant) -> None:
+    """Test a fresh cached response is reused and a stale one is fetched again."""
+    registry = async_get_fetch_registry(hass)
+    fetch = AsyncMock(return_value="response")
+    cell = snap_to_grid(52.354, 4.763, 0.01)
+
+    first = await registry.async_fetch("key", cell, timedelta(minutes=5), fetch)
+    second = await registry.async_fetch("key", cell, timedelta(minutes=5), fetch)
+
+    assert first is second
+    assert first.response == "response"
+    assert fetch.await_count == 1
+
+    await registry.async_fetch("key", cell, timedelta(0), fetch)
+
+    assert fetch.await_count == 2
+    assert registry.as_dict() == {"hits": 1, "misses": 2, "cells": 1}
+
+
+async def test_seeded_response(hass: HomeAssistant, freezer: FrozenDateTimeFactory) -> None:
+    """Test a seeded response is only shared for a short while."""
+    registry = async_get_fetch_registry(hass)
+    fetch = AsyncMock(return_value="fetched")
+    cell = snap_to_grid(52.354, 4.763, 0.01)
+    registry.async_seed("key", cell, "seeded")  # type: ignore[arg-type]
+
+    result = await registry.async_fetch("key", cell, timedelta(minutes=5), fetch)
+    assert result.response == "seeded"
+    fetch.assert_not_awaited()
+
+    freezer.tick(SEED_MAX_AGE)
+    result = await registry.async_fetch("key", cell, timedelta(minutes=5), fetch)
+    assert result.response == "fetched"
+    assert not result.seeded
+
+
+async def test_inflight_request_is_shared(hass: HomeAssistant) -> None:
+    """Test concurrent fetches for the same cell share one request."""
+    registry = async_get_fetch_registry(hass)
+    release = asyncio.Event()
+
+    async def fetch() -> str:
+        await release.wait()
+        return "response"
+
+    fetch_mock = AsyncMock(side_effect=fetch)
+    cell = snap_to_grid(52.354, 4.763, 0.01)
+
+    tasks = [hass.async_create_task(registry.async_fetch("key", cell, timedelta(minutes=5), fetch_mock)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert fetch_mock.await_count == 1
+    assert all(result.response == "response" for result in results)
+    assert registry.hits == 2
+    assert registry.misses == 1
+
+
+async def test_responses_are_not_shared_between_api_keys(hass: HomeAssistant) -> None:
+    """Test every API key gets its own response, its remaining requests belong to that key."""
+    registry = async_get_fetch_registry(hass)
+    fetch = AsyncMock(side_effect=["response1", "response2"])
+    cell = snap_to_grid(52.354, 4.763, 0.01)
+
+    first = await registry.async_fetch("key1", cell, timedelta(minutes=5), fetch)
+    second = await registry.async_fetch("key2", cell, timedelta(minutes=5), fetch)
+
+    assert first.response == "response1"
+    assert second.response == "response2"
+    assert fetch.await_count == 2
+
+
+async def test_failed_fetch_is_not_cached(hass: HomeAssistant) -> None:
+    """Test a failing fetch raises for the caller and is retried next time."""
+    registry = async_get_fetch_registry(hass)
+    fetch = AsyncMock(side_effect=[RuntimeError("API error"), "response"])
+    cell = snap_to_grid(52.354, 4.763, 0.01)
+
+    with pytest.raises(RuntimeError):
+        await registry.async_fetch("key", cell, timedelta(minutes=5), fetch)
+
+    result = await registry.async_fetch("key", cell, timedelta(minutes=5), fetch)
+    assert result.response == "response"
+    assert registry.misses == 2
@@ -0,0 +1,54 @@
+"""Tests for the retry policy and circuit breaker."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from custom_components.knmi.retry import BACKOFF_BASE_DELAY, BACKOFF_MAX_DELAY, BREAKER_THRESHOLD, BreakerState, KnmiCircuitBreaker, backoff_delay
+
+NOW = datetime(2024, 2, 14, 12, 0).astimezone()
+
+
+@pytest.mark.parametrize("attempt", [0, 1, 2, 10])
+def test_backoff_delay(attempt: int) -> None:
+    """Test the delay doubles every attempt, with jitter in the upper half."""
+    expected = min(BACKOFF_BASE_DELAY * 2**attempt, BACKOFF_MAX_DELAY)
+    delay = backoff_delay(BACKOFF_BASE_DELAY, attempt)
+
+    assert expected / 2 <= delay <= expected
+
+
+def test_breaker_opens_after_repeated_failures() -> None:
+    """Test the breaker opens after the threshold and probes with one request."""
+    breaker = KnmiCircuitBreaker()
+    assert breaker.retry_delay(NOW) is None
+
+    for _ in range(BREAKER_THRESHOLD - 1):
+        assert breaker.allow_request(NOW)
+        breaker.record_failure(NOW)
+        assert breaker.state == BreakerState.CLOSED
+
+    delay = breaker.retry_delay(NOW)
+    assert delay
+    assert delay > timedelta(0)
+
+    breaker.record_failure(NOW)
+    assert breaker.state == BreakerState.OPEN
+    assert breaker.trips == 1
+    assert breaker.opened_until
+    assert not breaker.allow_request(NOW)
+
+    # After the cooldown, a single probe is let through.
+    assert breaker.allow_request(breaker.opened_until)
+    assert breaker.state == BreakerState.HALF_OPEN
+
+    # A failing probe opens the breaker again.
+    breaker.record_failure(breaker.opened_until)
+    assert breaker.state == BreakerState.OPEN
+    assert breaker.trips == 2
+
+    assert breaker.allow_request(breaker.opened_until)
+    breaker.record_success()
+    assert breaker.state == BreakerState.CLOSED
+    assert breaker.failures == 0
+    assert breaker.retry_delay(NOW) is None
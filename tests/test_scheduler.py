@@ -0,0 +1,135 @@
+"""Tests for poll scheduling."""
+
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, Mock
+
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.knmi.scheduler import PHASE_LOCK_MARGIN, KnmiFleetScheduler, KnmiPhaseLock, KnmiPhaseSpreader, async_get_phase_spreader
+
+from . import get_mock_fleet_config_entry
+
+START = datetime(2024, 2, 14, 12, 0).astimezone()
+PERIOD = timedelta(minutes=10)
+PUBLISH_DELAY = timedelta(seconds=40)
+
+
+def test_phase_lock_needs_observations() -> None:
+    """Test polls are only aligned after enough upstream refreshes were seen."""
+    phase_lock = KnmiPhaseLock()
+
+    phase_lock.observe(START, START + PUBLISH_DELAY)
+    phase_lock.observe(START + PERIOD, START + PERIOD + PUBLISH_DELAY)
+
+    assert phase_lock.period is None
+    assert phase_lock.next_poll(START + PERIOD, timedelta(minutes=5)) is None
+
+
+def test_phase_lock_learns_period_and_offset() -> None:
+    """Test polls are scheduled just after the next expected upstream refresh."""
+    phase_lock = KnmiPhaseLock()
+
+    for refresh in range(3):
+        refreshed_at = START + refresh * PERIOD
+        # The same refresh seen twice is only recorded once.
+        phase_lock.observe(refreshed_at, refreshed_at + PUBLISH_DELAY + timedelta(minutes=2))
+        phase_lock.observe(refreshed_at, refreshed_at + PUBLISH_DELAY)
+
+    assert phase_lock.period == PERIOD
+    assert phase_lock.as_dict() == {"observations": 3, "period": 600.0, "publish_delay": 160.0}
+
+    # The shortest publish delay is learned over time.
+    phase_lock.observe(START + 3 * PERIOD, START + 3 * PERIOD + PUBLISH_DELAY)
+    now = START + 3 * PERIOD + PUBLISH_DELAY
+
+    assert phase_lock.next_poll(now, timedelta(minutes=5)) == START + 4 * PERIOD + PUBLISH_DELAY + PHASE_LOCK_MARGIN
+
+    # A minimum interval longer than the period skips to a later refresh.
+    assert phase_lock.next_poll(now, timedelta(minutes=15)) == START + 5 * PERIOD + PUBLISH_DELAY + PHASE_LOCK_MARGIN
+
+
+def test_phase_lock_ignores_missing_times() -> None:
+    """Test responses without an upstream time are ignored."""
+    phase_lock = KnmiPhaseLock()
+    phase_lock.observe(None, START)
+
+    assert phase_lock.as_dict() == {"observations": 0, "period": None, "publish_delay": None}
+
+
+async def test_fleet_scheduler(hass: HomeAssistant, freezer: FrozenDateTimeFactory) -> None:
+    """Test only the locations that are due are refreshed, from one timer."""
+    now = dt_util.utcnow()
+    scan_interval = timedelta(minutes=5)
+    due = Mock(next_update=None, scan_interval=scan_interval, async_refresh=AsyncMock())
+    later = Mock(next_update=now + timedelta(minutes=2), scan_interval=scan_interval, async_refresh=AsyncMock())
+    config_entry = get_mock_fleet_config_entry()
+    config_entry.add_to_hass(hass)
+
+    scheduler = KnmiFleetScheduler(hass, config_entry, [due, later], stagger=timedelta(0))
+    scheduler.async_start()
+    async_fire_time_changed(hass, now)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    due.async_refresh.assert_awaited_once()
+    later.async_refresh.assert_not_awaited()
+    # The update didn't schedule itself, so it's due again after the scan interval.
+    assert due.next_update == now + scan_interval
+    assert scheduler.next_update == now + timedelta(minutes=2)
+
+    freezer.tick(timedelta(minutes=2))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    due.async_refresh.assert_awaited_once()
+    later.async_refresh.assert_awaited_once()
+
+    scheduler.async_stop()
+    assert scheduler.next_update is None
+
+
+def test_phase_spreader_fractions() -> None:
+    """Test coordinators get evenly spread phases, which are re-spread when coordinators are added or removed."""
+    spreader = KnmiPhaseSpreader()
+    site_ids = [f"entry_{index}" for index in range(4)]
+    for site_id in site_ids:
+        spreader.add(site_id)
+    spreader.add(site_ids[0])
+
+    assert len(spreader) == 4
+    assert sorted(spreader.fraction(site_id) for site_id in site_ids) == [0, 0.25, 0.5, 0.75]
+
+    # The order only depends on the ids.
+    reversed_spreader = KnmiPhaseSpreader()
+    for site_id in reversed(site_ids):
+        reversed_spreader.add(site_id)
+    assert [reversed_spreader.fraction(site_id) for site_id in site_ids] == [spreader.fraction(site_id) for site_id in site_ids]
+
+    spreader.discard(site_ids[0])
+    assert sorted(spreader.fraction(site_id) for site_id in site_ids[1:]) == [0, 1 / 3, 2 / 3]
+    assert spreader.fraction(site_ids[0]) == 0
+
+
+def test_phase_spreader_next_poll() -> None:
+    """Test polls move to their slot, and then stay one interval apart."""
+    spreader = KnmiPhaseSpreader()
+    interval = timedelta(minutes=5)
+    now = datetime(2024, 2, 14, 12, 1, 10, tzinfo=dt_util.UTC)
+    for site_id in ("a", "b", "c", "d"):
+        spreader.add(site_id)
+
+    polls = {}
+    for site_id in ("a", "b", "c", "d"):
+        next_poll = spreader.next_poll(site_id, now, interval)
+        assert interval / 2 <= next_poll - now < interval * 3 / 2
+        assert spreader.next_poll(site_id, next_poll, interval) - next_poll == interval
+        polls[site_id] = (next_poll - datetime(1970, 1, 1, tzinfo=dt_util.UTC)) % interval
+
+    assert sorted(polls.values()) == [timedelta(0), interval / 4, interval / 2, interval * 3 / 4]
+
+
+async def test_phase_spreader_shared(hass: HomeAssistant) -> None:
+    """Test the phase spreader is shared by all config entries."""
+    assert async_get_phase_spreader(hass) is async_get_phase_spreader(hass)
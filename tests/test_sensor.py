@@ -1,7 +1,14 @@
 """Tests for sensor."""
 
+from datetime import timedelta
+from unittest.mock import AsyncMock
+
 import pytest
 from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import load_fixture
+
+from custom_components.knmi.coordinator import KnmiDataUpdateCoordinator
+from weerlive import Response, WeerliveAPIError
 
 from . import setup_integration, unload_integration
 
@@ -29,6 +36,9 @@ from . import setup_integration, unload_integration
         ("sensor.home_wind_speed", "29.1"),
         ("sensor.home_weather_code", "groen"),
         ("sensor.home_visibility", "6990"),
+        ("sensor.home_projected_api_quota_exhaustion", "unknown"),
+        ("sensor.home_circuit_breaker", "closed"),
+        ("sensor.home_update_success_ratio", "100.0"),
     ],
 )
 @pytest.mark.usefixtures("mocked_data")
@@ -57,3 +67,80 @@ async def test_state_with_attributes(hass: HomeAssistant) -> None:
     assert (str(state.attributes.get("knots"))) == "15.7"
 
     await unload_integration(hass, config_entry)
+
+
+@pytest.mark.usefixtures("mocked_data")
+async def test_unchanged_state_not_written(hass: HomeAssistant) -> None:
+    """Test the state is only written when it changed."""
+    config_entry = await setup_integration(hass)
+    coordinator: KnmiDataUpdateCoordinator = config_entry.runtime_data.coordinator
+    state = hass.states.get("sensor.home_max_temperature_tomorrow")
+    assert state
+
+    coordinator.async_set_updated_data(Response.from_json(load_fixture("response.json")))
+    await hass.async_block_till_done()
+    skipped_writes = coordinator.stats.skipped_writes
+
+    # Nothing changed.
+    coordinator.async_set_updated_data(Response.from_json(load_fixture("response.json")))
+    await hass.async_block_till_done()
+    assert coordinator.stats.skipped_writes > skipped_writes
+    assert hass.states.get("sensor.home_max_temperature_tomorrow") is state
+
+    response = Response.from_json(load_fixture("response.json"))
+    response.daily_forecast[1].max_temperature = 15
+    coordinator.async_set_updated_data(response)
+    await hass.async_block_till_done()
+    state = hass.states.get("sensor.home_max_temperature_tomorrow")
+    assert state
+    assert state.state == "15.0"
+
+    await unload_integration(hass, config_entry)
+
+
+@pytest.mark.usefixtures("mocked_data")
+async def test_api_usage_updated_with_unchanged_weather(hass: HomeAssistant, mock_weerlive_client: AsyncMock) -> None:
+    """Test the remaining requests are updated when only the API usage changed, the other sensors aren't written."""
+    config_entry = await setup_integration(hass)
+    coordinator: KnmiDataUpdateCoordinator = config_entry.runtime_data.coordinator
+    # Skip the shared cache, so the refresh fetches a new response.
+    coordinator.scan_interval = timedelta(0)
+    state = hass.states.get("sensor.home_temperature")
+    assert state
+
+    response = Response.from_json(load_fixture("response.json"))
+    response.api.remaining_requests = 131
+    mock_weerlive_client.latitude_longitude.return_value = response
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    assert coordinator.suppressed_updates == 1
+    remaining = hass.states.get("sensor.home_remaining_api_requests")
+    assert remaining
+    assert remaining.state == "131"
+    assert hass.states.get("sensor.home_temperature") is state
+
+    await unload_integration(hass, config_entry)
+
+
+async def test_coordinator_sensor_without_data(hass: HomeAssistant, mock_weerlive_client: AsyncMock) -> None:
+    """Test coordinator sensors are set up and updated while no data was received."""
+    mock_weerlive_client.latitude_longitude.side_effect = WeerliveAPIError("error")
+    config_entry = await setup_integration(hass)
+    coordinator: KnmiDataUpdateCoordinator = config_entry.runtime_data.coordinator
+    assert coordinator.data is None
+
+    state = hass.states.get("sensor.home_circuit_breaker")
+    assert state
+    assert state.state == "closed"
+    assert state.attributes.get("failures") == 1
+    assert "attribution" not in state.attributes
+
+    # The coordinator doesn't update its listeners for repeated failures, the coordinator sensors are updated anyway.
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    state = hass.states.get("sensor.home_circuit_breaker")
+    assert state
+    assert state.attributes.get("failures") == 2
+
+    await unload_integration(hass, config_entry)
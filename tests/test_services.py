@@ -0,0 +1,48 @@
+"""Tests for knmi services."""
+
+from datetime import timedelta
+from unittest.mock import AsyncMock
+
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
+
+from custom_components.knmi.const import ATTR_CONFIG_ENTRY_ID, DEFAULT_MIN_REFRESH_AGE, DOMAIN, SERVICE_GET_RESAMPLED_FORECAST, SERVICE_REFRESH
+
+from . import setup_integration, unload_integration
+
+
+async def test_refresh(hass: HomeAssistant, mock_weerlive_client: AsyncMock, freezer: FrozenDateTimeFactory) -> None:
+    """Test the refresh service fetches new data once the data is old enough."""
+    config_entry = await setup_integration(hass)
+    assert mock_weerlive_client.latitude_longitude.await_count == 1
+
+    # The data was just fetched, so it is recent enough.
+    await hass.services.async_call(DOMAIN, SERVICE_REFRESH, {ATTR_CONFIG_ENTRY_ID: config_entry.entry_id}, blocking=True)
+    assert mock_weerlive_client.latitude_longitude.await_count == 1
+
+    freezer.tick(timedelta(seconds=DEFAULT_MIN_REFRESH_AGE))
+    await hass.services.async_call(DOMAIN, SERVICE_REFRESH, {}, blocking=True)
+    assert mock_weerlive_client.latitude_longitude.await_count == 2
+
+    await unload_integration(hass, config_entry)
+
+
+async def test_refresh_not_loaded(hass: HomeAssistant) -> None:
+    """Test the refresh service with an unknown config entry."""
+    config_entry = await setup_integration(hass)
+
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(DOMAIN, SERVICE_REFRESH, {ATTR_CONFIG_ENTRY_ID: "unknown"}, blocking=True)
+
+    await unload_integration(hass, config_entry)
+
+
+async def test_services_registered_once(hass: HomeAssistant) -> None:
+    """Test the services are registered with the integration, not by every entry."""
+    config_entry = await setup_integration(hass)
+    await unload_integration(hass, config_entry)
+
+    assert hass.services.has_service(DOMAIN, SERVICE_REFRESH)
+    assert hass.services.has_service(DOMAIN, SERVICE_GET_RESAMPLED_FORECAST)
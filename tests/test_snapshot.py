@@ -0,0 +1,33 @@
+"""Tests for the snapshot of the entity values."""
+
+from pytest_homeassistant_custom_component.common import load_fixture
+
+from custom_components.knmi.sensor import DESCRIPTIONS
+from custom_components.knmi.snapshot import KnmiSnapshot
+from weerlive import Response
+
+
+def test_snapshot_evaluated_once_per_data() -> None:
+    """Values are evaluated once, until the data changes."""
+    description = next(description for description in DESCRIPTIONS if description.key == "temp")
+    snapshot = KnmiSnapshot()
+    data = Response.from_json(load_fixture("response.json"))
+
+    value = snapshot.get(data, description)
+    assert value.value == 10.5
+    assert snapshot.get(data, description) is value
+
+    data = Response.from_json(load_fixture("response_alarm.json"))
+    assert snapshot.get(data, description) is not value
+
+
+def test_snapshot_attributes() -> None:
+    """State attributes are part of the snapshot."""
+    description = next(description for description in DESCRIPTIONS if description.key == "windkmh")
+    snapshot = KnmiSnapshot()
+    data = Response.from_json(load_fixture("response.json"))
+
+    attributes = snapshot.get(data, description).attributes
+    assert attributes["bearing"] == "WZW"
+    assert attributes["degree"] == 226
+    assert snapshot.get(data, description).attributes is attributes
@@ -0,0 +1,63 @@
+"""Tests for the update timing statistics."""
+
+from unittest.mock import patch
+
+import pytest
+
+from custom_components.knmi.stats import STATS_WINDOW, KnmiTimingHistogram, KnmiUpdateStats
+
+
+def test_histogram_percentiles() -> None:
+    """Test the nearest-rank percentiles."""
+    histogram = KnmiTimingHistogram()
+    assert histogram.percentile(50) is None
+    assert histogram.as_dict() == {"count": 0, "p50": None, "p95": None, "p99": None}
+
+    for seconds in range(1, 101):
+        histogram.record(seconds / 1000)
+
+    assert histogram.percentile(50) == 0.05
+    assert histogram.percentile(95) == 0.095
+    assert histogram.percentile(99) == 0.099
+    assert histogram.as_dict() == {"count": 100, "p50": 50.0, "p95": 95.0, "p99": 99.0}
+
+
+def test_histogram_window() -> None:
+    """Test only the most recent samples are kept."""
+    histogram = KnmiTimingHistogram()
+    for _ in range(STATS_WINDOW):
+        histogram.record(10)
+    for _ in range(STATS_WINDOW):
+        histogram.record(1)
+
+    assert len(histogram) == STATS_WINDOW
+    assert histogram.percentile(99) == 1
+
+
+def test_histogram_measure() -> None:
+    """Test a block is measured, also when it raises."""
+    histogram = KnmiTimingHistogram()
+
+    msg = "Failed"
+    with patch("custom_components.knmi.stats.time.perf_counter", side_effect=[1.0, 1.5, 2.0, 4.0]):
+        with histogram.measure():
+            pass
+        with pytest.raises(ValueError, match=msg), histogram.measure():
+            raise ValueError(msg)
+
+    assert histogram.percentile(50) == 0.5
+    assert histogram.percentile(100) == 2.0
+
+
+def test_success_ratio() -> None:
+    """Test the success ratio of recent updates."""
+    stats = KnmiUpdateStats()
+    assert stats.success_ratio is None
+
+    stats.record_outcome(success=True)
+    stats.record_outcome(success=True)
+    stats.record_outcome(success=True)
+    stats.record_outcome(success=False)
+
+    assert stats.success_ratio == 0.75
+    assert stats.as_dict()["success_ratio"] == 0.75
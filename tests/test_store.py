@@ -0,0 +1,50 @@
+"""Tests for the persistent response cache."""
+
+from datetime import timedelta
+from typing import Any
+
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed, load_fixture
+
+from custom_components.knmi.registry import KnmiFetchResult
+from custom_components.knmi.store import STORAGE_SAVE_DELAY, STORAGE_VERSION, KnmiResponseStore
+from weerlive import Response
+
+STORAGE_KEY = "knmi.test_entry"
+
+
+async def test_save_and_load(hass: HomeAssistant, hass_storage: dict[str, Any], freezer: FrozenDateTimeFactory) -> None:
+    """Test a saved response can be loaded again."""
+    store = KnmiResponseStore(hass, "test_entry")
+    result = KnmiFetchResult(response=Response.from_json(load_fixture("response.json")), fetched_at=dt_util.utcnow())
+
+    assert await store.async_load() is None
+
+    store.async_save(result)
+    freezer.tick(timedelta(seconds=STORAGE_SAVE_DELAY))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+    assert hass_storage[STORAGE_KEY]["data"]["fetched_at"] == result.fetched_at.isoformat()
+
+    loaded = await KnmiResponseStore(hass, "test_entry").async_load()
+    assert loaded
+    assert loaded.fetched_at == result.fetched_at
+    assert loaded.response.to_dict() == result.response.to_dict()
+
+    await store.async_remove()
+    assert STORAGE_KEY not in hass_storage
+
+
+async def test_load_invalid(hass: HomeAssistant, hass_storage: dict[str, Any]) -> None:
+    """Test invalid stored data is ignored."""
+    hass_storage[STORAGE_KEY] = {
+        "version": STORAGE_VERSION,
+        "minor_version": 1,
+        "key": STORAGE_KEY,
+        "data": {"response": {}},
+    }
+
+    assert await KnmiResponseStore(hass, "test_entry").async_load() is None
@@ -1,6 +1,7 @@
 """Tests for weather."""
 
 from decimal import Decimal
+from unittest.mock import Mock, patch
 
 import pytest
 from _pytest.logging import LogCaptureFixture
@@ -16,6 +17,7 @@ from homeassistant.components.weather import (
     ATTR_CONDITION_SNOWY,
     ATTR_CONDITION_SUNNY,
     ATTR_FORECAST_CONDITION,
+    ATTR_FORECAST_IS_DAYTIME,
     ATTR_FORECAST_NATIVE_PRECIPITATION,
     ATTR_FORECAST_NATIVE_TEMP,
     ATTR_FORECAST_NATIVE_TEMP_LOW,
@@ -32,10 +34,15 @@ from homeassistant.components.weather import (
     ATTR_WEATHER_WIND_BEARING,
     ATTR_WEATHER_WIND_SPEED,
 )
+from homeassistant.components.weather import DOMAIN as WEATHER_DOMAIN
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import issue_registry as ir
+from pytest_homeassistant_custom_component.common import load_fixture
 
+from custom_components.knmi.const import ATTR_EXTENDED, ATTR_STEP, DOMAIN, ISSUE_UNMAPPED_CONDITIONS, SERVICE_GET_RESAMPLED_FORECAST
 from custom_components.knmi.coordinator import KnmiDataUpdateCoordinator
-from custom_components.knmi.weather import KnmiWeather, KnmiWeatherDescription
+from custom_components.knmi.weather import KnmiWeather, KnmiWeatherDescription, fallback_condition, mean_bearing
+from weerlive import Response
 
 from . import setup_integration, unload_integration
 
@@ -66,7 +73,7 @@ from . import setup_integration, unload_integration
 async def test_map_conditions(hass: HomeAssistant, input_value: str, expected_output: str) -> None:
     """Test map condition."""
     config_entry = await setup_integration(hass)
-    coordinator: KnmiDataUpdateCoordinator = config_entry.runtime_data
+    coordinator: KnmiDataUpdateCoordinator = config_entry.runtime_data.coordinator
     description = KnmiWeatherDescription(key="weer")
     weather = KnmiWeather(config_entry, coordinator, description)
 
@@ -76,18 +83,58 @@ async def test_map_conditions(hass: HomeAssistant, input_value: str, expected_ou
 async def test_map_conditions_error(hass: HomeAssistant, caplog: LogCaptureFixture) -> None:
     """Test map condition error cases."""
     config_entry = await setup_integration(hass)
-    coordinator: KnmiDataUpdateCoordinator = config_entry.runtime_data
+    coordinator: KnmiDataUpdateCoordinator = config_entry.runtime_data.coordinator
     description = KnmiWeatherDescription(key="weer")
     weather = KnmiWeather(config_entry, coordinator, description)
 
+    # A missing condition isn't an unknown one.
     assert weather.map_condition(None) is None
-    assert 'Weather condition "None" can\'t be mapped, please raise a bug' in caplog.text
     assert weather.map_condition("") is None
-    assert 'Weather condition "" can\'t be mapped, please raise a bug' in caplog.text
+    assert "can't be mapped" not in caplog.text
     assert weather.map_condition("hondenweer") is None
     assert 'Weather condition "hondenweer" can\'t be mapped, please raise a bug' in caplog.text
 
 
+async def test_map_conditions_unknown_logged_once(hass: HomeAssistant, caplog: LogCaptureFixture, issue_registry: ir.IssueRegistry) -> None:
+    """Test unknown conditions are logged once, and listed in a repair issue."""
+    config_entry = await setup_integration(hass)
+    coordinator: KnmiDataUpdateCoordinator = config_entry.runtime_data.coordinator
+    description = KnmiWeatherDescription(key="weer")
+    weather = KnmiWeather(config_entry, coordinator, description)
+
+    for _ in range(3):
+        assert weather.map_condition("hondenweer") is None
+        assert weather.map_condition("nachtregen") == ATTR_CONDITION_RAINY
+
+    assert caplog.text.count('Weather condition "hondenweer" can\'t be mapped') == 1
+    assert caplog.text.count('Weather condition "nachtregen" can\'t be mapped') == 1
+    assert "Traceback" not in caplog.text
+
+    issue = issue_registry.async_get_issue(DOMAIN, ISSUE_UNMAPPED_CONDITIONS)
+    assert issue
+    assert issue.translation_placeholders == {"conditions": '"hondenweer", "nachtregen"'}
+
+    await unload_integration(hass, config_entry)
+
+
+@pytest.mark.parametrize(
+    ("input_value", "expected_output"),
+    [
+        ("nachtregen", ATTR_CONDITION_RAINY),
+        ("mistnacht", ATTR_CONDITION_FOG),
+        ("zonnignacht", ATTR_CONDITION_CLEAR_NIGHT),
+        ("zwaarbewolkt_regen", ATTR_CONDITION_CLOUDY),
+        ("regenbuien", ATTR_CONDITION_RAINY),
+        ("hondenweer", None),
+        ("", None),
+        (None, None),
+    ],
+)
+def test_fallback_condition(input_value: str | None, expected_output: str | None) -> None:
+    """Test the fallback for unknown conditions."""
+    assert fallback_condition(input_value) == expected_output
+
+
 @pytest.mark.usefixtures("mocked_data")
 async def test_state(hass: HomeAssistant) -> None:
     """Test state."""
@@ -114,7 +161,7 @@ async def test_state(hass: HomeAssistant) -> None:
 async def test_async_forecast_daily(hass: HomeAssistant) -> None:  # pylint: disable=too-many-statements  # noqa: PLR0915
     """Test daily forecast."""
     config_entry = await setup_integration(hass)
-    coordinator: KnmiDataUpdateCoordinator = config_entry.runtime_data
+    coordinator: KnmiDataUpdateCoordinator = config_entry.runtime_data.coordinator
     description = KnmiWeatherDescription(key="weer")
     weather = KnmiWeather(config_entry, coordinator, description)
 
@@ -179,7 +226,7 @@ async def test_async_forecast_daily(hass: HomeAssistant) -> None:  # pylint: dis
 async def test_async_forecast_hourly(hass: HomeAssistant) -> None:  # pylint: disable=too-many-statements  # noqa: PLR0915
     """Test hourly forecast."""
     config_entry = await setup_integration(hass)
-    coordinator: KnmiDataUpdateCoordinator = config_entry.runtime_data
+    coordinator: KnmiDataUpdateCoordinator = config_entry.runtime_data.coordinator
     description = KnmiWeatherDescription(key="weer")
     weather = KnmiWeather(config_entry, coordinator, description)
 
@@ -257,7 +304,7 @@ async def test_async_forecast_hourly(hass: HomeAssistant) -> None:  # pylint: di
 async def test_async_forecast_daily_skips_missing_day(hass: HomeAssistant) -> None:
     """Daily forecast entries without a parsed day are skipped."""
     config_entry = await setup_integration(hass)
-    coordinator: KnmiDataUpdateCoordinator = config_entry.runtime_data
+    coordinator: KnmiDataUpdateCoordinator = config_entry.runtime_data.coordinator
     description = KnmiWeatherDescription(key="weer")
     weather = KnmiWeather(config_entry, coordinator, description)
 
@@ -274,7 +321,7 @@ async def test_async_forecast_daily_skips_missing_day(hass: HomeAssistant) -> No
 async def test_async_forecast_hourly_skips_missing_time(hass: HomeAssistant) -> None:
     """Hourly forecast entries without a parsed time are skipped."""
     config_entry = await setup_integration(hass)
-    coordinator: KnmiDataUpdateCoordinator = config_entry.runtime_data
+    coordinator: KnmiDataUpdateCoordinator = config_entry.runtime_data.coordinator
     description = KnmiWeatherDescription(key="weer")
     weather = KnmiWeather(config_entry, coordinator, description)
 
@@ -287,20 +334,173 @@ async def test_async_forecast_hourly_skips_missing_time(hass: HomeAssistant) ->
     await unload_integration(hass, config_entry)
 
 
+@pytest.mark.usefixtures("mocked_data")
+async def test_forecasts_cached(hass: HomeAssistant) -> None:
+    """Forecasts are built once for every update of the data."""
+    config_entry = await setup_integration(hass)
+    coordinator: KnmiDataUpdateCoordinator = config_entry.runtime_data.coordinator
+    description = KnmiWeatherDescription(key="weer")
+    weather = KnmiWeather(config_entry, coordinator, description)
+
+    daily = await weather.async_forecast_daily()
+    hourly = await weather.async_forecast_hourly()
+    assert await weather.async_forecast_daily() is daily
+    assert await weather.async_forecast_hourly() is hourly
+
+    coordinator.async_set_updated_data(Response.from_json(load_fixture("response_alarm.json")))
+
+    assert await weather.async_forecast_daily() is not daily
+    assert await weather.async_forecast_hourly() is not hourly
+
+    await unload_integration(hass, config_entry)
+
+
+@pytest.mark.usefixtures("mocked_data")
+async def test_forecast_listeners_notified_of_changes(hass: HomeAssistant) -> None:
+    """Forecast listeners are only notified of the forecasts that changed, forecasts without listeners aren't built."""
+    config_entry = await setup_integration(hass)
+    coordinator: KnmiDataUpdateCoordinator = config_entry.runtime_data.coordinator
+    weather: KnmiWeather = hass.data[WEATHER_DOMAIN].get_entity("weather.home")
+    unsubscribe_hourly = weather.async_subscribe_forecast("hourly", Mock())
+    unsubscribe_twice_daily = weather.async_subscribe_forecast("twice_daily", Mock())
+
+    with patch.object(KnmiWeather, "async_update_listeners") as mock_update_listeners:
+        coordinator.async_set_updated_data(Response.from_json(load_fixture("response.json")))
+        await hass.async_block_till_done()
+        mock_update_listeners.reset_mock()
+
+        # Only the current weather changed.
+        response = Response.from_json(load_fixture("response.json"))
+        response.live.temperature = 20
+        coordinator.async_set_updated_data(response)
+        await hass.async_block_till_done()
+        mock_update_listeners.assert_not_called()
+
+        response = Response.from_json(load_fixture("response.json"))
+        response.hourly_forecast[0].temperature = 20
+        coordinator.async_set_updated_data(response)
+        await hass.async_block_till_done()
+        mock_update_listeners.assert_called_once_with(["hourly", "twice_daily"])
+
+    assert "daily" not in weather._forecasts
+    unsubscribe_hourly()
+    unsubscribe_twice_daily()
+    await unload_integration(hass, config_entry)
+
+
+@pytest.mark.usefixtures("mocked_data")
+async def test_get_resampled_forecast(hass: HomeAssistant) -> None:
+    """Test the resampled forecast service."""
+    config_entry = await setup_integration(hass)
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_GET_RESAMPLED_FORECAST,
+        {ATTR_STEP: 15, ATTR_EXTENDED: False},
+        target={"entity_id": "weather.home"},
+        blocking=True,
+        return_response=True,
+    )
+    forecast = response["weather.home"]["forecast"]  # type: ignore[index]
+    assert len(forecast) == 24 * 4
+    assert forecast[0]["datetime"] == "2024-02-14T23:00:00+01:00"
+    assert forecast[2]["datetime"] == "2024-02-14T23:30:00+01:00"
+    assert forecast[2]["temperature"] == 10
+    assert forecast[2]["wind_speed"] == 19.5
+    assert forecast[2]["precipitation"] == 0
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_GET_RESAMPLED_FORECAST,
+        {},
+        target={"entity_id": "weather.home"},
+        blocking=True,
+        return_response=True,
+    )
+    forecast = response["weather.home"]["forecast"]  # type: ignore[index]
+    # The hourly forecast ends at 22:00, the daily forecast adds the hours up to the 18th.
+    assert len(forecast) == 24 * 4 + 1 + 3 * 24
+    assert forecast[96]["datetime"] == "2024-02-15T23:00:00+01:00"
+    assert forecast[-1]["datetime"] == "2024-02-18T23:00:00+01:00"
+    # The minimum of the 16th is at 05:00.
+    assert forecast[96 + 1 + 5]["temperature"] == 9
+    assert forecast[96 + 1 + 5]["precipitation_probability"] is not None
+
+    await unload_integration(hass, config_entry)
+
+
+async def test_without_data(hass: HomeAssistant) -> None:
+    """Test the weather entity can be created before data is received."""
+    config_entry = await setup_integration(hass)
+    coordinator: KnmiDataUpdateCoordinator = config_entry.runtime_data.coordinator
+    coordinator.data = None  # type: ignore[assignment]
+    description = KnmiWeatherDescription(key="weer")
+    weather = KnmiWeather(config_entry, coordinator, description)
+
+    assert not weather.available
+    assert weather.attribution is None
+    assert await weather.async_forecast_daily() is None
+    assert await weather.async_forecast_hourly() is None
+
+    await unload_integration(hass, config_entry)
+
+
 @pytest.mark.usefixtures("mocked_data")
 async def test_async_forecast_twice_daily(hass: HomeAssistant) -> None:
     """Test twice daily forecast."""
     config_entry = await setup_integration(hass)
-    coordinator: KnmiDataUpdateCoordinator = config_entry.runtime_data
+    coordinator: KnmiDataUpdateCoordinator = config_entry.runtime_data.coordinator
     description = KnmiWeatherDescription(key="weer")
     weather = KnmiWeather(config_entry, coordinator, description)
 
-    with pytest.raises(NotImplementedError):
-        await weather.async_forecast_twice_daily()
+    forecast = await weather.async_forecast_twice_daily()
+    assert forecast
+    assert len(forecast) == 3
+
+    # Night until sunrise at 07:57.
+    assert forecast[0][ATTR_FORECAST_TIME] == "2024-02-14T23:00:00+01:00"
+    assert forecast[0][ATTR_FORECAST_IS_DAYTIME] is False
+    assert forecast[0][ATTR_FORECAST_CONDITION] == "cloudy"
+    assert forecast[0][ATTR_FORECAST_NATIVE_TEMP] == 10
+    assert forecast[0][ATTR_FORECAST_NATIVE_TEMP_LOW] == 10
+    assert forecast[0][ATTR_FORECAST_NATIVE_PRECIPITATION] == 1.2
+    assert forecast[0][ATTR_FORECAST_WIND_BEARING] == 217
+    assert forecast[0][ATTR_FORECAST_NATIVE_WIND_SPEED] == 17
+
+    # Day until sunset at 17:51.
+    assert forecast[1][ATTR_FORECAST_TIME] == "2024-02-15T08:00:00+01:00"
+    assert forecast[1][ATTR_FORECAST_IS_DAYTIME] is True
+    assert forecast[1][ATTR_FORECAST_CONDITION] == "cloudy"
+    assert forecast[1][ATTR_FORECAST_NATIVE_TEMP] == 14
+    assert forecast[1][ATTR_FORECAST_NATIVE_TEMP_LOW] == 11
+    assert forecast[1][ATTR_FORECAST_NATIVE_PRECIPITATION] == 1.2
+    assert forecast[1][ATTR_FORECAST_WIND_BEARING] == 199
+    assert forecast[1][ATTR_FORECAST_NATIVE_WIND_SPEED] == 13.6
+
+    assert forecast[2][ATTR_FORECAST_TIME] == "2024-02-15T18:00:00+01:00"
+    assert forecast[2][ATTR_FORECAST_IS_DAYTIME] is False
+    assert forecast[2][ATTR_FORECAST_NATIVE_TEMP] == 13
+    assert forecast[2][ATTR_FORECAST_NATIVE_TEMP_LOW] == 12
+    assert forecast[2][ATTR_FORECAST_NATIVE_PRECIPITATION] == 0
 
     await unload_integration(hass, config_entry)
 
 
+@pytest.mark.parametrize(
+    ("bearings", "expected"),
+    [
+        ([90], 90),
+        ([350, 10], 0),
+        ([180, 270], 225),
+        ([0, 180], None),
+        ([], None),
+    ],
+)
+def test_mean_bearing(bearings: list[float], expected: float | None) -> None:
+    """Test the circular mean of wind bearings."""
+    assert mean_bearing(bearings) == expected
+
+
 @pytest.mark.usefixtures("mocked_data")
 @pytest.mark.parametrize("mocked_data", ["warm_snow.json"], indirect=True)
 async def test_warm_snow_fix(hass: HomeAssistant) -> None: